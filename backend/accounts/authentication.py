@@ -0,0 +1,18 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from .tokens import VERSION_CLAIM
+
+
+class VersionedJWTAuthentication(JWTAuthentication):
+    """JWT authentication that rejects tokens issued before a revocation.
+
+    The user row is loaded on every request anyway, so the version is compared
+    against it directly.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if validated_token.get(VERSION_CLAIM, 0) != user.token_version:
+            raise AuthenticationFailed("Token has been revoked.", code="token_revoked")
+        return user
@@ -0,0 +1,28 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.provisioning import ProvisioningError, provision_users
+
+
+class Command(BaseCommand):
+    help = "Create users from a CSV file with username,email,password,role columns."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--workers", type=int, help="Password hashing processes")
+
+    def handle(self, *args, **options):
+        with open(options["path"], newline="", encoding="utf-8") as f:
+            rows = [
+                {k: v for k, v in row.items() if k and v not in (None, "")}
+                for row in csv.DictReader(f)
+            ]
+        try:
+            users = provision_users(rows, workers=options["workers"])
+        except ProvisioningError as exc:
+            for error in exc.errors:
+                # Header is line 1, so data row i is on line i + 2.
+                self.stderr.write(f"line {error['row'] + 2}: {error['errors']}")
+            raise CommandError(f"{exc}; no users were created.")
+        self.stdout.write(self.style.SUCCESS(f"Created {len(users)} users."))
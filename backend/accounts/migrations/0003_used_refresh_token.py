@@ -0,0 +1,20 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsedRefreshToken',
+            fields=[
+                ('jti', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -1,7 +1,12 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
 from django.db import models
 
 
+def token_version_key(user_id):
+    return f"token-version:{user_id}"
+
+
 class User(AbstractUser):
     class Role(models.TextChoices):
         ANNOTATOR = "annotator", "Annotator"
@@ -13,6 +18,19 @@ class User(AbstractUser):
         choices=Role.choices,
         default=Role.ANNOTATOR,
     )
+    token_version = models.PositiveIntegerField(default=0)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Token refresh caches token_version and is_active (accounts.tokens).
+        cache.delete(token_version_key(self.pk))
 
     def __str__(self):
         return f"{self.username} ({self.role})"
+
+
+class UsedRefreshToken(models.Model):
+    """A rotated refresh token, kept until it expires so it cannot be reused."""
+
+    jti = models.CharField(max_length=255, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
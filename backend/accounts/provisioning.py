@@ -0,0 +1,84 @@
+"""Bulk user creation.
+
+Rows are validated up front (one query for existing usernames), passwords
+are hashed (PBKDF2 is CPU-bound and deliberately slow, so ``import_users``
+spreads it across a process pool; the register-bulk endpoint hashes in the
+request worker), and users are inserted with a single ``bulk_create`` in one
+transaction. Nothing is created if any row is invalid.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import transaction
+
+from labelforge.pool import pool_map
+from .models import User
+from .serializers import RegisterSerializer
+
+_POOL_MIN_PASSWORDS = 8
+
+
+class BulkUserSerializer(RegisterSerializer):
+    class Meta(RegisterSerializer.Meta):
+        # Uniqueness is checked for the whole batch in provision_users.
+        extra_kwargs = {"username": {"validators": [UnicodeUsernameValidator()]}}
+
+
+class ProvisioningError(Exception):
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid row(s)")
+        self.errors = errors
+
+
+def hash_passwords(passwords, workers=None):
+    workers = workers or settings.PASSWORD_HASH_WORKERS
+    return pool_map(make_password, passwords, workers, _POOL_MIN_PASSWORDS)
+
+
+def validate_rows(rows):
+    """Return ``(valid_data, errors)``; errors are ``{"row": i, "errors": {...}}``."""
+    valid, errors = [], []
+    seen = set()
+    for i, row in enumerate(rows):
+        serializer = BulkUserSerializer(data=row)
+        if not serializer.is_valid():
+            errors.append({"row": i, "errors": serializer.errors})
+            continue
+        username = serializer.validated_data["username"]
+        if username in seen:
+            errors.append({"row": i, "errors": {"username": ["Duplicate username in this batch."]}})
+            continue
+        seen.add(username)
+        valid.append((i, serializer.validated_data))
+
+    existing = set(
+        User.objects.filter(username__in=list(seen)).values_list("username", flat=True)
+    )
+    if existing:
+        for i, data in valid:
+            if data["username"] in existing:
+                errors.append({
+                    "row": i,
+                    "errors": {"username": ["A user with that username already exists."]},
+                })
+        errors.sort(key=lambda e: e["row"])
+    return [data for _, data in valid], errors
+
+
+def provision_users(rows, workers=None):
+    """Create users from ``rows`` or raise ``ProvisioningError`` with per-row errors."""
+    valid, errors = validate_rows(rows)
+    if errors:
+        raise ProvisioningError(errors)
+    hashes = hash_passwords([data["password"] for data in valid], workers)
+    users = [
+        User(
+            username=data["username"],
+            email=data.get("email", ""),
+            role=data.get("role", User.Role.ANNOTATOR),
+            password=hashed,
+        )
+        for data, hashed in zip(valid, hashes)
+    ]
+    with transaction.atomic():
+        return User.objects.bulk_create(users)
@@ -1,5 +1,12 @@
+from unittest import mock
+
+from django.contrib.auth.hashers import check_password
+from django.core.cache import cache
 from django.test import TestCase
-from .models import User
+from rest_framework.test import APIClient
+
+from .models import UsedRefreshToken, User
+from .provisioning import hash_passwords
 
 
 class UserModelTest(TestCase):
@@ -23,3 +30,89 @@ class UserModelTest(TestCase):
             username="alice", password="pass1234", role=User.Role.ADMIN
         )
         self.assertEqual(str(user), "alice (admin)")
+
+
+class TokenRefreshTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="ann", password="pass1234")
+        self.client = APIClient()
+        res = self.client.post(
+            "/api/auth/login/", {"username": "ann", "password": "pass1234"}, format="json"
+        )
+        self.tokens = res.data
+
+    def test_refresh_rotates_and_is_single_use(self):
+        res = self.client.post(
+            "/api/auth/refresh/", {"refresh": self.tokens["refresh"]}, format="json"
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res.data["refresh"], self.tokens["refresh"])
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {res.data['access']}")
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 200)
+
+        reused = self.client.post(
+            "/api/auth/refresh/", {"refresh": self.tokens["refresh"]}, format="json"
+        )
+        self.assertEqual(reused.status_code, 401)
+
+    def _refresh(self, token):
+        return self.client.post("/api/auth/refresh/", {"refresh": token}, format="json")
+
+    def test_deactivation_and_reactivation_take_effect_on_refresh(self):
+        res = self._refresh(self.tokens["refresh"])
+        self.assertEqual(UsedRefreshToken.objects.count(), 1)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self._refresh(res.data["refresh"]).status_code, 401)
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(self._refresh(res.data["refresh"]).status_code, 200)
+
+    def test_revoke_invalidates_access_and_refresh_tokens(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        self.assertEqual(self.client.post("/api/auth/revoke/").status_code, 204)
+        self.assertEqual(self.client.get("/api/auth/me/").status_code, 401)
+        res = self.client.post(
+            "/api/auth/refresh/", {"refresh": self.tokens["refresh"]}, format="json"
+        )
+        self.assertEqual(res.status_code, 401)
+
+
+class BulkRegisterTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="pass1234", role=User.Role.ADMIN
+        )
+        User.objects.create_user(username="taken", password="pass1234")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_creates_users_with_usable_passwords(self):
+        rows = [
+            {"username": f"vendor{i}", "password": f"secret{i}", "role": "annotator"}
+            for i in range(10)
+        ]
+        with mock.patch("labelforge.pool.ProcessPoolExecutor") as pool:
+            res = self.client.post("/api/auth/register/bulk/", {"users": rows}, format="json")
+        pool.assert_not_called()
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data["created"], 10)
+        self.assertTrue(User.objects.get(username="vendor7").check_password("secret7"))
+
+    def test_reports_row_errors_and_creates_nothing(self):
+        rows = [
+            {"username": "fresh", "password": "secret1"},
+            {"username": "taken", "password": "secret2"},
+            {"username": "fresh", "password": "secret3"},
+            {"username": "short", "password": "x"},
+        ]
+        res = self.client.post("/api/auth/register/bulk/", rows, format="json")
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual([e["row"] for e in res.data["errors"]], [1, 2, 3])
+        self.assertFalse(User.objects.filter(username="fresh").exists())
+
+    def test_parallel_hashing_matches_serial(self):
+        passwords = [f"pw{i}" for i in range(12)]
+        hashes = hash_passwords(passwords, workers=2)
+        self.assertTrue(all(check_password(p, h) for p, h in zip(passwords, hashes)))
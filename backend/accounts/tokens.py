@@ -0,0 +1,81 @@
+"""Token issue, refresh and revocation.
+
+Each user has a ``token_version``; tokens carry it in the ``ver`` claim and
+stop working once it is bumped (``revoke_tokens``). Refreshing checks the
+version from the cache instead of loading the user, so renewing a session
+costs a signature check rather than a password hash. ``User.save`` clears
+the cached version, and entries expire after ``TOKEN_VERSION_CACHE_SECONDS``
+to cover queryset updates. Refresh tokens are single-use: rotating one
+inserts its ``jti`` into ``UsedRefreshToken``, whose primary key rejects a
+second use from any process.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import UsedRefreshToken, User, token_version_key
+
+VERSION_CLAIM = "ver"
+# Cached for inactive or missing users, since None means a cache miss.
+_NO_VERSION = -1
+
+
+def token_version(user_id):
+    """The user's current token version, or None if they cannot sign in."""
+    key = token_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = (
+            User.objects.filter(pk=user_id, is_active=True)
+            .values_list("token_version", flat=True)
+            .first()
+        )
+        if version is None:
+            version = _NO_VERSION
+        cache.set(key, version, settings.TOKEN_VERSION_CACHE_SECONDS)
+    return None if version == _NO_VERSION else version
+
+
+def issue_tokens(user):
+    refresh = RefreshToken.for_user(user)
+    refresh[VERSION_CLAIM] = user.token_version
+    return refresh
+
+
+def rotate_refresh_token(raw):
+    """Return a new refresh token for ``raw``, which may not be used again.
+
+    Raises ``TokenError`` for invalid, reused or revoked tokens.
+    """
+    refresh = RefreshToken(raw)
+    user_id = refresh[api_settings.USER_ID_CLAIM]
+    current = token_version(user_id)
+    if current is None or refresh.get(VERSION_CLAIM, 0) != current:
+        raise TokenError("Token has been revoked.")
+    try:
+        with transaction.atomic():
+            UsedRefreshToken.objects.create(
+                jti=refresh["jti"],
+                expires_at=datetime.fromtimestamp(refresh["exp"], tz=dt_timezone.utc),
+            )
+    except IntegrityError:
+        raise TokenError("Token has already been used.")
+    UsedRefreshToken.objects.filter(expires_at__lt=timezone.now()).delete()
+    refresh.set_jti()
+    refresh.set_exp()
+    refresh.set_iat()
+    return refresh
+
+
+def revoke_tokens(user):
+    """Invalidate every access and refresh token issued to ``user``."""
+    User.objects.filter(pk=user.pk).update(token_version=F("token_version") + 1)
+    user.refresh_from_db(fields=["token_version"])
+    cache.delete(token_version_key(user.pk))
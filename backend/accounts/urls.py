@@ -3,6 +3,9 @@ from . import views
 
 urlpatterns = [
     path("register/", views.register, name="register"),
+    path("register/bulk/", views.register_bulk, name="register-bulk"),
     path("login/", views.login, name="login"),
+    path("refresh/", views.refresh, name="token-refresh"),
+    path("revoke/", views.revoke, name="token-revoke"),
     path("me/", views.me, name="me"),
 ]
@@ -2,10 +2,12 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
 
 from .models import User
+from .provisioning import ProvisioningError, provision_users
 from .serializers import UserSerializer, RegisterSerializer
+from .tokens import issue_tokens, revoke_tokens, rotate_refresh_token
 
 
 @api_view(["POST"])
@@ -22,6 +24,34 @@ def register(request):
     return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def register_bulk(request):
+    if request.user.role != User.Role.ADMIN:
+        return Response(
+            {"detail": "Only admins can create users."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    rows = request.data.get("users") if isinstance(request.data, dict) else request.data
+    if not isinstance(rows, list) or not rows:
+        return Response(
+            {"detail": "Provide a non-empty list of users."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        # Hash in this worker; the process pool is for manage.py import_users.
+        users = provision_users(rows, workers=1)
+    except ProvisioningError as exc:
+        return Response(
+            {"detail": f"{exc}; no users were created.", "errors": exc.errors},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return Response(
+        {"created": len(users), "users": UserSerializer(users, many=True).data},
+        status=status.HTTP_201_CREATED,
+    )
+
+
 @api_view(["POST"])
 @permission_classes([AllowAny])
 def login(request):
@@ -44,7 +74,7 @@ def login(request):
             {"detail": "Invalid credentials."},
             status=status.HTTP_401_UNAUTHORIZED,
         )
-    refresh = RefreshToken.for_user(user)
+    refresh = issue_tokens(user)
     return Response({
         "access": str(refresh.access_token),
         "refresh": str(refresh),
@@ -52,6 +82,45 @@ def login(request):
     })
 
 
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def refresh(request):
+    raw = request.data.get("refresh")
+    if not raw:
+        return Response(
+            {"detail": "Refresh token required."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        token = rotate_refresh_token(raw)
+    except TokenError as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_401_UNAUTHORIZED)
+    return Response({"access": str(token.access_token), "refresh": str(token)})
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def revoke(request):
+    """Sign out everywhere; admins may pass ``user_id`` to revoke another user."""
+    user = request.user
+    user_id = request.data.get("user_id")
+    if user_id is not None and str(user_id) != str(user.pk):
+        if user.role != User.Role.ADMIN:
+            return Response(
+                {"detail": "Only admins can revoke other users' tokens."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        try:
+            user = User.objects.get(pk=user_id)
+        except (User.DoesNotExist, ValueError):
+            return Response(
+                {"detail": "User not found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+    revoke_tokens(user)
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def me(request):
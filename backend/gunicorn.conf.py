@@ -0,0 +1,42 @@
+"""Gunicorn settings shared by Docker (entrypoint.sh) and Render.
+
+Command-line flags still take precedence over the values here.
+"""
+import gc
+import os
+import shutil
+import time
+
+_started = time.monotonic()
+
+# Load Django once in the master; forked workers share its memory pages
+# instead of each importing the app.
+preload_app = True
+
+# Workers write Prometheus samples to memory-mapped files here so /metrics can
+# aggregate them. Cleared on every master start so stale pids don't linger.
+multiproc_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", "/tmp/labelforge-prometheus"
+)
+shutil.rmtree(multiproc_dir, ignore_errors=True)
+os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def pre_fork(server, worker):
+    # Keep the preloaded objects out of the collector so it does not touch
+    # (and copy) shared pages in the workers.
+    gc.freeze()
+
+
+def when_ready(server):
+    message = f"Ready in {time.monotonic() - _started:.2f}s"
+    boot_started = os.environ.get("BOOT_STARTED_AT")
+    if boot_started:
+        message += f" ({time.time() - float(boot_started):.2f}s since container start)"
+    server.log.info(message)
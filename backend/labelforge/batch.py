@@ -0,0 +1,115 @@
+"""``POST /api/batch/``: several GET requests in one round trip.
+
+Each sub-request is resolved and dispatched in-process to the normal view,
+authenticated as the batch's user without decoding the token again (DRF's
+``_force_auth_user``). Sub-requests share ``request.batch_cache``, which
+views use for rows several of them need (see ``projects.views._get_dataset``).
+Per-endpoint throttles, query budgets and replica routing apply to each
+sub-request as if it had been sent on its own; middleware does not run again.
+"""
+import json
+from urllib.parse import urlsplit
+
+from django.http import HttpRequest, HttpResponse, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import serializers, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+
+from .budgets import is_overload
+from .db_router import replica_allowed
+
+MAX_SUBREQUESTS = 20
+
+
+def _error(detail):
+    return json.dumps({"detail": detail}).encode()
+
+
+class SubRequestSerializer(serializers.Serializer):
+    path = serializers.CharField()
+
+    def validate_path(self, value):
+        if not value.startswith("/api/"):
+            raise serializers.ValidationError("Only /api/ paths can be batched.")
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True, allow_empty=False, max_length=MAX_SUBREQUESTS)
+
+
+def _subrequest(request, path, match, cache):
+    parts = urlsplit(path)
+    sub = HttpRequest()
+    sub.method = "GET"
+    sub.path = sub.path_info = parts.path
+    sub.META = {
+        key: value for key, value in request.META.items()
+        if key not in ("CONTENT_LENGTH", "CONTENT_TYPE")
+    }
+    sub.META.update(
+        REQUEST_METHOD="GET",
+        PATH_INFO=parts.path,
+        QUERY_STRING=parts.query,
+        HTTP_ACCEPT="application/json",
+    )
+    sub.GET = QueryDict(parts.query)
+    sub.resolver_match = match
+    sub.batch_cache = cache
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    return sub
+
+
+def _run(request, path, cache):
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        return status.HTTP_404_NOT_FOUND, _error("Not found.")
+    if match.func is batch:
+        return status.HTTP_400_BAD_REQUEST, _error("Batches cannot be nested.")
+
+    routing = getattr(request._request, "db_routing", None)
+    if routing is not None:
+        routing.use_replica = replica_allowed(request, match.url_name)
+    budget = getattr(request._request, "query_budget", None)
+    if budget is not None:
+        budget.start(match.url_name)
+    try:
+        response = match.func(_subrequest(request, path, match, cache), *match.args, **match.kwargs)
+    except Exception as exc:
+        if not is_overload(exc):
+            raise
+        return status.HTTP_503_SERVICE_UNAVAILABLE, _error("The request exceeded its database budget.")
+    finally:
+        if routing is not None:
+            routing.use_replica = False
+        if budget is not None:
+            budget.start(request.resolver_match.url_name)
+    if hasattr(response, "render"):
+        response.render()
+    if not response.get("Content-Type", "").startswith("application/json"):
+        return status.HTTP_406_NOT_ACCEPTABLE, _error("Response is not JSON.")
+    return response.status_code, response.content or b"null"
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def batch(request):
+    """Run up to ``MAX_SUBREQUESTS`` GET sub-requests, in order.
+
+    Returns ``{"responses": [{"status": ..., "body": ...}, ...]}`` in the order
+    of ``requests``.
+    """
+    serializer = BatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    cache = {}
+    parts = []
+    for item in serializer.validated_data["requests"]:
+        code, content = _run(request, item["path"], cache)
+        parts.append(b'{"status":%d,"body":%s}' % (code, content))
+    # Sub-responses are already JSON; splice them instead of re-parsing.
+    return HttpResponse(
+        b'{"responses":[' + b",".join(parts) + b"]}", content_type="application/json"
+    )
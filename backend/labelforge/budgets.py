@@ -0,0 +1,156 @@
+"""Per-request query budgets and statement timeouts by endpoint class.
+
+``QueryBudgetMiddleware`` counts the statements and DB time of each request
+against ``QUERY_BUDGETS[endpoint_class]`` and caps every statement at the
+class's ``statement_ms``: with ``SET statement_timeout`` on PostgreSQL, and
+with a progress handler that interrupts the statement on SQLite.
+
+A statement that times out is answered with ``503`` instead of holding the
+worker until gunicorn kills it. Going over the count or total-time budget is
+logged in ``log`` mode; in ``abort`` mode (used by the tests) the next
+statement raises ``QueryBudgetExceeded``, also answered with ``503``.
+"""
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import OperationalError, connections
+from django.http import JsonResponse
+
+from .endpoints import DEFAULT, endpoint_class
+
+logger = logging.getLogger("labelforge.budgets")
+
+# SQLite virtual-machine instructions between deadline checks.
+_PROGRESS_STEPS = 10000
+_PG_QUERY_CANCELED = "57014"
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def is_overload(exc):
+    """Whether ``exc`` is a budget abort or a statement timeout."""
+    if isinstance(exc, QueryBudgetExceeded):
+        return True
+    if not isinstance(exc, OperationalError):
+        return False
+    cause = exc.__cause__
+    code = getattr(cause, "pgcode", None) or getattr(cause, "sqlstate", None)
+    return code == _PG_QUERY_CANCELED or str(exc) == "interrupted"
+
+
+def overload_response():
+    return JsonResponse(
+        {"detail": "The request exceeded its database budget. Narrow it down or try again later."},
+        status=503,
+    )
+
+
+class QueryBudget:
+    """``execute_wrapper`` enforcing one endpoint class's limits."""
+
+    def __init__(self):
+        self.start(None)
+
+    def start(self, url_name):
+        """Reset counters and apply the limits of ``url_name``'s class."""
+        self.endpoint = endpoint_class(url_name) if url_name else DEFAULT
+        limits = settings.QUERY_BUDGETS.get(self.endpoint) or settings.QUERY_BUDGETS[DEFAULT]
+        self.max_queries = limits["queries"]
+        self.max_db_ms = limits["db_ms"]
+        self.statement_ms = limits["statement_ms"]
+        self.count = 0
+        self.db_ms = 0.0
+        self.exceeded = None
+        self.deadline = None
+        # Connections whose statement timeout matches these limits.
+        self._configured = set()
+
+    def _check(self):
+        if self.max_queries is not None and self.count >= self.max_queries:
+            return f"more than {self.max_queries} queries"
+        if self.max_db_ms is not None and self.db_ms > self.max_db_ms:
+            return f"more than {self.max_db_ms} ms in the database"
+        return None
+
+    def _configure(self, connection):
+        if connection.alias in self._configured:
+            return
+        self._configured.add(connection.alias)
+        if connection.vendor == "postgresql":
+            with connection.connection.cursor() as cursor:
+                cursor.execute("SET statement_timeout = %s", [self.statement_ms or 0])
+        elif connection.vendor == "sqlite":
+            connection.connection.set_progress_handler(
+                self._interrupt if self.statement_ms else None, _PROGRESS_STEPS
+            )
+
+    def _interrupt(self):
+        return self.deadline is not None and time.perf_counter() > self.deadline
+
+    @staticmethod
+    def release():
+        for connection in connections.all():
+            if connection.vendor == "sqlite" and connection.connection is not None:
+                connection.connection.set_progress_handler(None, 0)
+
+    def __call__(self, execute, sql, params, many, context):
+        reason = self._check()
+        if reason and not self.exceeded:
+            self.exceeded = reason
+            if settings.QUERY_BUDGET_MODE == "abort":
+                raise QueryBudgetExceeded(f"{self.endpoint} request ran {reason}")
+        self._configure(context["connection"])
+        start = time.perf_counter()
+        if self.statement_ms:
+            self.deadline = start + self.statement_ms / 1000
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.deadline = None
+            self.count += 1
+            self.db_ms += (time.perf_counter() - start) * 1000
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.QUERY_BUDGET_MODE == "off":
+            return self.get_response(request)
+        budget = QueryBudget()
+        request.query_budget = budget
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(budget))
+                response = self.get_response(request)
+        finally:
+            budget.release()
+        if budget.exceeded:
+            match = getattr(request, "resolver_match", None)
+            logger.warning(json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "view": match.url_name if match else None,
+                "endpoint_class": budget.endpoint,
+                "exceeded": budget.exceeded,
+                "queries": budget.count,
+                "db_ms": round(budget.db_ms, 1),
+            }))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        budget = getattr(request, "query_budget", None)
+        if budget is not None:
+            budget.start(request.resolver_match.url_name)
+
+    def process_exception(self, request, exception):
+        if is_overload(exception):
+            return overload_response()
+        return None
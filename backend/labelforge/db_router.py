@@ -0,0 +1,111 @@
+"""Primary/replica routing for read-only endpoints.
+
+``ReplicaRoutingMiddleware`` opens a routing context per request. Reads go to
+``REPLICA_DATABASE`` only when the view is listed in ``REPLICA_READ_VIEWS``,
+the request is a GET/HEAD, and the client has not written recently. Any write
+pins the rest of the request, and the user's next ``REPLICA_PIN_SECONDS``,
+to the primary so users always read their own writes. The pin is keyed by
+user id, so it survives token refreshes.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class RoutingState:
+    __slots__ = ("use_replica", "wrote")
+
+    def __init__(self, use_replica=False):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+_routing = ContextVar("labelforge_db_routing", default=None)
+
+
+@contextmanager
+def routing_context(use_replica=False):
+    state = RoutingState(use_replica)
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if (
+            settings.REPLICA_DATABASE
+            and state is not None
+            and state.use_replica
+            and not state.wrote
+        ):
+            return settings.REPLICA_DATABASE
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != settings.REPLICA_DATABASE
+
+
+def _user_id(request):
+    """The requesting user's id, before or after DRF has authenticated it."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+    parts = request.headers.get("Authorization", "").split()
+    if len(parts) != 2 or parts[0] not in api_settings.AUTH_HEADER_TYPES:
+        return None
+    try:
+        return AccessToken(parts[1]).get(api_settings.USER_ID_CLAIM)
+    except TokenError:
+        return None
+
+
+def _pin_key(request):
+    user_id = _user_id(request)
+    return f"replica-pin:{user_id}" if user_id is not None else None
+
+
+def replica_allowed(request, url_name):
+    """Whether a GET of ``url_name`` may read from the replica for this client."""
+    if not settings.REPLICA_DATABASE or url_name not in settings.REPLICA_READ_VIEWS:
+        return False
+    key = _pin_key(request)
+    return not (key and cache.get(key))
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with routing_context() as state:
+            request.db_routing = state
+            response = self.get_response(request)
+        if state.wrote:
+            key = _pin_key(request)
+            if key:
+                cache.set(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in ("GET", "HEAD"):
+            request.db_routing.use_replica = replica_allowed(
+                request, request.resolver_match.url_name
+            )
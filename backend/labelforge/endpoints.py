@@ -0,0 +1,11 @@
+"""Endpoint classes: URL names that share a throttle rate and query budget."""
+from django.conf import settings
+
+DEFAULT = "default"
+
+
+def endpoint_class(url_name):
+    for name, url_names in settings.ENDPOINT_CLASSES.items():
+        if url_name in url_names:
+            return name
+    return DEFAULT
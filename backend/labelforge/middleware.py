@@ -0,0 +1,121 @@
+import heapq
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import telemetry
+
+logger = logging.getLogger("labelforge.performance")
+slow_logger = logging.getLogger("labelforge.slow_requests")
+
+
+class QueryRecorder:
+    """``execute_wrapper`` that counts and times queries, keeping the slowest few."""
+
+    def __init__(self, keep):
+        self.keep = keep
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if len(self.slowest) < self.keep:
+                heapq.heappush(self.slowest, (elapsed, sql))
+            elif elapsed > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, (elapsed, sql))
+
+
+class PerformanceMiddleware:
+    """Per-request query count, DB/app/render timings and a Server-Timing header.
+
+    Requests slower than ``PERF_SLOW_REQUEST_MS`` are always written to the
+    slow-request log with their slowest statements; other requests are logged
+    at ``PERF_LOG_SAMPLE_RATE``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PERF_INSTRUMENTATION:
+            return self.get_response(request)
+
+        recorder = QueryRecorder(settings.PERF_SLOWEST_QUERIES)
+        request.perf_recorder = recorder
+        request.perf_view_start = request.perf_view_end = None
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        end = time.perf_counter()
+
+        timings = self._timings(request, recorder, start, end)
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={timings["db_ms"]};desc="{recorder.count} queries"',
+            f'app;dur={timings["app_ms"]}',
+            f'render;dur={timings["render_ms"]}',
+            f'total;dur={timings["total_ms"]}',
+        ])
+        match = getattr(request, "resolver_match", None)
+        telemetry.observe_request(
+            match.url_name if match else None, request.method, end - start, recorder.count
+        )
+        self._log(request, response, recorder, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.perf_view_start = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook, so render time starts here.
+        request.perf_view_end = time.perf_counter()
+        return response
+
+    @staticmethod
+    def _timings(request, recorder, start, end):
+        db_ms = recorder.duration * 1000
+        view_start = request.perf_view_start or start
+        view_end = request.perf_view_end or end
+        view_ms = (view_end - view_start) * 1000
+        return {
+            "total_ms": round((end - start) * 1000, 1),
+            "db_ms": round(db_ms, 1),
+            "app_ms": round(max(view_ms - db_ms, 0.0), 1),
+            "render_ms": round((end - view_end) * 1000, 1),
+        }
+
+    @staticmethod
+    def _log(request, response, recorder, timings):
+        slow = timings["total_ms"] >= settings.PERF_SLOW_REQUEST_MS
+        if not slow and random.random() >= settings.PERF_LOG_SAMPLE_RATE:
+            return
+        match = getattr(request, "resolver_match", None)
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.url_name if match else None,
+            "status": response.status_code,
+            "queries": recorder.count,
+            **timings,
+        }
+        if slow:
+            record["slowest_queries"] = [
+                {"ms": round(elapsed * 1000, 1), "sql": sql}
+                for elapsed, sql in sorted(recorder.slowest, reverse=True)
+            ]
+            slow_logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
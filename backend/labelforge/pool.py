@@ -0,0 +1,34 @@
+"""Process pools for CPU-bound batch work run from requests and commands.
+
+Workers are started with the ``spawn`` method rather than forked, so they
+never inherit the parent's database connections, locks or threads (a request
+worker may hold all three). Each one is a fresh interpreter that sets up
+Django before running any task that touches settings or models.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _init_worker():
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "labelforge.settings")
+    django.setup()
+
+
+def pool_map(func, items, workers, min_items):
+    """``[func(item) for item in items]``, across ``workers`` processes.
+
+    Runs serially with one worker or fewer than ``min_items`` items, where
+    pool start-up costs more than it saves. ``func`` must be picklable.
+    """
+    if workers <= 1 or len(items) < min_items:
+        return [func(item) for item in items]
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    ) as pool:
+        return list(pool.map(func, items, chunksize=chunksize))
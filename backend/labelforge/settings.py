@@ -27,6 +27,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "labelforge.middleware.PerformanceMiddleware",
+    "labelforge.db_router.ReplicaRoutingMiddleware",
+    "labelforge.budgets.QueryBudgetMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -79,10 +82,49 @@ else:
         }
     }
 
+# Optional read replica: a second SQLite file (REPLICA_DB_PATH) or PostgreSQL
+# host (POSTGRES_REPLICA_HOST). Routing is done by labelforge.db_router.
+_replica_db_path = os.environ.get("REPLICA_DB_PATH")
+_replica_host = os.environ.get("POSTGRES_REPLICA_HOST")
+if _db_path and _replica_db_path:
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": _replica_db_path,
+        "TEST": {"MIRROR": "default"},
+    }
+elif not _db_path and _replica_host:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": _replica_host,
+        "PORT": os.environ.get("POSTGRES_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        "TEST": {"MIRROR": "default"},
+    }
+
+REPLICA_DATABASE = "replica" if "replica" in DATABASES else None
+DATABASE_ROUTERS = ["labelforge.db_router.PrimaryReplicaRouter"]
+# GET endpoints whose reads may be served by the replica
+REPLICA_READ_VIEWS = {
+    "project-list", "project-detail", "dataset-detail", "task-list",
+    "task-content", "metrics", "agreement", "review-analytics", "rejection-history",
+}
+# After a write, the same client reads from the primary for this long
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", "5"))
+
+# Shared across gunicorn workers on the same host (no external cache service)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CACHE_DIR", "/tmp/labelforge-cache"),
+    }
+}
+
 AUTH_USER_MODEL = "accounts.User"
 
 AUTH_PASSWORD_VALIDATORS = []
 
+# Processes used to hash passwords in manage.py import_users
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
 USE_I18N = True
@@ -95,16 +137,124 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.VersionedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    "DEFAULT_THROTTLE_CLASSES": (
+        "labelforge.throttling.UserThrottle",
+        "labelforge.throttling.EndpointClassThrottle",
+    ),
+}
+
+# Endpoint classes by URL name; anything else is "default". Each class has
+# its own throttle rate and query budget.
+ENDPOINT_CLASSES = {
+    "expensive_read": {
+        "task-list", "task-queue", "review-queue", "metrics", "agreement",
+        "review-analytics", "changes", "rejection-history", "dataset-snapshots",
+    },
+    "workflow_write": {
+        "task-claim", "task-claim-next", "task-submit", "task-approve", "task-reject",
+    },
+    "bulk": {"task-bulk-create", "task-bulk-op", "dataset-clone", "register-bulk"},
+}
+
+# Token-bucket throttles (labelforge/throttling.py), shared by the workers
+# through a SQLite file. "<n>/<sec|min|hour|day>"; empty disables a class.
+THROTTLE_DB_PATH = os.environ.get(
+    "THROTTLE_DB_PATH", os.path.join(CACHES["default"]["LOCATION"], "throttle.sqlite3")
+)
+THROTTLE_RATES = {
+    "user": os.environ.get("THROTTLE_USER_RATE", "600/min"),
+    "anon": os.environ.get("THROTTLE_ANON_RATE", "60/min"),
+    "expensive_read": os.environ.get("THROTTLE_READ_RATE", "60/min"),
+    "workflow_write": os.environ.get("THROTTLE_WRITE_RATE", "120/min"),
+    "bulk": os.environ.get("THROTTLE_BULK_RATE", "30/min"),
+}
+
+# Per-request query budgets (labelforge/budgets.py): statement count, total DB
+# milliseconds and a per-statement timeout; None is unlimited. Over-budget
+# requests are logged ("log") or answered with 503 ("abort").
+QUERY_BUDGET_MODE = os.environ.get("QUERY_BUDGET_MODE", "log")
+QUERY_BUDGETS = {
+    "default": {"queries": 50, "db_ms": 5000, "statement_ms": 5000},
+    "expensive_read": {"queries": 50, "db_ms": 30000, "statement_ms": 20000},
+    "workflow_write": {"queries": 30, "db_ms": 5000, "statement_ms": 5000},
+    "bulk": {"queries": None, "db_ms": None, "statement_ms": 60000},
 }
 
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(hours=12),
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=int(os.environ.get("ACCESS_TOKEN_MINUTES", "720"))),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
 }
+# Upper bound on how long token refresh may use a stale is_active/token_version
+TOKEN_VERSION_CACHE_SECONDS = int(os.environ.get("TOKEN_VERSION_CACHE_SECONDS", "300"))
 
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_EXPOSE_HEADERS = ["Server-Timing", "Retry-After"]
+
+# Per-request performance instrumentation (see labelforge.middleware)
+PERF_INSTRUMENTATION = os.environ.get("PERF_INSTRUMENTATION", "True").lower() in ("true", "1", "yes")
+PERF_SLOW_REQUEST_MS = float(os.environ.get("PERF_SLOW_REQUEST_MS", "500"))
+PERF_LOG_SAMPLE_RATE = float(os.environ.get("PERF_LOG_SAMPLE_RATE", "0.01"))
+PERF_SLOWEST_QUERIES = 5
+
+# Optional bearer token protecting the Prometheus /metrics endpoint
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+# Claims older than this with no submission count as expired leases in /metrics
+TASK_LEASE_MINUTES = int(os.environ.get("TASK_LEASE_MINUTES", "120"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "labelforge": {
+            "handlers": ["console"],
+            "level": os.environ.get("LABELFORGE_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
+# Task import: near-duplicate detection (off | flag | skip)
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "1000"))
+DEDUP_MODE = os.environ.get("DEDUP_MODE", "flag")
+DEDUP_JACCARD_THRESHOLD = float(os.environ.get("DEDUP_JACCARD_THRESHOLD", "0.8"))
+DEDUP_NUM_PERM = 128
+DEDUP_BANDS = 16
+# Processes used to compute text features for large imports.
+PREPROCESS_WORKERS = int(os.environ.get("PREPROCESS_WORKERS", str(os.cpu_count() or 1)))
+
+# Long task texts: list endpoints return a preview; texts longer than
+# TEXT_BLOB_THRESHOLD characters (0 = never) are moved to a content-addressed
+# blob store on disk.
+TEXT_PREVIEW_CHARS = int(os.environ.get("TEXT_PREVIEW_CHARS", "500"))
+TEXT_BLOB_THRESHOLD = int(os.environ.get("TEXT_BLOB_THRESHOLD", "0"))
+TEXT_BLOB_DIR = os.environ.get("TEXT_BLOB_DIR", str(BASE_DIR / "blobs"))
+
+# Immutable dataset snapshots for training jobs (see projects.snapshots)
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", str(BASE_DIR / "snapshots"))
+
+# Opt-in flat serialization for task lists (uses orjson when installed)
+FAST_LIST_SERIALIZATION = os.environ.get("FAST_LIST_SERIALIZATION", "False").lower() in ("true", "1", "yes")
+
+# Active learning and pre-labels: hashed-feature classifier per dataset
+ACTIVE_LEARNING_FEATURES = 2 ** 16
+ACTIVE_LEARNING_BATCH_SIZE = int(os.environ.get("ACTIVE_LEARNING_BATCH_SIZE", "1000"))
+PRELABEL_MIN_EXAMPLES = int(os.environ.get("PRELABEL_MIN_EXAMPLES", "20"))
+# Rescore every open task once the model has trained on this fraction more
+# approvals than at its last full rescore; otherwise only unscored tasks
+ACTIVE_LEARNING_RESCORE_FRACTION = float(os.environ.get("ACTIVE_LEARNING_RESCORE_FRACTION", "0.1"))
+SCORE_TASKS_ON_IMPORT = os.environ.get("SCORE_TASKS_ON_IMPORT", "True").lower() in ("true", "1", "yes")
+# Background command processes (scoring, snapshots) one web worker may run at once.
+BACKGROUND_MAX_PROCESSES = int(os.environ.get("BACKGROUND_MAX_PROCESSES", "2"))
+
+# Sampled review: weight of the latest review in an annotator's trust score,
+# and how long unsampled submissions wait before auto_approve accepts them.
+REVIEW_TRUST_ALPHA = float(os.environ.get("REVIEW_TRUST_ALPHA", "0.1"))
+AUTO_APPROVE_DELAY_MINUTES = int(os.environ.get("AUTO_APPROVE_DELAY_MINUTES", "10"))
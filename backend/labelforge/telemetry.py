@@ -0,0 +1,143 @@
+"""Prometheus metrics for operations, exposed at ``/metrics``.
+
+Under gunicorn, ``PROMETHEUS_MULTIPROC_DIR`` is set (see ``gunicorn.conf.py``)
+and each worker writes its samples to memory-mapped files in that directory.
+The scrape view merges them with ``MultiProcessCollector``, so counts are
+correct whichever worker answers. Queue depths and expired leases are read
+from the database at scrape time.
+"""
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Exists, OuterRef
+from django.http import HttpResponse
+from django.utils import timezone
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+    generate_latest, multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+REQUEST_LATENCY = Histogram(
+    "labelforge_request_duration_seconds",
+    "Request latency by URL name.",
+    ["view", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+DB_QUERIES = Counter(
+    "labelforge_db_queries_total",
+    "SQL statements executed, by URL name.",
+    ["view"],
+)
+TASK_TRANSITIONS = Counter(
+    "labelforge_task_transitions_total",
+    "Task workflow transitions.",
+    ["transition"],
+)
+
+
+def observe_request(view, method, seconds, queries):
+    view = view or "unresolved"
+    REQUEST_LATENCY.labels(view, method).observe(seconds)
+    DB_QUERIES.labels(view).inc(queries)
+
+
+def record_transition(transition, count=1):
+    TASK_TRANSITIONS.labels(transition).inc(count)
+
+
+class QueueDepthCollector:
+    """Unclaimed (annotation) and submitted (review) backlog per dataset."""
+
+    def collect(self):
+        from projects.models import Task
+
+        annotation = GaugeMetricFamily(
+            "labelforge_annotation_queue_depth",
+            "Unclaimed tasks per dataset.",
+            labels=["dataset_id"],
+        )
+        review = GaugeMetricFamily(
+            "labelforge_review_queue_depth",
+            "Submitted tasks awaiting review per dataset.",
+            labels=["dataset_id"],
+        )
+        rows = (
+            Task.objects.filter(status__in=[Task.Status.UNCLAIMED, Task.Status.SUBMITTED])
+            .values("dataset_id", "status")
+            .annotate(n=Count("id"))
+            .order_by()
+        )
+        for row in rows:
+            family = annotation if row["status"] == Task.Status.UNCLAIMED else review
+            family.add_metric([str(row["dataset_id"])], row["n"])
+        yield annotation
+        yield review
+
+
+class ExpiredLeaseCollector:
+    """In-progress work claimed more than ``TASK_LEASE_MINUTES`` ago, per dataset.
+
+    Claims are not revoked, so this is a gauge of abandoned work rather than a
+    counter of expirations. A task's lease starts at its latest claim or
+    reassignment event. A redundancy assignment's lease starts when the
+    assignment is created.
+    """
+
+    def collect(self):
+        from projects.models import Task, TaskAssignment, TaskEvent
+
+        cutoff = timezone.now() - timedelta(minutes=settings.TASK_LEASE_MINUTES)
+        recent_claim = TaskEvent.objects.filter(
+            task=OuterRef("pk"),
+            kind__in=[TaskEvent.Kind.CLAIMED, TaskEvent.Kind.REASSIGNED],
+            created_at__gte=cutoff,
+        )
+        tasks = (
+            Task.objects.filter(status=Task.Status.IN_PROGRESS)
+            .exclude(Exists(recent_claim))
+            .values_list("dataset_id")
+            .annotate(n=Count("id"))
+            .order_by()
+        )
+        assignments = (
+            TaskAssignment.objects.filter(
+                status=TaskAssignment.Status.IN_PROGRESS, created_at__lt=cutoff
+            )
+            .values_list("task__dataset_id")
+            .annotate(n=Count("id"))
+            .order_by()
+        )
+        counts = {}
+        for dataset_id, n in [*tasks, *assignments]:
+            counts[dataset_id] = counts.get(dataset_id, 0) + n
+        expired = GaugeMetricFamily(
+            "labelforge_expired_leases",
+            f"In-progress tasks and assignments claimed over {settings.TASK_LEASE_MINUTES} minutes ago.",
+            labels=["dataset_id"],
+        )
+        for dataset_id, n in sorted(counts.items()):
+            expired.add_metric([str(dataset_id)], n)
+        yield expired
+
+
+def _registry():
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponse(status=401)
+    registry = _registry()
+    output = generate_latest(registry)
+    queue_registry = CollectorRegistry()
+    queue_registry.register(QueueDepthCollector())
+    queue_registry.register(ExpiredLeaseCollector())
+    output += generate_latest(queue_registry)
+    return HttpResponse(output, content_type=CONTENT_TYPE_LATEST)
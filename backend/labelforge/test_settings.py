@@ -6,3 +6,15 @@ DATABASES = {
         "NAME": ":memory:",
     }
 }
+REPLICA_DATABASE = None
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+SCORE_TASKS_ON_IMPORT = False
+PERF_LOG_SAMPLE_RATE = 0
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+THROTTLE_DB_PATH = ":memory:"
+THROTTLE_RATES = {}
+QUERY_BUDGET_MODE = "abort"
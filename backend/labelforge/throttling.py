@@ -0,0 +1,112 @@
+"""Token-bucket request throttling shared by all gunicorn workers.
+
+Buckets live in a small SQLite file (``THROTTLE_DB_PATH``) on local disk, so
+every worker on the host draws from the same budget without a cache server.
+Each check is one ``BEGIN IMMEDIATE`` transaction: refill the bucket for the
+time elapsed, take a token, write it back.
+
+``UserThrottle`` applies the ``user`` rate (``anon`` per client IP) to every
+request; ``EndpointClassThrottle`` adds the budget of the endpoint's class
+(``ENDPOINT_CLASSES``). Rates use DRF's ``"<n>/<period>"`` syntax: a bucket
+holds ``n`` requests and refills at ``n`` per period. A scope without a rate
+is not throttled. Rejected requests get ``429`` with ``Retry-After``.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from .endpoints import endpoint_class
+
+_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_local = threading.local()
+
+
+def parse_rate(rate):
+    """``"120/min"`` -> ``(120, 60)``."""
+    num, period = rate.split("/")
+    return int(num), _PERIODS[period[0]]
+
+
+def _connection():
+    path = settings.THROTTLE_DB_PATH
+    if getattr(_local, "path", None) != path:
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Losing the last few bucket updates in a crash is harmless.
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS bucket ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        _local.conn, _local.path = conn, path
+    return _local.conn
+
+
+def take(key, capacity, period, now=None):
+    """Take one token from ``key``'s bucket.
+
+    Returns 0 when the request is allowed, otherwise the seconds until the
+    bucket holds a whole token again.
+    """
+    now = time.time() if now is None else now
+    refill = capacity / period
+    conn = _connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT tokens, updated FROM bucket WHERE key = ?", (key,)
+        ).fetchone()
+        tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * refill)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / refill
+        conn.execute(
+            "INSERT OR REPLACE INTO bucket (key, tokens, updated) VALUES (?, ?, ?)",
+            (key, tokens, now),
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return wait
+
+
+class TokenBucketThrottle(BaseThrottle):
+    def get_scope(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self._wait = 0.0
+        scope = self.get_scope(request, view)
+        rate = settings.THROTTLE_RATES.get(scope) if scope else None
+        if not rate:
+            return True
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"ip:{self.get_ident(request)}"
+        self._wait = take(f"{scope}:{ident}", *parse_rate(rate))
+        return self._wait == 0
+
+    def wait(self):
+        return self._wait
+
+
+class UserThrottle(TokenBucketThrottle):
+    def get_scope(self, request, view):
+        return "user" if request.user and request.user.is_authenticated else "anon"
+
+
+class EndpointClassThrottle(TokenBucketThrottle):
+    def get_scope(self, request, view):
+        match = request.resolver_match
+        return endpoint_class(match.url_name) if match else None
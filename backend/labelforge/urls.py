@@ -2,6 +2,9 @@ from django.contrib import admin
 from django.urls import path, include
 from django.http import JsonResponse
 
+from .batch import batch
+from .telemetry import metrics_view
+
 
 def health(request):
     return JsonResponse({"status": "ok"})
@@ -9,7 +12,9 @@ def health(request):
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("health", health),
+    path("health", health, name="health"),
+    path("metrics", metrics_view, name="prometheus-metrics"),
+    path("api/batch/", batch, name="batch"),
     path("api/auth/", include("accounts.urls")),
     path("api/", include("projects.urls")),
 ]
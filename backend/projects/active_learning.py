@@ -0,0 +1,259 @@
+"""Local hashed-feature classifier for task queues and pre-labels.
+
+Texts are hashed into a fixed-size sparse feature space (word unigrams and
+bigrams), so the model never needs a vocabulary and can be trained one batch
+at a time. Weights live in ``LabelModel`` rows; everything runs in-process.
+Its outputs (uncertainty, suggested label) are cached on ``Task`` rows by the
+``score_tasks`` command so requests only ever read columns.
+"""
+import re
+import zlib
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from . import background
+from .blobstore import get_blob_store
+from .models import LabelModel, Task
+
+_TOKEN = re.compile(r"\w+")
+
+
+def featurize(texts, n_features):
+    """Return ``(indptr, indices, values)`` CSR arrays for ``texts``."""
+    indptr = [0]
+    indices = []
+    values = []
+    for text in texts:
+        tokens = _TOKEN.findall(text.lower())
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        counts = {}
+        for gram in grams:
+            h = zlib.crc32(gram.encode("utf-8")) % n_features
+            counts[h] = counts.get(h, 0) + 1
+        row = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        norm = np.sqrt((row ** 2).sum()) or 1.0
+        indices.extend(counts.keys())
+        values.extend((row / norm).tolist())
+        indptr.append(len(indices))
+    return (
+        np.asarray(indptr, dtype=np.int64),
+        np.asarray(indices, dtype=np.int64),
+        np.asarray(values, dtype=np.float32),
+    )
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class OnlineClassifier:
+    """Multinomial logistic regression trained by plain SGD."""
+
+    def __init__(self, labels, n_features, weights=None, learning_rate=0.5):
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.learning_rate = learning_rate
+        n_labels = len(self.labels)
+        if weights is not None:
+            flat = np.frombuffer(bytes(weights), dtype=np.float32)
+            self.coef = flat[:-n_labels].reshape(n_labels, n_features).copy()
+            self.intercept = flat[-n_labels:].copy()
+        else:
+            self.coef = np.zeros((n_labels, n_features), dtype=np.float32)
+            self.intercept = np.zeros(n_labels, dtype=np.float32)
+
+    def to_bytes(self):
+        return self.coef.tobytes() + self.intercept.tobytes()
+
+    def partial_fit(self, texts, labels):
+        label_index = {label: i for i, label in enumerate(self.labels)}
+        indptr, indices, values = featurize(texts, self.n_features)
+        for row, label in enumerate(labels):
+            start, end = indptr[row], indptr[row + 1]
+            idx, val = indices[start:end], values[start:end]
+            probs = _softmax(self.coef[:, idx] @ val + self.intercept)
+            probs[label_index[label]] -= 1.0
+            self.coef[:, idx] -= self.learning_rate * np.outer(probs, val)
+            self.intercept -= self.learning_rate * probs
+
+    def predict_proba(self, texts):
+        indptr, indices, values = featurize(texts, self.n_features)
+        n_rows = len(indptr) - 1
+        rows = np.repeat(np.arange(n_rows), np.diff(indptr))
+        logits = np.empty((n_rows, len(self.labels)), dtype=np.float32)
+        for label in range(len(self.labels)):
+            logits[:, label] = np.bincount(
+                rows, weights=self.coef[label, indices] * values, minlength=n_rows
+            )
+        return _softmax(logits + self.intercept)
+
+
+def uncertainty(probs):
+    """Normalized entropy in [0, 1]; 1 means the model has no idea."""
+    if probs.shape[1] < 2:
+        return np.zeros(len(probs), dtype=np.float32)
+    entropy = -(probs * np.log(np.clip(probs, 1e-12, 1.0))).sum(axis=1)
+    return entropy / np.log(probs.shape[1])
+
+
+def load_classifier(dataset):
+    """Return ``(LabelModel, OnlineClassifier)``, resetting on label changes.
+
+    The model row is locked until the caller's transaction ends, so
+    concurrent runs train one after the other from each other's watermark.
+    """
+    n_features = settings.ACTIVE_LEARNING_FEATURES
+    state, _ = LabelModel.objects.select_for_update().get_or_create(
+        dataset=dataset, defaults={"labels": dataset.labels, "n_features": n_features}
+    )
+    if state.labels != dataset.labels or state.n_features != n_features:
+        state.labels = dataset.labels
+        state.n_features = n_features
+        state.weights = None
+        state.trained_until = None
+        state.trained_examples = 0
+        state.rescored_examples = None
+    return state, OnlineClassifier(state.labels, state.n_features, state.weights)
+
+
+def train(dataset, state, classifier, batch_size=None):
+    """Fit on approvals newer than the model's watermark. Returns examples seen."""
+    batch_size = batch_size or settings.ACTIVE_LEARNING_BATCH_SIZE
+    approved = Task.objects.filter(
+        dataset=dataset,
+        status=Task.Status.APPROVED,
+        reviewed_at__isnull=False,
+        annotation__label__in=state.labels,
+    ).order_by("reviewed_at", "id")
+    if state.trained_until:
+        approved = approved.filter(reviewed_at__gt=state.trained_until)
+
+    # text_content is only a preview for blob-stored texts.
+    store = get_blob_store()
+    seen = 0
+    batch = []
+    for text, blob, annotation, reviewed_at in approved.values_list(
+        "text_content", "text_blob", "annotation", "reviewed_at"
+    ).iterator(chunk_size=batch_size):
+        batch.append((store.read_text(blob) if blob else text, annotation["label"]))
+        state.trained_until = reviewed_at
+        if len(batch) >= batch_size:
+            classifier.partial_fit(*zip(*batch))
+            seen += len(batch)
+            batch = []
+    if batch:
+        classifier.partial_fit(*zip(*batch))
+        seen += len(batch)
+    return seen
+
+
+def needs_full_rescore(state):
+    """Whether the model has changed enough to rescore tasks already scored.
+
+    True for a model that has never rescored every open task, when
+    suggestions switch on, and after ``ACTIVE_LEARNING_RESCORE_FRACTION``
+    more approvals than at the last full rescore.
+    """
+    last = state.rescored_examples
+    if last is None:
+        return True
+    if last < settings.PRELABEL_MIN_EXAMPLES <= state.trained_examples:
+        return True
+    new = state.trained_examples - last
+    return new > 0 and new >= settings.ACTIVE_LEARNING_RESCORE_FRACTION * last
+
+
+def _write_scores(updates, state):
+    """Save one batch unless a newer model was saved since ``state`` was read."""
+    with transaction.atomic():
+        if state is not None:
+            current = (
+                LabelModel.objects.select_for_update().filter(pk=state.pk)
+                .values_list("updated_at", flat=True).first()
+            )
+            if current != state.updated_at:
+                return False
+        Task.objects.bulk_update(
+            updates, ["uncertainty", "suggested_label", "suggested_confidence"]
+        )
+    return True
+
+
+def score(dataset, classifier, trained_examples, rescore_all=False, batch_size=None, state=None):
+    """Cache uncertainty and pre-labels for the dataset's open tasks in batches.
+
+    Only unscored tasks are touched unless ``rescore_all`` is set (after the
+    model has changed). Suggestions are left blank until the model has seen
+    ``PRELABEL_MIN_EXAMPLES`` approvals. With the ``LabelModel`` ``state``
+    the classifier came from, scoring stops as soon as a newer model has
+    been saved, so a slow run never overwrites a newer run's scores.
+    Returns ``(scored, finished)``.
+    """
+    batch_size = batch_size or settings.ACTIVE_LEARNING_BATCH_SIZE
+    suggest = trained_examples >= settings.PRELABEL_MIN_EXAMPLES
+    tasks = Task.objects.filter(
+        dataset=dataset, status__in=[Task.Status.UNCLAIMED, Task.Status.IN_PROGRESS]
+    )
+    if not rescore_all:
+        tasks = tasks.filter(uncertainty__isnull=True)
+
+    store = get_blob_store()
+    scored = 0
+    last_id = 0
+    while True:
+        rows = list(
+            tasks.filter(id__gt=last_id).order_by("id")
+            .values_list("id", "text_content", "text_blob")[:batch_size]
+        )
+        if not rows:
+            return scored, True
+        ids = [task_id for task_id, _, _ in rows]
+        texts = [store.read_text(blob) if blob else text for _, text, blob in rows]
+        probs = classifier.predict_proba(texts)
+        values = uncertainty(probs)
+        best = probs.argmax(axis=1)
+        updates = []
+        for row, task_id in enumerate(ids):
+            task = Task(id=task_id, uncertainty=float(values[row]))
+            if suggest:
+                task.suggested_label = classifier.labels[best[row]]
+                task.suggested_confidence = round(float(probs[row, best[row]]), 4)
+            updates.append(task)
+        if not _write_scores(updates, state):
+            return scored, False
+        scored += len(rows)
+        last_id = ids[-1]
+
+
+def update_dataset(dataset, rescore_all=False):
+    """Train on new approvals, then score. Returns ``(trained, scored)``.
+
+    Tasks that already have scores are only rescored when
+    ``needs_full_rescore`` says the model has moved enough (or with
+    ``rescore_all``); otherwise just unscored tasks are scored.
+    """
+    with transaction.atomic():
+        state, classifier = load_classifier(dataset)
+        trained = train(dataset, state, classifier)
+        if trained or state.weights is None:
+            state.weights = classifier.to_bytes()
+            state.trained_examples += trained
+            state.save()
+    full = rescore_all or needs_full_rescore(state)
+    scored, finished = score(
+        dataset, classifier, state.trained_examples, rescore_all=full, state=state
+    )
+    if full and finished:
+        LabelModel.objects.filter(pk=state.pk, updated_at=state.updated_at).update(
+            rescored_examples=state.trained_examples
+        )
+    return trained, scored
+
+
+def schedule_scoring(dataset_id):
+    """Run ``score_tasks`` for one dataset in a background process."""
+    background.schedule("score_tasks", dataset_id)
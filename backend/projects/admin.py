@@ -1,23 +1,132 @@
-from django.contrib import admin
-from .models import Project, Dataset, Task, Comment
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.utils.functional import cached_property
+
+from accounts.models import User
+from . import bulk_ops
+from .models import AnnotatorTrust, Project, Dataset, Task, Comment
+
+
+class EstimatedCountPaginator(Paginator):
+    """Avoids ``COUNT(*)`` over very large tables.
+
+    Unfiltered changelists on PostgreSQL use the planner's row estimate
+    (``pg_class.reltuples``); filtered ones count at most ``COUNT_LIMIT``
+    rows, so the last pages beyond that are not linked.
+    """
+
+    COUNT_LIMIT = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where and connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.COUNT_LIMIT:
+                return row[0]
+        return queryset.values("pk")[:self.COUNT_LIMIT].count()
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
     list_display = ("name", "created_by", "created_at")
+    list_select_related = ("created_by",)
+    search_fields = ("name",)
 
 
 @admin.register(Dataset)
 class DatasetAdmin(admin.ModelAdmin):
-    list_display = ("name", "project", "created_at")
+    list_display = (
+        "name", "project", "priority", "weight", "daily_quota", "review_policy", "created_at",
+    )
+    list_select_related = ("project",)
+    search_fields = ("name", "project__name")
+    autocomplete_fields = ("project",)
+
+
+class TaskActionForm(ActionForm):
+    assignee = forms.ModelChoiceField(
+        User.objects.filter(
+            role__in=[User.Role.ANNOTATOR, User.Role.ADMIN], is_active=True
+        ).order_by("username"),
+        required=False,
+        help_text="Used by the reassign action.",
+    )
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
-    list_display = ("id", "dataset", "status", "assigned_to", "submitted_at")
-    list_filter = ("status",)
+class TaskAdmin(LargeTableAdmin):
+    list_display = ("id", "dataset", "status", "priority", "assigned_to", "submitted_at")
+    list_select_related = ("dataset__project", "assigned_to")
+    # (status, id) and (dataset, status, ...) indexes back these filters.
+    list_filter = ("status", "needs_review", "dataset")
+    autocomplete_fields = ("dataset", "assigned_to", "reviewed_by")
+    raw_id_fields = ("duplicate_of",)
+    action_form = TaskActionForm
+    actions = ("reset_to_unclaimed", "reassign")
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if match and match.url_name.endswith("_changelist"):
+            queryset = queryset.defer("text_content")
+        return queryset
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, Task.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            bulk_ops.delete(queryset, request.user)
+
+    @admin.action(description="Reset selected tasks to unclaimed")
+    def reset_to_unclaimed(self, request, queryset):
+        with transaction.atomic():
+            count = bulk_ops.reset_to_unclaimed(queryset, request.user)
+        self.message_user(request, f"Reset {count} tasks to unclaimed.")
+
+    @admin.action(description="Reassign in-progress tasks to the chosen annotator")
+    def reassign(self, request, queryset):
+        try:
+            assignee = self.action_form.base_fields["assignee"].clean(request.POST.get("assignee"))
+        except ValidationError:
+            assignee = None
+        if assignee is None:
+            self.message_user(request, "Choose an assignee first.", messages.ERROR)
+            return
+        with transaction.atomic():
+            count = bulk_ops.reassign(queryset, assignee, request.user)
+        self.message_user(request, f"Reassigned {count} tasks to {assignee.username}.")
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     list_display = ("id", "task", "author", "created_at")
+    list_select_related = ("task", "author")
+    autocomplete_fields = ("author",)
+    raw_id_fields = ("task",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer("task__text_content")
+
+
+@admin.register(AnnotatorTrust)
+class AnnotatorTrustAdmin(admin.ModelAdmin):
+    list_display = ("annotator", "score", "reviews", "updated_at")
+    list_select_related = ("annotator",)
+    search_fields = ("annotator__username",)
+    readonly_fields = ("score", "reviews", "updated_at")
@@ -0,0 +1,148 @@
+"""Inter-annotator agreement over multi-annotator assignments.
+
+Rows are ``(dataset_id, task_id, annotator_id, label)`` tuples. They are
+factorized into integer codes once, and every statistic is computed from
+NumPy count matrices built with ``bincount``.
+"""
+import numpy as np
+
+
+def _factorize(values):
+    uniques, codes = np.unique(np.asarray(values), return_inverse=True)
+    return uniques, codes.reshape(-1)
+
+
+def count_matrix(item_codes, label_codes, n_labels):
+    """Return an items x labels matrix of annotation counts."""
+    _, items = np.unique(item_codes, return_inverse=True)
+    n_items = int(items.max()) + 1 if len(items) else 0
+    flat = np.bincount(items * n_labels + label_codes, minlength=n_items * n_labels)
+    return flat.reshape(n_items, n_labels)
+
+
+def fleiss_kappa(counts):
+    raters = counts.sum(axis=1)
+    keep = raters >= 2
+    counts, raters = counts[keep], raters[keep]
+    if not len(counts):
+        return None
+    per_item = ((counts ** 2).sum(axis=1) - raters) / (raters * (raters - 1))
+    observed = per_item.mean()
+    proportions = counts.sum(axis=0) / raters.sum()
+    expected = (proportions ** 2).sum()
+    if expected == 1:
+        return None
+    return float((observed - expected) / (1 - expected))
+
+
+def krippendorff_alpha(counts):
+    """Nominal Krippendorff's alpha from an items x labels count matrix."""
+    raters = counts.sum(axis=1)
+    keep = raters >= 2
+    counts, raters = counts[keep], raters[keep]
+    if not len(counts):
+        return None
+    total = raters.sum()
+    coincidence_diag = (counts * (counts - 1) / (raters - 1)[:, None]).sum(axis=0)
+    label_totals = counts.sum(axis=0)
+    expected = (total ** 2 - (label_totals ** 2).sum()) / (total - 1)
+    if expected == 0:
+        return None
+    observed = total - coincidence_diag.sum()
+    return float(1 - observed / expected)
+
+
+def _co_annotations(task_ids, annotator_codes):
+    """Row index pairs ``(left, right)`` where two annotators labelled the same
+    task, with ``annotator_codes[left] < annotator_codes[right]``.
+
+    Only pairs that share a task are generated: rows are grouped by task and
+    each row is paired with the ones after it in its group, one offset at a
+    time (at most the task redundancy).
+    """
+    order = np.lexsort((annotator_codes, task_ids))
+    tasks = task_ids[order]
+    starts = np.flatnonzero(np.r_[True, tasks[1:] != tasks[:-1]])
+    sizes = np.diff(np.r_[starts, len(tasks)])
+    after = np.repeat(starts + sizes, sizes) - np.arange(len(tasks)) - 1
+    left, right = [], []
+    for offset in range(1, int(sizes.max())):
+        first = np.flatnonzero(after >= offset)
+        left.append(order[first])
+        right.append(order[first + offset])
+    if not left:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    left, right = np.concatenate(left), np.concatenate(right)
+    distinct = annotator_codes[left] != annotator_codes[right]
+    return left[distinct], right[distinct]
+
+
+def _pair_kappas(pair_index, labels_a, labels_b, items, n_labels):
+    """Cohen's kappa for every annotator pair at once; ``nan`` when undefined.
+
+    Per pair, observed agreement is the share of shared items with equal
+    labels, and expected agreement comes from each side's label counts.
+    """
+    n_pairs = len(items)
+    agree = np.bincount(pair_index, weights=labels_a == labels_b, minlength=n_pairs)
+    counts_a = np.bincount(
+        pair_index * n_labels + labels_a, minlength=n_pairs * n_labels
+    ).reshape(n_pairs, n_labels)
+    counts_b = np.bincount(
+        pair_index * n_labels + labels_b, minlength=n_pairs * n_labels
+    ).reshape(n_pairs, n_labels)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        observed = agree / items
+        expected = (counts_a * counts_b).sum(axis=1) / items.astype(np.float64) ** 2
+        kappas = (observed - expected) / (1 - expected)
+    kappas[expected == 1] = np.nan
+    return kappas
+
+
+def _round(value):
+    return None if value is None or np.isnan(value) else round(float(value), 4)
+
+
+def compute_agreement(rows, min_overlap=2):
+    """Return per-dataset kappa/alpha and per-annotator-pair Cohen's kappa."""
+    if not rows:
+        return {"datasets": [], "pairs": []}
+
+    dataset_ids, task_ids, annotator_ids, labels = zip(*rows)
+    dataset_ids = np.asarray(dataset_ids, dtype=np.int64)
+    task_ids = np.asarray(task_ids, dtype=np.int64)
+    annotator_ids = np.asarray(annotator_ids, dtype=np.int64)
+    label_values, label_codes = _factorize([str(label) for label in labels])
+    n_labels = len(label_values)
+
+    datasets = []
+    for dataset_id in np.unique(dataset_ids):
+        mask = dataset_ids == dataset_id
+        counts = count_matrix(task_ids[mask], label_codes[mask], n_labels)
+        datasets.append({
+            "dataset_id": int(dataset_id),
+            "items": int((counts.sum(axis=1) >= 2).sum()),
+            "annotations": int(mask.sum()),
+            "fleiss_kappa": _round(fleiss_kappa(counts)),
+            "krippendorff_alpha": _round(krippendorff_alpha(counts)),
+        })
+
+    annotators, annotator_codes = _factorize(annotator_ids)
+    left, right = _co_annotations(task_ids, annotator_codes)
+    pair_codes, pair_index = np.unique(
+        annotator_codes[left] * len(annotators) + annotator_codes[right], return_inverse=True
+    )
+    items = np.bincount(pair_index, minlength=len(pair_codes))
+    kappas = _pair_kappas(pair_index, label_codes[left], label_codes[right], items, n_labels)
+
+    pairs = []
+    for code in np.flatnonzero(items >= min_overlap):
+        a, b = divmod(int(pair_codes[code]), len(annotators))
+        pairs.append({
+            "annotator_a": annotators[a].item(),
+            "annotator_b": annotators[b].item(),
+            "items": int(items[code]),
+            "cohen_kappa": _round(kappas[code]),
+        })
+
+    return {"datasets": datasets, "pairs": pairs}
@@ -0,0 +1,155 @@
+"""Review turnaround analytics computed in the database.
+
+Percentiles use ``percentile_cont`` on PostgreSQL. SQLite has no ordered-set
+aggregates, so the fallback ranks rows with ``ROW_NUMBER()``/``COUNT(*)``
+window functions and returns only the (at most two) rows around each
+percentile per group; those are interpolated the way ``percentile_cont``
+does. Task rows are never loaded into Python.
+"""
+from django.db import connection
+from django.db.models import Case, Count, F, IntegerField, Sum, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import TruncDate
+
+PERCENTILES = (0.5, 0.9, 0.99)
+# Lower bounds of the token-count buckets used by ``length_throughput``.
+LENGTH_BUCKETS = (0, 32, 128, 512, 2048)
+
+
+def _seconds_between(start_sql, end_sql):
+    if connection.vendor == "postgresql":
+        return f"EXTRACT(EPOCH FROM ({end_sql} - {start_sql}))"
+    return f"((julianday({end_sql}) - julianday({start_sql})) * 86400.0)"
+
+
+def _column(model, field):
+    return f'"{model._meta.db_table}"."{model._meta.get_field(field).column}"'
+
+
+def _percentile_rows(sql, params):
+    """Yield ``(group_key, n, mean, max, {p: value})`` for a subquery of
+    ``group_key, seconds`` rows."""
+    if connection.vendor == "postgresql":
+        cols = ", ".join(
+            f"percentile_cont({p}) WITHIN GROUP (ORDER BY seconds)" for p in PERCENTILES
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT group_key, COUNT(*), AVG(seconds), MAX(seconds), {cols} "
+                f"FROM ({sql}) s GROUP BY group_key",
+                params,
+            )
+            for key, n, mean, longest, *values in cursor.fetchall():
+                yield key, n, mean, longest, dict(zip(PERCENTILES, values))
+        return
+
+    wanted = " OR ".join(
+        f"i = CAST({p} * (n - 1) AS INTEGER) OR i = CAST({p} * (n - 1) AS INTEGER) + 1"
+        for p in PERCENTILES
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT group_key, n, mean, longest, i, seconds FROM ("
+            f"  SELECT group_key, seconds,"
+            f"    ROW_NUMBER() OVER (PARTITION BY group_key ORDER BY seconds) - 1 AS i,"
+            f"    COUNT(*) OVER (PARTITION BY group_key) AS n,"
+            f"    AVG(seconds) OVER (PARTITION BY group_key) AS mean,"
+            f"    MAX(seconds) OVER (PARTITION BY group_key) AS longest"
+            f"  FROM ({sql}) s"
+            f") r WHERE {wanted} ORDER BY group_key, i",
+            params,
+        )
+        groups = {}
+        for key, n, mean, longest, i, seconds in cursor.fetchall():
+            groups.setdefault(key, (n, mean, longest, {}))[3][i] = seconds
+    for key, (n, mean, longest, ranked) in groups.items():
+        values = {}
+        for p in PERCENTILES:
+            pos = p * (n - 1)
+            lo = int(pos)
+            hi = ranked.get(lo + 1, ranked[lo])
+            values[p] = ranked[lo] + (hi - ranked[lo]) * (pos - lo)
+        yield key, n, mean, longest, values
+
+
+def _summaries(queryset, seconds_sql, seconds_params, group_by):
+    key = F(group_by) if group_by else Value(0)
+    subquery = queryset.annotate(
+        group_key=key, seconds=RawSQL(seconds_sql, seconds_params)
+    ).values("group_key", "seconds").order_by()
+    sql, params = subquery.query.sql_with_params()
+    results = {}
+    for group, n, mean, longest, values in _percentile_rows(sql, params):
+        summary = {
+            "count": n,
+            "mean_seconds": round(float(mean), 1),
+            "max_seconds": round(float(longest), 1),
+        }
+        for p, value in values.items():
+            summary[f"p{round(p * 100)}_seconds"] = round(float(value), 1)
+        results[group] = summary
+    return results
+
+
+def review_latency(tasks, group_by=None):
+    """Seconds from the latest submission to its review.
+
+    A rejected task keeps ``reviewed_at`` until it is resubmitted, so only
+    tasks whose review is at or after their submission are counted.
+    Auto-approvals have no reviewer and are left out.
+    """
+    from .models import Task
+
+    reviewed = tasks.filter(
+        submitted_at__isnull=False, reviewed_at__gte=F("submitted_at"), reviewed_by__isnull=False
+    )
+    seconds = _seconds_between(_column(Task, "submitted_at"), _column(Task, "reviewed_at"))
+    return _summaries(reviewed, seconds, (), group_by)
+
+
+def backlog_age(tasks, now, group_by=None):
+    """Age in seconds of submitted tasks still waiting for review."""
+    from .models import Task
+
+    waiting = tasks.filter(status=Task.Status.SUBMITTED, submitted_at__isnull=False)
+    now_sql = "CAST(%s AS timestamp with time zone)" if connection.vendor == "postgresql" else "%s"
+    seconds = _seconds_between(_column(Task, "submitted_at"), now_sql)
+    return _summaries(
+        waiting, seconds, (connection.ops.adapt_datetimefield_value(now),), group_by
+    )
+
+
+def reviewer_throughput(tasks, since):
+    """Reviews per reviewer, dataset and day since ``since``."""
+    return (
+        tasks.filter(reviewed_by__isnull=False, reviewed_at__gte=since)
+        .annotate(date=TruncDate("reviewed_at"))
+        .values("date", "reviewed_by__username", "dataset_id")
+        .annotate(count=Count("id"))
+        .order_by("date", "reviewed_by__username", "dataset_id")
+    )
+
+
+def length_throughput(tasks, since):
+    """Reviewed tasks, tokens and annotation time per token-count bucket."""
+    bucket = Case(
+        *[When(token_count__gte=low, then=Value(low)) for low in reversed(LENGTH_BUCKETS)],
+        output_field=IntegerField(),
+    )
+    rows = (
+        tasks.filter(reviewed_at__gte=since, token_count__isnull=False)
+        .annotate(bucket=bucket)
+        .values("bucket")
+        .annotate(count=Count("id"), tokens=Sum("token_count"), seconds=Sum("time_spent_seconds"))
+        .order_by("bucket")
+    )
+    upper = dict(zip(LENGTH_BUCKETS, LENGTH_BUCKETS[1:]))
+    return [
+        {
+            "min_tokens": row["bucket"],
+            "max_tokens": upper[row["bucket"]] - 1 if row["bucket"] in upper else None,
+            "reviewed": row["count"],
+            "tokens_per_hour": round(row["tokens"] * 3600 / row["seconds"]) if row["seconds"] else None,
+        }
+        for row in rows
+    ]
@@ -0,0 +1,43 @@
+"""Management commands run in background processes from web requests.
+
+Runs are coalesced per ``(command, dataset)``: while one is in flight,
+further requests only queue a single follow-up run after it. At most
+``BACKGROUND_MAX_PROCESSES`` runs are started at once per web worker.
+"""
+import subprocess
+import sys
+import threading
+
+from django.conf import settings
+
+_lock = threading.Lock()
+# (command, dataset id) -> whether another run was requested meanwhile.
+_pending = {}
+_slots = threading.BoundedSemaphore(settings.BACKGROUND_MAX_PROCESSES)
+
+
+def schedule(command, dataset_id):
+    """Run ``manage.py <command> --dataset <dataset_id>`` in the background."""
+    key = (command, dataset_id)
+    with _lock:
+        if key in _pending:
+            _pending[key] = True
+            return
+        _pending[key] = False
+    threading.Thread(target=_run, args=(key,), daemon=True).start()
+
+
+def _run(key):
+    command, dataset_id = key
+    args = [
+        sys.executable, str(settings.BASE_DIR / "manage.py"),
+        command, "--dataset", str(dataset_id),
+    ]
+    while True:
+        with _slots:
+            subprocess.run(args)
+        with _lock:
+            if not _pending[key]:
+                del _pending[key]
+                return
+            _pending[key] = False
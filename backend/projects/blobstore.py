@@ -0,0 +1,46 @@
+"""Content-addressed, deduplicated storage for large task texts on local disk.
+
+Blobs are stored UTF-8 encoded under ``<root>/<sha[:2]>/<sha[2:4]>/<sha>``.
+Identical texts map to the same file, and files are never modified once
+written, so readers need no locking.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+
+class BlobStore:
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path(self, digest):
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def put(self, text):
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return digest
+
+    def open(self, digest):
+        return open(self.path(digest), "rb")
+
+    def size(self, digest):
+        return self.path(digest).stat().st_size
+
+    def read_text(self, digest):
+        with self.open(digest) as f:
+            return f.read().decode("utf-8")
+
+
+def get_blob_store():
+    return BlobStore(settings.TEXT_BLOB_DIR)
@@ -0,0 +1,195 @@
+"""Set-based task operations shared by the admin and the bulk-op API.
+
+Each function takes a ``Task`` queryset and issues a constant number of
+statements however many rows match; callers run them inside a transaction.
+Events are written with ``INSERT ... SELECT`` before the rows change, while
+the queryset still matches them.
+"""
+from django.db import connection
+from django.db.models import (
+    CharField, Exists, F, Func, JSONField, Max, OuterRef, Q, Value, Window,
+)
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Coalesce, RowNumber
+
+from . import events
+from .models import Comment, LSHBucket, Task, TaskAssignment, TaskFingerprint
+
+RESET_FIELDS = {
+    "status": Task.Status.UNCLAIMED,
+    "assigned_to": None,
+    "annotation": None,
+    "submitted_at": None,
+    "reviewed_by": None,
+    "reviewed_at": None,
+    "time_spent_seconds": 0,
+}
+
+
+class _WithLabel(Func):
+    """``annotation`` with its ``label`` key set; other keys are kept."""
+
+    def __init__(self, label):
+        super().__init__(F("annotation"), Value(label), output_field=JSONField())
+
+    def _compile(self, compiler, template):
+        parts, params = [], []
+        for expression in self.get_source_expressions():
+            sql, expression_params = compiler.compile(expression)
+            parts.append(sql)
+            params.extend(expression_params)
+        return template % tuple(parts), params
+
+    def as_sqlite(self, compiler, connection, **extra):
+        return self._compile(compiler, "json_set(%s, '$.label', %s)")
+
+    def as_postgresql(self, compiler, connection, **extra):
+        return self._compile(compiler, "jsonb_set(%s, '{label}', to_jsonb(%s::text))")
+
+
+def reset_to_unclaimed(tasks, actor=None):
+    """Return tasks to the queue, dropping their work and assignments."""
+    pristine = Q(status=Task.Status.UNCLAIMED) & ~Exists(
+        TaskAssignment.objects.filter(task=OuterRef("pk"))
+    )
+    # Fix the matched ids first: deleting the assignments would make some
+    # of the matched tasks pristine, and the queryset is re-run per statement.
+    ids = list(tasks.exclude(pristine).values_list("id", flat=True))
+    tasks = Task.objects.filter(id__in=ids)
+    events.record_many(tasks, events.Kind.RESET, actor)
+    TaskAssignment.objects.filter(task__in=tasks).delete()
+    return tasks.update(**RESET_FIELDS)
+
+
+def reassign(tasks, assignee, actor=None):
+    """Move in-progress tasks to ``assignee``."""
+    tasks = tasks.filter(status=Task.Status.IN_PROGRESS).exclude(assigned_to=assignee)
+    events.record_many(tasks, events.Kind.REASSIGNED, actor, assignee=assignee.username)
+    return tasks.update(assigned_to=assignee)
+
+
+def relabel(tasks, from_label, to_label=None, actor=None):
+    """Replace ``from_label`` in task and assignment annotations, keeping
+    any other annotation keys.
+
+    With no ``to_label`` the affected tasks are reset to unclaimed instead.
+    Returns ``{"tasks": n, "assignments": m}``.
+    """
+    labelled = tasks.filter(annotation__label=from_label)
+    if to_label is None:
+        return {"tasks": reset_to_unclaimed(labelled, actor), "assignments": 0}
+    events.record_many(
+        labelled, events.Kind.RELABELED, actor, from_label=from_label, to_label=to_label
+    )
+    assignments = TaskAssignment.objects.filter(
+        task__in=tasks, annotation__label=from_label
+    ).update(annotation=_WithLabel(to_label))
+    tasks.filter(suggested_label=from_label).update(suggested_label=to_label)
+    return {"tasks": labelled.update(annotation=_WithLabel(to_label)), "assignments": assignments}
+
+
+def set_priority(tasks, priority):
+    """Set the priority tasks are served in within their dataset."""
+    return tasks.exclude(priority=priority).update(priority=priority)
+
+
+def delete(tasks, actor=None):
+    """Delete tasks and everything attached to them, one statement per table.
+
+    ``QuerySet.delete()`` would load every task to cascade in Python. Task
+    events are kept, with a ``deleted`` event appended for each task.
+    Returns the number of tasks deleted.
+    """
+    events.record_many(tasks, events.Kind.DELETED, actor)
+    ids = tasks.values("id")
+    for model in (Comment, TaskAssignment, TaskFingerprint, LSHBucket):
+        model.objects.filter(task__in=ids).delete()
+    Task.objects.filter(duplicate_of__in=ids).update(duplicate_of=None)
+    sql, params = ids.query.sql_with_params()
+    table = connection.ops.quote_name(Task._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE id IN ({sql})", params)
+        return cursor.rowcount
+
+
+def _ranked_ids(tasks):
+    return tasks.order_by().annotate(
+        rank=Window(RowNumber(), order_by=F("id").asc())
+    ).values("id", "rank")
+
+
+def _copy_dedup_index(source_tasks, new_tasks, target):
+    """Copy fingerprints and LSH buckets onto the cloned tasks.
+
+    Both sets are inserted in id order by one statement, so the n-th new task
+    is the copy of the n-th source task; rows are matched on that rank.
+    """
+    old_sql, old_params = _ranked_ids(source_tasks).query.sql_with_params()
+    new_sql, new_params = _ranked_ids(new_tasks).query.sql_with_params()
+    pairs = f"({new_sql}) n INNER JOIN ({old_sql}) o ON n.rank = o.rank"
+    quote = connection.ops.quote_name
+    fingerprints = quote(TaskFingerprint._meta.db_table)
+    buckets = quote(LSHBucket._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {fingerprints} (task_id, signature) "
+            f"SELECT n.id, f.signature FROM {pairs} "
+            f"INNER JOIN {fingerprints} f ON f.task_id = o.id",
+            (*new_params, *old_params),
+        )
+        cursor.execute(
+            f"INSERT INTO {buckets} (dataset_id, {quote('key')}, task_id) "
+            f"SELECT %s, b.{quote('key')}, n.id FROM {pairs} "
+            f"INNER JOIN {buckets} b ON b.task_id = o.id",
+            (target.pk, *new_params, *old_params),
+        )
+
+
+def clone_tasks(source, target, statuses=None, include_labels=False):
+    """Copy ``source``'s tasks into ``target`` as unclaimed tasks with one
+    ``INSERT ... SELECT``; blob-stored texts share their blobs.
+
+    With ``include_labels`` each task's previous label becomes its suggested
+    label. Near-duplicate fingerprints and LSH buckets are copied too.
+    Returns the number of tasks created.
+    """
+    tasks = Task.objects.filter(dataset=source)
+    if statuses:
+        tasks = tasks.filter(status__in=statuses)
+    if include_labels:
+        suggestion = Coalesce(
+            KeyTextTransform("label", "annotation"), Value(""), output_field=CharField()
+        )
+    else:
+        suggestion = Value("")
+    columns = {
+        "dataset_id": Value(target.pk),
+        "text_content": F("text_content"),
+        "text_length": F("text_length"),
+        "text_blob": F("text_blob"),
+        "content_hash": F("content_hash"),
+        "status": Value(Task.Status.UNCLAIMED),
+        "time_spent_seconds": Value(0),
+        "priority": F("priority"),
+        "token_count": F("token_count"),
+        "language": F("language"),
+        "needs_review": Value(True),
+        "suggested_label": suggestion,
+    }
+    select = tasks.order_by("id").values(
+        **{f"clone_{name}": expr for name, expr in columns.items()}
+    )
+    sql, params = select.query.sql_with_params()
+    last_id = Task.objects.filter(dataset=target).aggregate(last=Max("id"))["last"] or 0
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(Task._meta.db_table)} "
+            f"({', '.join(quote(name) for name in columns)}) {sql}",
+            params,
+        )
+        created = cursor.rowcount
+    new_tasks = Task.objects.filter(dataset=target, id__gt=last_id)
+    _copy_dedup_index(tasks, new_tasks, target)
+    events.record_many(new_tasks, events.Kind.CREATED)
+    return created
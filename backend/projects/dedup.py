@@ -0,0 +1,213 @@
+"""Import-time duplicate detection: exact content hashes plus MinHash/LSH.
+
+Each unique task gets a MinHash signature (``TaskFingerprint``) and one
+``LSHBucket`` row per band. Checking a new text only looks up the buckets it
+falls into, so the cost per imported row does not grow with dataset size.
+"""
+import hashlib
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from django.conf import settings
+
+from .models import Task, TaskFingerprint, LSHBucket
+from .preprocessing import normalize_text
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_LOOKUP_CHUNK = 500
+_MAX_CANDIDATES = 50
+
+
+class MinHasher:
+    def __init__(self, num_perm=128, bands=16, shingle_size=5, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands.")
+        rng = np.random.RandomState(seed)
+        # a, b < 2**32 keeps a * h + b inside uint64 for 32-bit shingle hashes.
+        self.a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+    def signature(self, normalized):
+        k = self.shingle_size
+        shingles = {normalized[i:i + k] for i in range(max(1, len(normalized) - k + 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64, count=len(shingles),
+        )
+        permuted = (np.outer(hashes, self.a) + self.b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def band_keys(self, signature):
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(
+                band.to_bytes(2, "little") + chunk.tobytes(), digest_size=8
+            ).digest()
+            keys.append(int.from_bytes(digest, "little", signed=True))
+        return keys
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+@dataclass
+class DedupResult:
+    content_hash: str
+    signature: Optional[np.ndarray] = None
+    band_keys: Optional[list] = None
+    duplicate_of_id: Optional[int] = None
+    duplicate_of_index: Optional[int] = None
+    similarity: float = 0.0
+
+    @property
+    def is_duplicate(self):
+        return self.duplicate_of_id is not None or self.duplicate_of_index is not None
+
+
+def _chunks(items, size=_LOOKUP_CHUNK):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Deduplicator:
+    """Checks batches of texts against a dataset's hashes and LSH buckets.
+
+    Unique texts are remembered across calls so later batches of the same
+    import see earlier ones without waiting for them to be indexed.
+    """
+
+    def __init__(self, dataset, threshold=None, hasher=None):
+        self.dataset = dataset
+        self.threshold = (
+            settings.DEDUP_JACCARD_THRESHOLD if threshold is None else threshold
+        )
+        self.hasher = hasher or MinHasher(
+            num_perm=settings.DEDUP_NUM_PERM, bands=settings.DEDUP_BANDS
+        )
+        self._pending_hashes = {}
+        self._pending_buckets = {}
+        self._pending_signatures = {}
+
+    def check(self, texts, offset=0, hashes=None):
+        """Return one ``DedupResult`` per text.
+
+        ``offset`` is the position of ``texts[0]`` within the whole import;
+        ``duplicate_of_index`` refers to that global position. ``hashes`` are
+        precomputed content hashes, if the caller already has them.
+        """
+        normalized = [normalize_text(t) for t in texts]
+        if hashes is None:
+            hashes = [hashlib.sha256(n.encode("utf-8")).hexdigest() for n in normalized]
+
+        existing_hashes = {}
+        for chunk in _chunks(set(hashes)):
+            rows = (
+                Task.objects.filter(dataset=self.dataset, content_hash__in=chunk)
+                .order_by("id")
+                .values_list("content_hash", "id")
+            )
+            for h, task_id in rows:
+                existing_hashes.setdefault(h, task_id)
+
+        results = []
+        for norm, h in zip(normalized, hashes):
+            result = DedupResult(content_hash=h)
+            if h in existing_hashes:
+                result.duplicate_of_id = existing_hashes[h]
+                result.similarity = 1.0
+            elif h not in self._pending_hashes:
+                result.signature = self.hasher.signature(norm)
+                result.band_keys = self.hasher.band_keys(result.signature)
+            results.append(result)
+
+        all_keys = {k for r in results if r.band_keys for k in r.band_keys}
+        bucket_members = {}
+        for chunk in _chunks(all_keys):
+            rows = LSHBucket.objects.filter(
+                dataset=self.dataset, key__in=chunk
+            ).values_list("key", "task_id")
+            for key, task_id in rows:
+                bucket_members.setdefault(key, []).append(task_id)
+
+        candidate_ids = {t for members in bucket_members.values() for t in members}
+        stored_signatures = {}
+        for chunk in _chunks(candidate_ids):
+            rows = TaskFingerprint.objects.filter(task_id__in=chunk).values_list(
+                "task_id", "signature"
+            )
+            for task_id, sig in rows:
+                stored_signatures[task_id] = np.frombuffer(bytes(sig), dtype=np.uint32)
+
+        for position, result in enumerate(results, start=offset):
+            if result.duplicate_of_id is not None:
+                continue
+            if result.content_hash in self._pending_hashes:
+                result.duplicate_of_index = self._pending_hashes[result.content_hash]
+                result.similarity = 1.0
+                continue
+            self._match_candidates(result, bucket_members, stored_signatures)
+            if not result.is_duplicate:
+                self._remember(position, result)
+        return results
+
+    def _match_candidates(self, result, bucket_members, stored_signatures):
+        seen = set()
+        best = (0.0, None, None)
+        for key in result.band_keys:
+            for task_id in bucket_members.get(key, ()):
+                if ("t", task_id) in seen or len(seen) >= _MAX_CANDIDATES:
+                    continue
+                seen.add(("t", task_id))
+                sig = stored_signatures.get(task_id)
+                if sig is not None:
+                    score = self.hasher.similarity(result.signature, sig)
+                    if score > best[0]:
+                        best = (score, task_id, None)
+            for index in self._pending_buckets.get(key, ()):
+                if ("i", index) in seen or len(seen) >= _MAX_CANDIDATES:
+                    continue
+                seen.add(("i", index))
+                score = self.hasher.similarity(
+                    result.signature, self._pending_signatures[index]
+                )
+                if score > best[0]:
+                    best = (score, None, index)
+
+        score, task_id, index = best
+        if score >= self.threshold:
+            result.duplicate_of_id = task_id
+            result.duplicate_of_index = index
+            result.similarity = score
+
+    def _remember(self, position, result):
+        self._pending_hashes[result.content_hash] = position
+        self._pending_signatures[position] = result.signature
+        for key in result.band_keys:
+            self._pending_buckets.setdefault(key, []).append(position)
+
+
+def index_tasks(dataset, pairs):
+    """Store fingerprints and LSH buckets for ``(task, DedupResult)`` pairs."""
+    fingerprints = []
+    buckets = []
+    for task, result in pairs:
+        if result.signature is None or result.is_duplicate:
+            continue
+        fingerprints.append(
+            TaskFingerprint(task=task, signature=result.signature.tobytes())
+        )
+        buckets.extend(
+            LSHBucket(dataset=dataset, key=key, task=task) for key in result.band_keys
+        )
+    TaskFingerprint.objects.bulk_create(fingerprints, batch_size=1000)
+    LSHBucket.objects.bulk_create(buckets, batch_size=1000)
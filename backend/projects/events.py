@@ -0,0 +1,93 @@
+"""Writing to the append-only ``TaskEvent`` log.
+
+Call these inside the transaction that performs the transition, so an event
+exists exactly when its change is committed.
+"""
+import heapq
+import json
+from itertools import islice
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import TaskEvent
+
+Kind = TaskEvent.Kind
+
+
+def record(task, kind, actor=None, **data):
+    return TaskEvent.objects.create(
+        task=task, dataset_id=task.dataset_id, kind=kind, actor=actor, data=data
+    )
+
+
+def record_many(tasks, kind, actor=None, **data):
+    """Record one event per task in the ``tasks`` queryset with a single
+    ``INSERT ... SELECT``; returns the number of events written."""
+    select_sql, select_params = (
+        tasks.order_by("id").values("id", "dataset_id").query.sql_with_params()
+    )
+    json_sql = "CAST(%s AS jsonb)" if connection.vendor == "postgresql" else "%s"
+    table = connection.ops.quote_name(TaskEvent._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (task_id, dataset_id, kind, actor_id, data, created_at) "
+            f"SELECT s.id, s.dataset_id, %s, %s, {json_sql}, %s FROM ({select_sql}) s",
+            (
+                kind,
+                actor.pk if actor is not None else None,
+                json.dumps(data),
+                connection.ops.adapt_datetimefield_value(timezone.now()),
+                *select_params,
+            ),
+        )
+        return cursor.rowcount
+
+
+def backfill(Task, Comment, TaskEvent, batch_size=2000):
+    """Reconstruct events from current task state and rejection comments.
+
+    Used by ``seed_data``. Earlier claims and submissions that were later
+    overwritten cannot be recovered.
+    The three sources are streamed in time order and merged, so memory stays
+    bounded by ``batch_size`` however many tasks there are.
+    """
+    rejected = (
+        (at, task_id, dataset_id, "rejected", author_id, {"comment": body})
+        for task_id, dataset_id, author_id, body, at in Comment.objects.order_by(
+            "created_at", "task_id"
+        ).values_list(
+            "task_id", "task__dataset_id", "author_id", "body", "created_at"
+        ).iterator(chunk_size=batch_size)
+    )
+    submitted = (
+        (at, task_id, dataset_id, "submitted", annotator_id,
+         {"annotation": annotation, "time_spent_seconds": time_spent})
+        for task_id, dataset_id, annotator_id, annotation, time_spent, at in Task.objects.filter(
+            submitted_at__isnull=False
+        ).order_by("submitted_at", "id").values_list(
+            "id", "dataset_id", "assigned_to_id", "annotation", "time_spent_seconds", "submitted_at"
+        ).iterator(chunk_size=batch_size)
+    )
+    approved = (
+        (at, task_id, dataset_id, "approved", reviewer_id, {"annotation": annotation})
+        for task_id, dataset_id, reviewer_id, annotation, at in Task.objects.filter(
+            submitted_at__isnull=False, status="approved", reviewed_at__isnull=False
+        ).order_by("reviewed_at", "id").values_list(
+            "id", "dataset_id", "reviewed_by_id", "annotation", "reviewed_at"
+        ).iterator(chunk_size=batch_size)
+    )
+    rows = heapq.merge(rejected, submitted, approved, key=lambda row: (row[0], row[1]))
+    written = 0
+    while True:
+        batch = [
+            TaskEvent(
+                created_at=at, task_id=task_id, dataset_id=dataset_id,
+                kind=kind, actor_id=actor_id, data=data,
+            )
+            for at, task_id, dataset_id, kind, actor_id, data in islice(rows, batch_size)
+        ]
+        if not batch:
+            return written
+        TaskEvent.objects.bulk_create(batch)
+        written += len(batch)
@@ -0,0 +1,114 @@
+"""Flat, ``.values()``-based rendering for large task lists.
+
+Produces the same JSON as ``TaskListSerializer(many=True)`` rendered by DRF's
+``JSONRenderer``, without instantiating a serializer per row: task rows,
+users and comments are each fetched with one ``.values()`` query and
+assembled into plain dicts. Enabled with
+``FAST_LIST_SERIALIZATION``.
+"""
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import User
+from accounts.serializers import UserSerializer
+from .models import Comment
+
+_CHUNK = 500
+_datetime = serializers.DateTimeField().to_representation
+
+_TASK_COLUMNS = (
+    "id", "dataset_id", "dataset__name", "dataset__labels", "text_preview",
+    "text_length", "text_blob", "status", "assigned_to_id", "annotation",
+    "submitted_at", "reviewed_by_id", "reviewed_at", "time_spent_seconds",
+    "duplicate_of_id", "uncertainty", "suggested_label", "suggested_confidence",
+    "priority", "token_count", "language",
+)
+_USER_FIELDS = UserSerializer.Meta.fields
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), _CHUNK):
+        yield ids[start:start + _CHUNK]
+
+
+def task_rows(tasks):
+    """Return list-serializer dicts for a ``with_text_preview`` queryset."""
+    rows = list(tasks.values(*_TASK_COLUMNS))
+    if not rows:
+        return []
+
+    comments = {}
+    for chunk in _chunks(r["id"] for r in rows):
+        for c in (
+            Comment.objects.filter(task_id__in=chunk)
+            .order_by(*Comment._meta.ordering)
+            .values("id", "task_id", "author_id", "body", "created_at")
+        ):
+            comments.setdefault(c["task_id"], []).append(c)
+
+    user_ids = {r[k] for r in rows for k in ("assigned_to_id", "reviewed_by_id")}
+    user_ids.update(c["author_id"] for cs in comments.values() for c in cs)
+    user_ids.discard(None)
+    users = {}
+    for chunk in _chunks(user_ids):
+        for u in User.objects.filter(id__in=chunk).values(*_USER_FIELDS):
+            users[u["id"]] = u
+
+    preview_chars = settings.TEXT_PREVIEW_CHARS
+    out = []
+    for row in rows:
+        assigned_to = row["assigned_to_id"]
+        reviewed_by = row["reviewed_by_id"]
+        submitted_at = row["submitted_at"]
+        reviewed_at = row["reviewed_at"]
+        # Key order must match TaskListSerializer.Meta.fields.
+        out.append({
+            "id": row["id"],
+            "dataset": row["dataset_id"],
+            "dataset_name": row["dataset__name"],
+            "dataset_labels": row["dataset__labels"],
+            "text_content": row["text_preview"],
+            "text_length": row["text_length"],
+            "text_truncated": bool(row["text_blob"]) or row["text_length"] > preview_chars,
+            "status": row["status"],
+            "assigned_to": users[assigned_to] if assigned_to is not None else None,
+            "annotation": row["annotation"],
+            "submitted_at": _datetime(submitted_at) if submitted_at is not None else None,
+            "reviewed_by": users[reviewed_by] if reviewed_by is not None else None,
+            "reviewed_at": _datetime(reviewed_at) if reviewed_at is not None else None,
+            "time_spent_seconds": row["time_spent_seconds"],
+            "comments": [
+                {
+                    "id": c["id"],
+                    "task": c["task_id"],
+                    "author": users[c["author_id"]],
+                    "body": c["body"],
+                    "created_at": _datetime(c["created_at"]),
+                }
+                for c in comments.get(row["id"], ())
+            ],
+            "duplicate_of": row["duplicate_of_id"],
+            "uncertainty": row["uncertainty"],
+            "suggested_label": row["suggested_label"],
+            "suggested_confidence": row["suggested_confidence"],
+            "priority": row["priority"],
+            "token_count": row["token_count"],
+            "language": row["language"],
+        })
+    return out
+
+
+def dumps(data):
+    """Encode with DRF's own ``JSONRenderer``.
+
+    Other encoders differ in small ways (float formatting, escaping of
+    U+2028/U+2029), and the output must stay byte-identical.
+    """
+    return JSONRenderer().render(data)
+
+
+def task_list_response(tasks):
+    return HttpResponse(dumps(task_rows(tasks)), content_type="application/json")
@@ -0,0 +1,102 @@
+"""Task import pipeline shared by ``task_bulk_create`` and ``seed_data``."""
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+
+from . import events
+from .active_learning import schedule_scoring
+from .blobstore import get_blob_store
+from .dedup import Deduplicator, index_tasks
+from .models import Task
+from .preprocessing import analyze_many
+
+DEDUP_OFF = "off"
+DEDUP_FLAG = "flag"
+DEDUP_SKIP = "skip"
+DEDUP_MODES = (DEDUP_OFF, DEDUP_FLAG, DEDUP_SKIP)
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    skipped: int = 0
+    flagged: int = 0
+
+
+def _build_task(dataset, text, features):
+    token_count, language, content_hash = features
+    task = Task(
+        dataset=dataset,
+        text_content=text,
+        text_length=len(text),
+        token_count=token_count,
+        language=language,
+        content_hash=content_hash,
+    )
+    if settings.TEXT_BLOB_THRESHOLD and len(text) > settings.TEXT_BLOB_THRESHOLD:
+        task.text_blob = get_blob_store().put(text)
+        task.text_content = text[:settings.TEXT_PREVIEW_CHARS]
+    return task
+
+
+def import_tasks(dataset, texts, dedup=None, batch_size=None):
+    """Create tasks for ``texts`` in ``dataset``.
+
+    ``dedup`` is one of ``DEDUP_MODES``: ``flag`` creates near-duplicates with
+    ``duplicate_of`` set, ``skip`` drops them, ``off`` disables the check.
+    Text features are computed for the whole import before the transaction
+    opens.
+    """
+    dedup = dedup or settings.DEDUP_MODE
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    result = ImportResult()
+    deduplicator = Deduplicator(dataset) if dedup != DEDUP_OFF else None
+    pk_by_index = {}
+    features = analyze_many(texts)
+
+    with transaction.atomic():
+        for offset in range(0, len(texts), batch_size):
+            batch = texts[offset:offset + batch_size]
+            batch_features = features[offset:offset + batch_size]
+            checks = (
+                deduplicator.check(batch, offset=offset, hashes=[f[2] for f in batch_features])
+                if deduplicator else None
+            )
+
+            pending = []
+            for position, text in enumerate(batch, start=offset):
+                check = checks[position - offset] if checks else None
+                if check and check.is_duplicate and dedup == DEDUP_SKIP:
+                    result.skipped += 1
+                    continue
+                task = _build_task(dataset, text, batch_features[position - offset])
+                if check and check.is_duplicate:
+                    task.duplicate_of_id = check.duplicate_of_id
+                    result.flagged += 1
+                pending.append((position, task, check))
+
+            Task.objects.bulk_create([task for _, task, _ in pending])
+            if pending:
+                events.record_many(
+                    Task.objects.filter(pk__in=[task.pk for _, task, _ in pending]),
+                    events.Kind.CREATED,
+                )
+
+            late_links = []
+            for position, task, check in pending:
+                if check and check.signature is not None and not check.is_duplicate:
+                    pk_by_index[position] = task.pk
+                if check and check.duplicate_of_index is not None:
+                    task.duplicate_of_id = pk_by_index[check.duplicate_of_index]
+                    late_links.append(task)
+            if late_links:
+                Task.objects.bulk_update(late_links, ["duplicate_of"])
+            if deduplicator:
+                index_tasks(dataset, [(task, check) for _, task, check in pending])
+            result.created += len(pending)
+
+        if result.created and settings.SCORE_TASKS_ON_IMPORT:
+            transaction.on_commit(lambda: schedule_scoring(dataset.pk))
+
+    return result
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from projects.models import Task
+from projects.review_policy import auto_approve
+
+
+class Command(BaseCommand):
+    help = "Approve submissions that were not sampled for human review"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dataset", type=int, help="Only approve tasks in this dataset id")
+        parser.add_argument(
+            "--delay-minutes", type=int, default=settings.AUTO_APPROVE_DELAY_MINUTES,
+            help="Leave submissions younger than this for spot checks",
+        )
+
+    def handle(self, *args, **options):
+        tasks = Task.objects.all()
+        if options["dataset"]:
+            tasks = tasks.filter(dataset_id=options["dataset"])
+        cutoff = timezone.now() - timedelta(minutes=options["delay_minutes"])
+        with transaction.atomic():
+            approved = auto_approve(tasks, cutoff)
+        self.stdout.write(self.style.SUCCESS(f"Auto-approved {approved} tasks."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from projects.preprocessing import backfill
+
+
+class Command(BaseCommand):
+    help = "Compute token counts, languages and content hashes for tasks missing them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int,
+            help="Processes to use (default PREPROCESS_WORKERS)",
+        )
+
+    def handle(self, *args, **options):
+        updated = backfill(options["workers"])
+        self.stdout.write(self.style.SUCCESS(f"Computed features for {updated} tasks."))
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from projects import fast_serializers
+from projects.models import Dataset
+from projects.serializers import TaskListSerializer
+from projects.views import with_text_preview
+
+
+class Command(BaseCommand):
+    help = "Compare CPU time of the DRF and flat task-list serialization paths"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dataset", type=int, help="Dataset id (default: largest)")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        if options["dataset"]:
+            dataset = Dataset.objects.filter(pk=options["dataset"]).first()
+        else:
+            dataset = max(Dataset.objects.all(), key=lambda d: d.tasks.count(), default=None)
+        if dataset is None:
+            raise CommandError("No dataset to benchmark.")
+
+        def tasks():
+            return with_text_preview(dataset.tasks.all()).order_by("id")
+
+        def drf():
+            qs = tasks().select_related(
+                "dataset", "assigned_to", "reviewed_by"
+            ).prefetch_related("comments__author")
+            return JSONRenderer().render(TaskListSerializer(qs, many=True).data)
+
+        def fast():
+            return fast_serializers.dumps(fast_serializers.task_rows(tasks()))
+
+        rows = dataset.tasks.count()
+        results = {}
+        for name, fn in (("drf", drf), ("fast", fast)):
+            fn()  # warm up
+            cpu = wall = 0.0
+            for _ in range(options["repeat"]):
+                cpu_start, wall_start = time.process_time(), time.perf_counter()
+                body = fn()
+                cpu += time.process_time() - cpu_start
+                wall += time.perf_counter() - wall_start
+            results[name] = (cpu / options["repeat"], wall / options["repeat"], len(body))
+            self.stdout.write(
+                f"{name:>4}: {rows} rows, cpu {results[name][0] * 1000:.1f} ms, "
+                f"wall {results[name][1] * 1000:.1f} ms, {results[name][2]} bytes"
+            )
+
+        saved = 1 - results["fast"][0] / results["drf"][0] if results["drf"][0] else 0
+        self.stdout.write(self.style.SUCCESS(f"fast path saves {saved:.0%} CPU"))
@@ -0,0 +1,47 @@
+import os
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from projects.models import Task
+
+
+class Command(BaseCommand):
+    help = "Apply pending migrations and seed demo data if the database is empty"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-seed", action="store_false", dest="seed",
+            help="Never seed demo data",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        executor = MigrationExecutor(connection)
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if plan:
+            call_command("migrate", interactive=False, verbosity=options["verbosity"])
+            # Tasks that predate a feature column are filled outside migrations.
+            call_command("backfill_features", verbosity=options["verbosity"])
+        migrated = time.perf_counter()
+
+        seeded = options["seed"] and not Task.objects.exists()
+        if seeded:
+            call_command("seed_data", verbosity=options["verbosity"])
+        finished = time.perf_counter()
+
+        parts = [
+            f"{len(plan)} migrations applied ({(migrated - started) * 1000:.0f} ms)",
+            f"seed {'ran' if seeded else 'skipped'} ({(finished - migrated) * 1000:.0f} ms)",
+        ]
+        # Set by entrypoint.sh to time the whole container start.
+        boot_started = os.environ.get("BOOT_STARTED_AT")
+        if boot_started:
+            parts.append(f"{time.time() - float(boot_started):.2f}s since container start")
+        self.stdout.write(self.style.SUCCESS(
+            f"Boot finished in {finished - started:.2f}s: " + ", ".join(parts)
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.active_learning import update_dataset
+from projects.models import Dataset
+
+
+class Command(BaseCommand):
+    help = "Train dataset models on new approvals and cache task scores and pre-labels"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dataset", type=int, help="Only process this dataset id")
+        parser.add_argument(
+            "--rescore", action="store_true",
+            help="Rescore every unclaimed task, not just unscored ones",
+        )
+
+    def handle(self, *args, **options):
+        if options["dataset"]:
+            datasets = Dataset.objects.filter(pk=options["dataset"])
+            if not datasets.exists():
+                raise CommandError(f"Dataset {options['dataset']} not found.")
+        else:
+            datasets = Dataset.objects.all()
+
+        for dataset in datasets:
+            trained, scored = update_dataset(dataset, rescore_all=options["rescore"])
+            self.stdout.write(self.style.SUCCESS(
+                f"{dataset.name}: trained on {trained} new approvals, scored {scored} tasks"
+            ))
@@ -2,14 +2,11 @@ import random
 from datetime import timedelta
 from django.core.management.base import BaseCommand
 from django.utils import timezone
-from faker import Faker
 
 from accounts.models import User
-from projects.models import Project, Dataset, Task, Comment
-
-fake = Faker()
-Faker.seed(42)
-random.seed(42)
+from projects import events
+from projects.importing import import_tasks, DEDUP_FLAG
+from projects.models import Project, Dataset, Task, TaskEvent, Comment
 
 REVIEW_TEXTS = [
     "The product quality exceeded my expectations. Fast shipping too!",
@@ -76,6 +73,13 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING("Data already seeded. Skipping."))
             return
 
+        # Imported here so boots that skip seeding never load Faker.
+        from faker import Faker
+
+        fake = Faker()
+        Faker.seed(42)
+        random.seed(42)
+
         # Create users
         admin, _ = User.objects.get_or_create(
             username="admin",
@@ -119,16 +123,18 @@ class Command(BaseCommand):
 
         # Create 200 tasks
         labels = ["positive", "negative", "neutral"]
-        tasks = []
+        texts = []
         for i in range(200):
             text = random.choice(REVIEW_TEXTS)
             if random.random() > 0.5:
                 text = fake.sentence(nb_words=random.randint(8, 25))
-            tasks.append(Task(dataset=dataset, text_content=text))
+            texts.append(text)
 
-        Task.objects.bulk_create(tasks)
+        result = import_tasks(dataset, texts, dedup=DEDUP_FLAG)
         all_tasks = list(Task.objects.filter(dataset=dataset).order_by("id"))
-        self.stdout.write(self.style.SUCCESS(f"Created {len(all_tasks)} tasks"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(all_tasks)} tasks ({result.flagged} flagged as duplicates)"
+        ))
 
         now = timezone.now()
 
@@ -198,6 +204,9 @@ class Command(BaseCommand):
 
         # Remaining 20 stay as unclaimed (already default)
 
+        # Reconstruct the review history in the event log
+        events.backfill(Task, Comment, TaskEvent)
+
         self.stdout.write(self.style.SUCCESS(
             f"Seeded: 150 approved, 18 rejected(in_progress), "
             f"12 submitted, 20 unclaimed"
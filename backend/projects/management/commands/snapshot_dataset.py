@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.models import Dataset
+from projects.snapshots import create_snapshot, dataset_dir
+
+
+class Command(BaseCommand):
+    help = "Write an immutable snapshot of each dataset's approved tasks if it changed"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dataset", type=int, help="Only snapshot this dataset id")
+
+    def handle(self, *args, **options):
+        if options["dataset"]:
+            datasets = Dataset.objects.filter(pk=options["dataset"])
+            if not datasets.exists():
+                raise CommandError(f"Dataset {options['dataset']} not found.")
+        else:
+            datasets = Dataset.objects.all()
+
+        for dataset in datasets:
+            manifest, created = create_snapshot(dataset)
+            path = dataset_dir(dataset.pk) / f"v{manifest['version']}"
+            if created:
+                self.stdout.write(self.style.SUCCESS(
+                    f"{dataset.name}: wrote v{manifest['version']} "
+                    f"({manifest['num_tasks']} tasks, {manifest['format']}) to {path}"
+                ))
+            else:
+                self.stdout.write(f"{dataset.name}: unchanged since v{manifest['version']}")
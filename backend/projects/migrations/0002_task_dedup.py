@@ -0,0 +1,56 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskFingerprint',
+            fields=[
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='projects.task')),
+                ('signature', models.BinaryField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='projects.task'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['dataset', 'content_hash'], name='projects_ta_dataset_b7cd3f_idx'),
+        ),
+        migrations.AddField(
+            model_name='lshbucket',
+            name='dataset',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='projects.dataset'),
+        ),
+        migrations.AddField(
+            model_name='lshbucket',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='projects.task'),
+        ),
+        migrations.AddIndex(
+            model_name='lshbucket',
+            index=models.Index(fields=['dataset', 'key'], name='projects_ls_dataset_9e50c4_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_task_assignments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LabelModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('labels', models.JSONField(default=list)),
+                ('n_features', models.PositiveIntegerField()),
+                ('weights', models.BinaryField(null=True)),
+                ('trained_until', models.DateTimeField(blank=True, null=True)),
+                ('trained_examples', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='queue_order',
+            field=models.CharField(choices=[('id', 'Import order'), ('uncertainty', 'Most uncertain first')], default='id', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='uncertainty',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['dataset', 'status', '-uncertainty'], name='task_uncertainty_idx'),
+        ),
+        migrations.AddField(
+            model_name='labelmodel',
+            name='dataset',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='label_model', to='projects.dataset'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_active_learning'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='suggested_confidence',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='suggested_label',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
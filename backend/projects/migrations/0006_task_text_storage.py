@@ -0,0 +1,30 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:09
+
+from django.db import migrations, models
+from django.db.models.functions import Length
+
+
+def backfill_text_length(apps, schema_editor):
+    Task = apps.get_model("projects", "Task")
+    Task.objects.update(text_length=Length("text_content"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_task_prelabels'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='text_blob',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='text_length',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_text_length, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:20
+
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+BATCH_SIZE = 2000
+
+
+def backfill_events(apps, schema_editor):
+    """Reconstruct events from task state and rejection comments, streaming
+    each source in time order so memory stays bounded."""
+    Task = apps.get_model("projects", "Task")
+    Comment = apps.get_model("projects", "Comment")
+    TaskEvent = apps.get_model("projects", "TaskEvent")
+
+    rejected = (
+        (at, task_id, dataset_id, "rejected", author_id, {"comment": body})
+        for task_id, dataset_id, author_id, body, at in Comment.objects.order_by(
+            "created_at", "task_id"
+        ).values_list(
+            "task_id", "task__dataset_id", "author_id", "body", "created_at"
+        ).iterator(chunk_size=BATCH_SIZE)
+    )
+    submitted = (
+        (at, task_id, dataset_id, "submitted", annotator_id,
+         {"annotation": annotation, "time_spent_seconds": time_spent})
+        for task_id, dataset_id, annotator_id, annotation, time_spent, at in Task.objects.filter(
+            submitted_at__isnull=False
+        ).order_by("submitted_at", "id").values_list(
+            "id", "dataset_id", "assigned_to_id", "annotation", "time_spent_seconds", "submitted_at"
+        ).iterator(chunk_size=BATCH_SIZE)
+    )
+    approved = (
+        (at, task_id, dataset_id, "approved", reviewer_id, {"annotation": annotation})
+        for task_id, dataset_id, reviewer_id, annotation, at in Task.objects.filter(
+            submitted_at__isnull=False, status="approved", reviewed_at__isnull=False
+        ).order_by("reviewed_at", "id").values_list(
+            "id", "dataset_id", "reviewed_by_id", "annotation", "reviewed_at"
+        ).iterator(chunk_size=BATCH_SIZE)
+    )
+    rows = heapq.merge(rejected, submitted, approved, key=lambda row: (row[0], row[1]))
+    while True:
+        batch = [
+            TaskEvent(
+                created_at=at, task_id=task_id, dataset_id=dataset_id,
+                kind=kind, actor_id=actor_id, data=data,
+            )
+            for at, task_id, dataset_id, kind, actor_id, data in islice(rows, BATCH_SIZE)
+        ]
+        if not batch:
+            return
+        TaskEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0006_task_text_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('created', 'Created'), ('claimed', 'Claimed'), ('submitted', 'Submitted'), ('approved', 'Approved'), ('rejected', 'Rejected')], max_length=20)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('dataset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='projects.dataset')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='projects.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['dataset', 'id'], name='taskevent_dataset_id_idx'), models.Index(fields=['kind', 'task'], name='taskevent_kind_task_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:24
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_task_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetDailyUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('claims', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_uncertainty_idx',
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='daily_quota',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='priority',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='weight',
+            field=models.PositiveIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='priority',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['dataset', 'status', '-priority', 'id'], name='task_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['dataset', 'status', '-priority', '-uncertainty'], name='task_uncertainty_idx'),
+        ),
+        migrations.AddField(
+            model_name='datasetdailyusage',
+            name='dataset',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_usage', to='projects.dataset'),
+        ),
+        migrations.AddConstraint(
+            model_name='datasetdailyusage',
+            constraint=models.UniqueConstraint(fields=('dataset', 'day'), name='dataset_daily_usage_unique'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_scheduling'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskevent',
+            name='kind',
+            field=models.CharField(choices=[('created', 'Created'), ('claimed', 'Claimed'), ('submitted', 'Submitted'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('reset', 'Reset'), ('reassigned', 'Reassigned')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['-created_at'], name='comment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'id'], name='task_status_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0009_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskevent',
+            name='kind',
+            field=models.CharField(choices=[('created', 'Created'), ('claimed', 'Claimed'), ('submitted', 'Submitted'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('reset', 'Reset'), ('reassigned', 'Reassigned'), ('relabeled', 'Relabeled')], max_length=20),
+        ),
+    ]
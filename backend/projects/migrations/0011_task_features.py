@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0010_taskevent_relabeled'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='language',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='token_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['dataset', 'token_count'], name='task_token_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['dataset', 'language'], name='task_language_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:47
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_token_version'),
+        ('projects', '0011_task_features'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnnotatorTrust',
+            fields=[
+                ('annotator', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trust', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('score', models.FloatField(default=0.0)),
+                ('reviews', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='review_policy',
+            field=models.CharField(choices=[('full', 'Review every submission'), ('sampled', 'Review a fixed sample'), ('adaptive', 'Sample by annotator trust')], default='full', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='review_sample_rate',
+            field=models.FloatField(default=1.0, validators=[django.core.validators.MinValueValidator(0.0), django.core.validators.MaxValueValidator(1.0)]),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='needs_review',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0012_review_policy'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskevent',
+            name='kind',
+            field=models.CharField(choices=[('created', 'Created'), ('claimed', 'Claimed'), ('submitted', 'Submitted'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('reset', 'Reset'), ('reassigned', 'Reassigned'), ('relabeled', 'Relabeled'), ('deleted', 'Deleted')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='taskevent',
+            name='task',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='projects.task'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+from django.db.models.functions import Length
+
+
+def fill_text_length(apps, schema_editor):
+    Task = apps.get_model("projects", "Task")
+    Task.objects.filter(text_blob="").update(text_length=Length("text_content"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0013_taskevent_deleted'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_text_length, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 23:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0014_task_text_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='labelmodel',
+            name='rescored_examples',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,5 +1,9 @@
 from django.db import models
 from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.utils import timezone
+
+from .blobstore import get_blob_store
 
 
 class Project(models.Model):
@@ -17,11 +21,43 @@ class Project(models.Model):
 
 
 class Dataset(models.Model):
+    class QueueOrder(models.TextChoices):
+        ID = "id", "Import order"
+        UNCERTAINTY = "uncertainty", "Most uncertain first"
+
+    class ReviewPolicy(models.TextChoices):
+        FULL = "full", "Review every submission"
+        SAMPLED = "sampled", "Review a fixed sample"
+        ADAPTIVE = "adaptive", "Sample by annotator trust"
+
     project = models.ForeignKey(
         Project, on_delete=models.CASCADE, related_name="datasets"
     )
     name = models.CharField(max_length=255)
     labels = models.JSONField(default=list)
+    # Number of independent annotations gathered per task (1 = single annotator).
+    redundancy = models.PositiveSmallIntegerField(
+        default=1, validators=[MinValueValidator(1)]
+    )
+    queue_order = models.CharField(
+        max_length=20,
+        choices=QueueOrder.choices,
+        default=QueueOrder.ID,
+    )
+    # Scheduling: higher priority datasets are served first; within a
+    # priority level, claims are shared in proportion to weight.
+    priority = models.SmallIntegerField(default=0)
+    weight = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])
+    # Maximum claims per day across all annotators (null = unlimited).
+    daily_quota = models.PositiveIntegerField(null=True, blank=True)
+    # Sampled review (see review_policy.py); the rate is the minimum share of
+    # submissions a human reviews. Redundant datasets are always reviewed.
+    review_policy = models.CharField(
+        max_length=20, choices=ReviewPolicy.choices, default=ReviewPolicy.FULL
+    )
+    review_sample_rate = models.FloatField(
+        default=1.0, validators=[MinValueValidator(0.0), MaxValueValidator(1.0)]
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -39,7 +75,10 @@ class Task(models.Model):
     dataset = models.ForeignKey(
         Dataset, on_delete=models.CASCADE, related_name="tasks"
     )
+    # Holds only a preview when the full text lives in the blob store.
     text_content = models.TextField()
+    text_length = models.PositiveIntegerField(default=0)
+    text_blob = models.CharField(max_length=64, blank=True, default="")
     status = models.CharField(
         max_length=20,
         choices=Status.choices,
@@ -63,10 +102,169 @@ class Task(models.Model):
     )
     reviewed_at = models.DateTimeField(null=True, blank=True)
     time_spent_seconds = models.IntegerField(default=0)
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+    duplicate_of = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="duplicates",
+    )
+    # Active-learning score (normalized entropy); higher is served first.
+    uncertainty = models.FloatField(null=True, blank=True)
+    # Cached model pre-label, written by `score_tasks`, never computed per request.
+    suggested_label = models.CharField(max_length=255, blank=True, default="")
+    suggested_confidence = models.FloatField(null=True, blank=True)
+    # Higher priority tasks are served first within their dataset.
+    priority = models.SmallIntegerField(default=0)
+    # False when the submission was not sampled for review; auto_approve
+    # approves those.
+    needs_review = models.BooleanField(default=True)
+    # Import-time features (see preprocessing.py); null until computed.
+    token_count = models.PositiveIntegerField(null=True, blank=True)
+    language = models.CharField(max_length=16, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["dataset", "content_hash"]),
+            models.Index(fields=["status", "id"], name="task_status_idx"),
+            models.Index(
+                fields=["dataset", "status", "-priority", "id"],
+                name="task_priority_idx",
+            ),
+            models.Index(
+                fields=["dataset", "status", "-priority", "-uncertainty"],
+                name="task_uncertainty_idx",
+            ),
+            models.Index(fields=["dataset", "token_count"], name="task_token_count_idx"),
+            models.Index(fields=["dataset", "language"], name="task_language_idx"),
+        ]
 
     def __str__(self):
         return f"Task {self.pk} [{self.status}]"
 
+    def save(self, *args, **kwargs):
+        # Imports set text_length for blob-stored texts; inline texts are
+        # measured here so tasks created any other way report it too.
+        if not self.text_blob and "text_content" not in self.get_deferred_fields():
+            self.text_length = len(self.text_content)
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "text_content" in update_fields:
+                kwargs["update_fields"] = {*update_fields, "text_length"}
+        super().save(*args, **kwargs)
+
+    def full_text(self):
+        if self.text_blob:
+            return get_blob_store().read_text(self.text_blob)
+        return self.text_content
+
+
+class TaskAssignment(models.Model):
+    class Status(models.TextChoices):
+        IN_PROGRESS = "in_progress", "In Progress"
+        SUBMITTED = "submitted", "Submitted"
+
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="assignments"
+    )
+    annotator = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="task_assignments",
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.IN_PROGRESS,
+    )
+    annotation = models.JSONField(null=True, blank=True)
+    submitted_at = models.DateTimeField(null=True, blank=True)
+    time_spent_seconds = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["task", "annotator"], name="unique_task_annotator"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Assignment of Task {self.task_id} to {self.annotator_id} [{self.status}]"
+
+
+class LabelModel(models.Model):
+    dataset = models.OneToOneField(
+        Dataset, on_delete=models.CASCADE, related_name="label_model"
+    )
+    labels = models.JSONField(default=list)
+    n_features = models.PositiveIntegerField()
+    weights = models.BinaryField(null=True)
+    trained_until = models.DateTimeField(null=True, blank=True)
+    trained_examples = models.PositiveIntegerField(default=0)
+    # trained_examples when every open task was last rescored; null until the
+    # current weights have rescored them all.
+    rescored_examples = models.PositiveIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Label model for {self.dataset_id} ({self.trained_examples} examples)"
+
+
+class DatasetDailyUsage(models.Model):
+    """Claims per dataset per day, for quotas and fair-share scheduling."""
+
+    dataset = models.ForeignKey(Dataset, on_delete=models.CASCADE, related_name="daily_usage")
+    day = models.DateField()
+    claims = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["dataset", "day"], name="dataset_daily_usage_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.dataset_id} {self.day}: {self.claims}"
+
+
+class AnnotatorTrust(models.Model):
+    """Rolling review outcome of an annotator, updated on each human review."""
+
+    annotator = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True,
+        related_name="trust",
+    )
+    # EWMA of outcomes (1 = approved, 0 = rejected). Starts at 0, so new
+    # annotators are reviewed in full until they build a record.
+    score = models.FloatField(default=0.0)
+    reviews = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.annotator_id}: {self.score:.2f} over {self.reviews} reviews"
+
+
+class TaskFingerprint(models.Model):
+    task = models.OneToOneField(
+        Task, on_delete=models.CASCADE, primary_key=True, related_name="fingerprint"
+    )
+    signature = models.BinaryField()
+
+
+class LSHBucket(models.Model):
+    dataset = models.ForeignKey(
+        Dataset, on_delete=models.CASCADE, related_name="lsh_buckets"
+    )
+    key = models.BigIntegerField()
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="lsh_buckets"
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["dataset", "key"]),
+        ]
+
 
 class Comment(models.Model):
     task = models.ForeignKey(
@@ -82,6 +280,53 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["-created_at"], name="comment_created_idx")]
 
     def __str__(self):
         return f"Comment by {self.author.username} on Task {self.task_id}"
+
+
+class TaskEvent(models.Model):
+    """Append-only record of task workflow transitions, read by ``/api/changes/``."""
+
+    class Kind(models.TextChoices):
+        CREATED = "created", "Created"
+        CLAIMED = "claimed", "Claimed"
+        SUBMITTED = "submitted", "Submitted"
+        APPROVED = "approved", "Approved"
+        REJECTED = "rejected", "Rejected"
+        RESET = "reset", "Reset"
+        REASSIGNED = "reassigned", "Reassigned"
+        RELABELED = "relabeled", "Relabeled"
+        DELETED = "deleted", "Deleted"
+
+    # No database constraint: events outlive their task, so the change feed
+    # can report deletions and the audit history is kept.
+    task = models.ForeignKey(
+        Task, on_delete=models.DO_NOTHING, db_constraint=False, related_name="events"
+    )
+    dataset = models.ForeignKey(Dataset, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["dataset", "id"], name="taskevent_dataset_id_idx"),
+            models.Index(fields=["kind", "task"], name="taskevent_kind_task_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError("Task events are append-only.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.kind} task {self.task_id}"
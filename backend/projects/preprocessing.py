@@ -0,0 +1,148 @@
+"""Import-time text features stored on each task.
+
+``analyze`` computes, from the full text, the word-token count, a language
+tag and the normalized content hash (the same hash dedup uses). Imports and
+``backfill`` run it across a process pool for large batches, so queues,
+analytics and snapshots read indexed columns instead of reprocessing text.
+
+Language detection is a cheap heuristic, not a classifier: the dominant
+script decides non-Latin text (``ja``, ``ko``, ``zh``, ``el``, ``he``,
+``th``, or ``und-<Script>`` where the script is shared by many languages),
+and Latin text goes to the stopword list with the most hits. No hits or a
+tie is ``und``.
+"""
+import hashlib
+import re
+import unicodedata
+
+from django.conf import settings
+
+from labelforge.pool import pool_map
+
+_POOL_MIN_TEXTS = 2000
+_BACKFILL_CHUNK = 2000
+_WHITESPACE = re.compile(r"\s+")
+_TOKEN = re.compile(r"\w+")
+_SAMPLE_CHARS = 400
+_SAMPLE_TOKENS = 200
+
+UNDETERMINED = "und"
+
+_SCRIPTS = {
+    "HIRAGANA": "ja",
+    "KATAKANA": "ja",
+    "HANGUL": "ko",
+    "CJK": "zh",
+    "GREEK": "el",
+    "HEBREW": "he",
+    "THAI": "th",
+    "CYRILLIC": "und-Cyrl",
+    "ARABIC": "und-Arab",
+    "DEVANAGARI": "und-Deva",
+}
+
+# Single letters ("a", "e", "o", "y") are left out: too many false hits.
+_STOPWORDS = {
+    "en": {"the", "and", "is", "of", "to", "in", "that", "it", "was", "for",
+           "with", "you", "this", "not", "are", "my", "but", "have", "they",
+           "had", "would", "i", "we", "be", "on", "at", "very", "will", "an",
+           "by", "from", "their", "what", "when", "so", "all", "our", "here",
+           "no", "do"},
+    "es": {"el", "la", "de", "que", "en", "los", "se", "del", "las",
+           "por", "un", "una", "es", "con", "no", "muy", "pero"},
+    "fr": {"le", "la", "les", "de", "et", "est", "un", "une", "des", "du",
+           "que", "pas", "pour", "dans", "qui", "ne", "je", "très"},
+    "de": {"der", "die", "das", "und", "ist", "nicht", "ein", "eine", "zu",
+           "den", "mit", "sich", "auf", "ich", "es", "sehr", "aber"},
+    "it": {"il", "di", "che", "la", "per", "un", "una", "non", "sono",
+           "del", "della", "gli", "le", "con", "molto", "ma"},
+    "pt": {"de", "que", "do", "da", "em", "um", "uma", "não",
+           "os", "para", "com", "é", "muito", "mas"},
+    "nl": {"de", "het", "een", "en", "van", "is", "niet", "dat", "op", "te",
+           "zijn", "met", "voor", "ik", "heel", "maar"},
+}
+
+
+def normalize_text(text):
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def content_hash(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _script_language(sample):
+    counts = {}
+    latin = 0
+    for ch in sample:
+        if not ch.isalpha():
+            continue
+        name = unicodedata.name(ch, "")
+        script = name.split(" ", 1)[0]
+        if script == "LATIN":
+            latin += 1
+        elif script in _SCRIPTS:
+            tag = _SCRIPTS[script]
+            counts[tag] = counts.get(tag, 0) + 1
+    if not counts or latin >= max(counts.values()):
+        return None if latin else UNDETERMINED
+    # Kana marks Japanese even when most characters are kanji.
+    if "ja" in counts and counts["ja"] * 10 >= sum(counts.values()):
+        return "ja"
+    return max(counts, key=counts.get)
+
+
+def detect_language(text):
+    language = _script_language(text[:_SAMPLE_CHARS])
+    if language is not None:
+        return language
+    words = [w.lower() for w in _TOKEN.findall(text[:_SAMPLE_CHARS * 4])[:_SAMPLE_TOKENS]]
+    scores = {
+        code: sum(1 for w in words if w in stopwords)
+        for code, stopwords in _STOPWORDS.items()
+    }
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    if scores[ranked[0]] <= scores[ranked[1]]:
+        return UNDETERMINED
+    return ranked[0]
+
+
+def analyze(text):
+    """Return ``(token_count, language, content_hash)`` for one full text."""
+    return len(_TOKEN.findall(text)), detect_language(text), content_hash(text)
+
+
+def analyze_many(texts, workers=None):
+    """``analyze`` every text, in a process pool for large batches."""
+    workers = workers or settings.PREPROCESS_WORKERS
+    return pool_map(analyze, texts, workers, _POOL_MIN_TEXTS)
+
+
+def backfill(workers=None):
+    """Fill features for tasks imported before they existed.
+
+    Run by ``manage.py backfill_features`` (and ``boot`` after migrating).
+    Returns the number of tasks updated.
+    """
+    from .blobstore import get_blob_store
+    from .models import Task
+
+    store = get_blob_store()
+    updated = 0
+    last_id = 0
+    while True:
+        rows = list(
+            Task.objects.filter(token_count__isnull=True, id__gt=last_id)
+            .order_by("id")
+            .values_list("id", "text_content", "text_blob")[:_BACKFILL_CHUNK]
+        )
+        if not rows:
+            return updated
+        texts = [store.read_text(blob) if blob else text for _, text, blob in rows]
+        tasks = [
+            Task(id=task_id, token_count=tokens, language=language, content_hash=digest)
+            for (task_id, _, _), (tokens, language, digest) in zip(rows, analyze_many(texts, workers))
+        ]
+        Task.objects.bulk_update(tasks, ["token_count", "language", "content_hash"])
+        updated += len(tasks)
+        last_id = rows[-1][0]
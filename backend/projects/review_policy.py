@@ -0,0 +1,82 @@
+"""Which submissions a human reviews, and annotator trust scores.
+
+``Dataset.review_policy`` decides at submit time whether a task goes to the
+review queue:
+
+* ``full``: every submission;
+* ``sampled``: a ``review_sample_rate`` share, chosen at random;
+* ``adaptive``: ``max(review_sample_rate, 1 - trust)``, where trust is the
+  annotator's EWMA of review outcomes. A new annotator (trust 0) is always
+  reviewed; one whose recent work is rarely rejected drops to the floor rate.
+
+Trust is updated in place on every human approval or rejection with one
+``UPDATE``; auto-approvals do not count, so they cannot inflate it.
+Unsampled submissions are approved in bulk by ``manage.py auto_approve``.
+"""
+import random
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import events
+from .models import AnnotatorTrust, Dataset, Task
+
+
+def trust_score(annotator_id):
+    score = (
+        AnnotatorTrust.objects.filter(annotator_id=annotator_id)
+        .values_list("score", flat=True)
+        .first()
+    )
+    return score or 0.0
+
+
+def review_probability(dataset, annotator_id):
+    if dataset.redundancy > 1 or dataset.review_policy == Dataset.ReviewPolicy.FULL:
+        return 1.0
+    if dataset.review_policy == Dataset.ReviewPolicy.SAMPLED:
+        return dataset.review_sample_rate
+    return max(dataset.review_sample_rate, 1.0 - trust_score(annotator_id))
+
+
+def needs_review(dataset, annotator_id):
+    probability = review_probability(dataset, annotator_id)
+    return probability >= 1.0 or random.random() < probability
+
+
+def record_review(annotator_id, approved):
+    """Fold one human review outcome into the annotator's trust score."""
+    alpha = settings.REVIEW_TRUST_ALPHA
+    outcome = 1.0 if approved else 0.0
+    trust = AnnotatorTrust.objects.filter(annotator_id=annotator_id)
+    changes = {
+        "score": F("score") + alpha * (outcome - F("score")),
+        "reviews": F("reviews") + 1,
+    }
+    if trust.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            AnnotatorTrust.objects.create(
+                annotator_id=annotator_id, score=alpha * outcome, reviews=1
+            )
+    except IntegrityError:
+        trust.update(**changes)
+
+
+def auto_approve(tasks, submitted_before):
+    """Approve submitted tasks that were not sampled for review.
+
+    Only tasks submitted at or before ``submitted_before`` are touched, so a
+    submission arriving between the two statements waits for the next run.
+    Returns the number of tasks approved.
+    """
+    tasks = tasks.filter(
+        status=Task.Status.SUBMITTED, needs_review=False, submitted_at__lte=submitted_before
+    )
+    events.record_many(tasks, events.Kind.APPROVED, auto=True)
+    return tasks.update(
+        status=Task.Status.APPROVED, reviewed_by=None, reviewed_at=timezone.now()
+    )
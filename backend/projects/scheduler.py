@@ -0,0 +1,105 @@
+"""Picks the task an annotator should work on next.
+
+Datasets are tried in order of ``priority`` (highest first), and within a
+priority level by weighted fair share: the dataset with the fewest claims
+today per unit of ``weight`` goes first. Datasets that reached their
+``daily_quota`` or have no unclaimed work are skipped. Inside a dataset,
+tasks come off the ``(dataset, status, -priority, ...)`` indexes, so each
+probe is an index seek rather than a scan.
+
+Quotas are soft: concurrent claims may overshoot by a few tasks.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, FloatField, OuterRef, Q, Subquery
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from .models import Dataset, DatasetDailyUsage, Task, TaskAssignment
+
+
+def queue_order(tasks, dataset=None):
+    if dataset is None:
+        return tasks.order_by("-dataset__priority", "-priority", "id")
+    if dataset.queue_order == Dataset.QueueOrder.UNCERTAINTY:
+        return tasks.order_by("-priority", F("uncertainty").desc(nulls_last=True), "id")
+    return tasks.order_by("-priority", "id")
+
+
+def usage_today():
+    return dict(
+        DatasetDailyUsage.objects.filter(day=timezone.localdate())
+        .values_list("dataset_id", "claims")
+    )
+
+
+def record_claim(dataset_id):
+    day = timezone.localdate()
+    usage = DatasetDailyUsage.objects.filter(dataset_id=dataset_id, day=day)
+    if usage.update(claims=F("claims") + 1):
+        return
+    try:
+        with transaction.atomic():
+            DatasetDailyUsage.objects.create(dataset_id=dataset_id, day=day, claims=1)
+    except IntegrityError:
+        usage.update(claims=F("claims") + 1)
+
+
+def quota_reached(dataset, usage=None):
+    if dataset.daily_quota is None:
+        return False
+    if usage is None:
+        usage = usage_today()
+    return usage.get(dataset.pk, 0) >= dataset.daily_quota
+
+
+def over_quota_ids():
+    usage = usage_today()
+    return [
+        dataset_id
+        for dataset_id, quota in Dataset.objects.filter(
+            id__in=list(usage), daily_quota__isnull=False
+        ).values_list("id", "daily_quota")
+        if usage[dataset_id] >= quota
+    ]
+
+
+def ranked_datasets(datasets=None):
+    """Datasets with unclaimed work and quota left, in scheduling order.
+
+    Filtering and ranking happen in a single query.
+    """
+    if datasets is None:
+        datasets = Dataset.objects.all()
+    claims = DatasetDailyUsage.objects.filter(
+        dataset=OuterRef("pk"), day=timezone.localdate()
+    ).values("claims")
+    return (
+        datasets.annotate(
+            claims_today=Coalesce(Subquery(claims), 0),
+            share=Cast(F("claims_today"), FloatField()) / F("weight"),
+        )
+        .filter(Exists(Task.objects.filter(dataset=OuterRef("pk"), status=Task.Status.UNCLAIMED)))
+        .filter(Q(daily_quota__isnull=True) | Q(claims_today__lt=F("daily_quota")))
+        .order_by("-priority", "share", "pk")
+    )
+
+
+def next_task(user, datasets=None):
+    """Lock and return the next unclaimed task for ``user``, or ``None``.
+
+    Must be called inside a transaction; the row stays locked until it ends.
+    """
+    annotated = TaskAssignment.objects.filter(annotator=user).values("task_id")
+    for dataset in ranked_datasets(datasets):
+        tasks = Task.objects.filter(
+            dataset=dataset, status=Task.Status.UNCLAIMED
+        ).exclude(id__in=annotated)
+        task = (
+            queue_order(tasks, dataset)
+            .select_for_update(skip_locked=True, of=("self",))
+            .first()
+        )
+        if task is not None:
+            task.dataset = dataset
+            return task
+    return None
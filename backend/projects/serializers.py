@@ -1,5 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import Project, Dataset, Task, Comment
+from .importing import DEDUP_MODES
+from accounts.models import User
 from accounts.serializers import UserSerializer
 
 
@@ -11,6 +14,25 @@ class ProjectSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "description", "created_by", "created_at"]
 
 
+class ProjectListSerializer(ProjectSerializer):
+    """Catalogue rows with progress; querysets must come from ``with_progress``."""
+
+    dataset_count = serializers.IntegerField(read_only=True)
+    task_counts = serializers.SerializerMethodField()
+    progress = serializers.SerializerMethodField()
+
+    class Meta(ProjectSerializer.Meta):
+        fields = ProjectSerializer.Meta.fields + ["dataset_count", "task_counts", "progress"]
+
+    def get_task_counts(self, obj):
+        counts = {"total": obj.task_total}
+        counts.update((s, getattr(obj, f"tasks_{s}")) for s in Task.Status.values)
+        return counts
+
+    def get_progress(self, obj):
+        return round(obj.progress, 4)
+
+
 class ProjectCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Project
@@ -22,7 +44,11 @@ class DatasetSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Dataset
-        fields = ["id", "project", "name", "labels", "created_at", "task_counts"]
+        fields = [
+            "id", "project", "name", "labels", "redundancy", "queue_order",
+            "priority", "weight", "daily_quota", "review_policy", "review_sample_rate",
+            "created_at", "task_counts",
+        ]
 
     def get_task_counts(self, obj):
         tasks = obj.tasks.all()
@@ -39,7 +65,16 @@ class DatasetSerializer(serializers.ModelSerializer):
 class DatasetCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Dataset
-        fields = ["id", "name", "labels"]
+        fields = [
+            "id", "name", "labels", "redundancy", "queue_order",
+            "priority", "weight", "daily_quota", "review_policy", "review_sample_rate",
+        ]
+
+
+class DatasetSchedulingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Dataset
+        fields = ["priority", "weight", "daily_quota", "review_policy", "review_sample_rate"]
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -56,18 +91,110 @@ class TaskSerializer(serializers.ModelSerializer):
     comments = CommentSerializer(many=True, read_only=True)
     dataset_name = serializers.CharField(source="dataset.name", read_only=True)
     dataset_labels = serializers.JSONField(source="dataset.labels", read_only=True)
+    text_truncated = serializers.SerializerMethodField()
 
     class Meta:
         model = Task
         fields = [
             "id", "dataset", "dataset_name", "dataset_labels",
-            "text_content", "status", "assigned_to",
+            "text_content", "text_length", "text_truncated", "status", "assigned_to",
             "annotation", "submitted_at", "reviewed_by",
-            "reviewed_at", "time_spent_seconds", "comments",
+            "reviewed_at", "time_spent_seconds", "comments", "duplicate_of",
+            "uncertainty", "suggested_label", "suggested_confidence", "priority",
+            "token_count", "language",
         ]
 
+    def get_text_truncated(self, obj):
+        return bool(obj.text_blob)
+
+
+class TaskListSerializer(TaskSerializer):
+    """List rows carry a preview; the full text is served by the content endpoint.
+
+    Querysets must come from ``with_text_preview``.
+    """
+
+    text_content = serializers.CharField(source="text_preview", read_only=True)
+
+    def get_text_truncated(self, obj):
+        return bool(obj.text_blob) or obj.text_length > settings.TEXT_PREVIEW_CHARS
+
 
 class TaskBulkCreateSerializer(serializers.Serializer):
     tasks = serializers.ListField(
         child=serializers.DictField(), min_length=1
     )
+    dedup = serializers.ChoiceField(choices=DEDUP_MODES, required=False)
+
+
+class DatasetCloneSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255, required=False)
+    labels = serializers.ListField(child=serializers.CharField(), required=False)
+    status = serializers.ListField(
+        child=serializers.ChoiceField(choices=Task.Status.choices), required=False
+    )
+    include_labels = serializers.BooleanField(default=False)
+
+
+class TaskFilterSerializer(serializers.Serializer):
+    dataset_id = serializers.IntegerField(required=False)
+    status = serializers.ListField(
+        child=serializers.ChoiceField(choices=Task.Status.choices),
+        required=False,
+        allow_empty=False,
+    )
+    assigned_to = serializers.IntegerField(required=False, allow_null=True)
+    id_min = serializers.IntegerField(required=False)
+    id_max = serializers.IntegerField(required=False)
+    min_tokens = serializers.IntegerField(required=False, min_value=0)
+    max_tokens = serializers.IntegerField(required=False, min_value=0)
+    language = serializers.CharField(max_length=16, required=False)
+
+    def validate(self, attrs):
+        # Mirror what views._filter_tasks applies: a filter that narrows
+        # nothing would match every task in every dataset.
+        applied = [
+            name for name, value in attrs.items()
+            if name == "assigned_to" or value not in ("", [])
+        ]
+        if not applied:
+            raise serializers.ValidationError("At least one filter is required.")
+        return attrs
+
+
+class TaskBulkOpSerializer(serializers.Serializer):
+    OPERATIONS = ("reassign", "reset", "relabel", "prioritize", "delete")
+
+    operation = serializers.ChoiceField(choices=OPERATIONS)
+    filter = TaskFilterSerializer()
+    dry_run = serializers.BooleanField(default=False)
+    assignee = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.filter(
+            role__in=[User.Role.ANNOTATOR, User.Role.ADMIN], is_active=True
+        ),
+        required=False,
+    )
+    from_label = serializers.CharField(required=False)
+    # Omit to send tasks carrying from_label back to the queue.
+    to_label = serializers.CharField(required=False, allow_null=True)
+    remove_label = serializers.BooleanField(default=False)
+    priority = serializers.IntegerField(required=False, min_value=-32768, max_value=32767)
+
+    def validate(self, attrs):
+        operation = attrs["operation"]
+        if operation == "reassign" and "assignee" not in attrs:
+            raise serializers.ValidationError({"assignee": "Required for reassign."})
+        if operation == "prioritize" and "priority" not in attrs:
+            raise serializers.ValidationError({"priority": "Required for prioritize."})
+        if operation == "relabel":
+            if "from_label" not in attrs:
+                raise serializers.ValidationError({"from_label": "Required for relabel."})
+            if "dataset_id" not in attrs["filter"]:
+                raise serializers.ValidationError(
+                    {"filter": "Relabel requires a dataset_id filter."}
+                )
+            if attrs["remove_label"] and attrs.get("to_label") == attrs["from_label"]:
+                raise serializers.ValidationError(
+                    {"to_label": "Cannot relabel to the label being removed."}
+                )
+        return attrs
@@ -0,0 +1,247 @@
+"""Immutable, versioned snapshots of a dataset's approved tasks.
+
+Each snapshot is a directory ``<SNAPSHOT_DIR>/dataset-<id>/v<N>/`` holding:
+
+* ``tasks.parquet`` (when pyarrow is installed) or ``tasks.npz``: columns
+  ``id``, ``label_index``, ``time_spent_seconds``, ``token_count`` (``-1``
+  if not computed), ``language`` and the task text (in the npz fallback, as
+  UTF-8 bytes plus an offsets array);
+* ``labels.npy``: int32 label indices in task id order, loadable with
+  ``np.load(path, mmap_mode="r")``; ``-1`` marks a label outside
+  ``manifest["labels"]``;
+* ``manifest.json``: counts, label names, per-file SHA-256 and a content hash
+  over the logical rows.
+
+Snapshots are written to a temporary directory and renamed into place, then
+made read-only. Rows are streamed into the temporary directory while the
+content hash is computed, and the result is discarded when the hash matches
+the latest snapshot, so a new version is only kept when the dataset changed.
+Requests only schedule ``manage.py snapshot_dataset`` (``schedule_snapshot``);
+the snapshot is built in a background process.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from . import background
+from .blobstore import get_blob_store
+from .models import Task
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+MANIFEST = "manifest.json"
+LABELS = "labels.npy"
+
+
+def dataset_dir(dataset_id):
+    return Path(settings.SNAPSHOT_DIR) / f"dataset-{dataset_id}"
+
+
+def list_snapshots(dataset_id):
+    """Manifests of every snapshot of the dataset, oldest first."""
+    root = dataset_dir(dataset_id)
+    if not root.is_dir():
+        return []
+    versions = sorted(
+        int(p.name[1:]) for p in root.iterdir() if p.name[:1] == "v" and p.name[1:].isdigit()
+    )
+    manifests = []
+    for version in versions:
+        with open(root / f"v{version}" / MANIFEST) as f:
+            manifests.append(json.load(f))
+    return manifests
+
+
+def _rows(dataset):
+    store = get_blob_store()
+    tasks = (
+        Task.objects.filter(dataset=dataset, status=Task.Status.APPROVED)
+        .order_by("id")
+        .values_list(
+            "id", "text_content", "text_blob", "annotation", "time_spent_seconds",
+            "token_count", "language",
+        )
+    )
+    for task_id, text, blob, annotation, time_spent, tokens, language in tasks.iterator(
+        chunk_size=2000
+    ):
+        label = annotation.get("label") if isinstance(annotation, dict) else None
+        text = store.read_text(blob) if blob else text
+        yield task_id, text, label, time_spent, tokens, language
+
+
+def _batches(dataset, digest, size=2000):
+    """Yield ``(columns, texts)`` for the approved tasks, ``size`` rows at a time.
+
+    Every written column is fed to ``digest``, so any change produces a new
+    version.
+    """
+    label_index = {label: i for i, label in enumerate(dataset.labels)}
+    rows = []
+    for row in _rows(dataset):
+        task_id, text, label, time_spent, token_count, language = row
+        digest.update(json.dumps(
+            [task_id, label, time_spent, token_count, language, text], ensure_ascii=False
+        ).encode())
+        digest.update(b"\n")
+        rows.append(row)
+        if len(rows) == size:
+            yield _to_columns(rows, label_index)
+            rows = []
+    if rows:
+        yield _to_columns(rows, label_index)
+
+
+def _to_columns(rows, label_index):
+    columns = {
+        "id": np.asarray([r[0] for r in rows], dtype=np.int64),
+        "label_index": np.asarray([label_index.get(r[2], -1) for r in rows], dtype=np.int32),
+        "time_spent_seconds": np.asarray([r[3] for r in rows], dtype=np.int32),
+        "token_count": np.asarray([-1 if r[4] is None else r[4] for r in rows], dtype=np.int32),
+        "language": np.asarray([r[5] for r in rows], dtype="U16"),
+    }
+    return columns, [r[1] for r in rows]
+
+
+def _write_parquet(path, batches):
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("label_index", pa.int32()),
+        ("time_spent_seconds", pa.int32()),
+        ("token_count", pa.int32()),
+        ("language", pa.string()),
+        ("text", pa.large_string()),
+    ])
+    label_parts = []
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for columns, texts in batches:
+            writer.write_table(pa.table({**columns, "text": texts}, schema=schema))
+            label_parts.append(columns["label_index"])
+    return label_parts
+
+
+def _write_npz(path, batches):
+    # Text bytes go to a scratch file and are read back through a memmap, so
+    # only the fixed-width columns are ever held in memory.
+    parts, lengths = {}, []
+    raw_path = path.with_suffix(".text")
+    with open(raw_path, "wb") as raw:
+        for columns, texts in batches:
+            for name, values in columns.items():
+                parts.setdefault(name, []).append(values)
+            for text in texts:
+                encoded = text.encode("utf-8")
+                raw.write(encoded)
+                lengths.append(len(encoded))
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    text_data = (
+        np.memmap(raw_path, dtype=np.uint8, mode="r") if offsets[-1] else np.zeros(0, dtype=np.uint8)
+    )
+    if not parts:
+        parts = {name: [values] for name, values in _to_columns([], {})[0].items()}
+    columns = {name: np.concatenate(values) for name, values in parts.items()}
+    np.savez_compressed(path, **columns, text_offsets=offsets, text_data=text_data)
+    del text_data
+    raw_path.unlink()
+    return [columns["label_index"]]
+
+
+def _write_rows(directory, dataset):
+    """Stream the approved tasks into ``directory``.
+
+    Returns ``(format, data_path, label_index, content_hash)``.
+    """
+    digest = hashlib.sha256(json.dumps(dataset.labels).encode())
+    batches = _batches(dataset, digest)
+    if pq is not None:
+        fmt, path = "parquet", directory / "tasks.parquet"
+        label_parts = _write_parquet(path, batches)
+    else:
+        fmt, path = "npz", directory / "tasks.npz"
+        label_parts = _write_npz(path, batches)
+    label_index = np.concatenate(label_parts) if label_parts else np.zeros(0, dtype=np.int32)
+    return fmt, path, label_index, digest.hexdigest()
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextmanager
+def _dataset_lock(root):
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def schedule_snapshot(dataset_id):
+    background.schedule("snapshot_dataset", dataset_id)
+
+
+def create_snapshot(dataset):
+    """Write a new snapshot if the dataset changed.
+
+    Returns ``(manifest, created)``; ``created`` is false when the latest
+    snapshot already has the same content.
+    """
+    root = dataset_dir(dataset.pk)
+    with _dataset_lock(root):
+        existing = list_snapshots(dataset.pk)
+        latest = existing[-1] if existing else None
+        version = latest["version"] + 1 if latest else 1
+        tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=root))
+        try:
+            fmt, data_path, label_index, content_hash = _write_rows(tmp, dataset)
+            if latest and latest["content_hash"] == content_hash:
+                shutil.rmtree(tmp)
+                return latest, False
+
+            np.save(tmp / LABELS, label_index)
+            files = [data_path, tmp / LABELS]
+            manifest = {
+                "dataset_id": dataset.pk,
+                "dataset_name": dataset.name,
+                "version": version,
+                "created_at": timezone.now().isoformat(),
+                "format": fmt,
+                "labels": dataset.labels,
+                "num_tasks": len(label_index),
+                "content_hash": content_hash,
+                "files": {
+                    p.name: {"bytes": p.stat().st_size, "sha256": _sha256(p)} for p in files
+                },
+            }
+            with open(tmp / MANIFEST, "w") as f:
+                json.dump(manifest, f, indent=2)
+            read_only = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+            for path in tmp.iterdir():
+                path.chmod(read_only)
+            tmp.chmod(read_only | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+            os.rename(tmp, root / f"v{version}")
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+    return manifest, True
@@ -1,7 +1,32 @@
-from django.test import TestCase
+import json
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from django.utils import timezone
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 from accounts.models import User
-from .models import Project, Dataset, Task, Comment
+from labelforge import budgets, throttling
+from labelforge.db_router import (
+    PrimaryReplicaRouter, ReplicaRoutingMiddleware, RoutingState, routing_context,
+)
+from . import active_learning, background, events, preprocessing, review_policy, scheduler, snapshots
+from .agreement import compute_agreement
+from .blobstore import get_blob_store
+from .models import AnnotatorTrust, Project, Dataset, LabelModel, Task, TaskAssignment, TaskEvent, Comment
 
 
 class ModelTests(TestCase):
@@ -171,3 +196,1201 @@ class MetricsAPITest(TestCase):
                      "rejection_rate", "avg_time_per_task", "daily_throughput",
                      "per_annotator", "label_distribution"]:
             self.assertIn(key, data)
+
+
+class TaskImportDedupTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="admin123", role=User.Role.ADMIN
+        )
+        self.project = Project.objects.create(name="Test", created_by=self.admin)
+        self.dataset = Dataset.objects.create(
+            project=self.project, name="DS", labels=["pos", "neg"]
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.original = "The product quality exceeded my expectations. Fast shipping too!"
+        self.near = "The product quality exceeded my expectations. Really fast shipping too!"
+        self.other = "Terrible experience. The item arrived damaged."
+
+    def _bulk(self, texts, dedup):
+        return self.client.post(
+            f"/api/datasets/{self.dataset.id}/tasks/bulk/",
+            {"tasks": [{"text_content": t} for t in texts], "dedup": dedup},
+            format="json",
+        )
+
+    def test_flag_marks_exact_and_near_duplicates(self):
+        resp = self._bulk([self.original, self.original.upper(), self.near, self.other], "flag")
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.json()["created"], 4)
+        self.assertEqual(resp.json()["flagged_duplicates"], 2)
+        first = Task.objects.get(text_content=self.original)
+        self.assertEqual(Task.objects.filter(duplicate_of=first).count(), 2)
+        self.assertIsNone(Task.objects.get(text_content=self.other).duplicate_of)
+
+    def test_skip_checks_against_existing_tasks(self):
+        self._bulk([self.original], "skip")
+        resp = self._bulk([self.near, self.other], "skip")
+        self.assertEqual(resp.json()["created"], 1)
+        self.assertEqual(resp.json()["skipped_duplicates"], 1)
+        self.assertEqual(self.dataset.tasks.count(), 2)
+
+
+class TaskPreprocessingTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="admin123", role=User.Role.ADMIN
+        )
+        project = Project.objects.create(name="Test", created_by=self.admin)
+        self.dataset = Dataset.objects.create(project=project, name="DS", labels=["pos", "neg"])
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_analyze(self):
+        self.assertEqual(
+            preprocessing.analyze("The box was  damaged and the seller did not reply."),
+            (10, "en", preprocessing.content_hash("the box was damaged and the seller did not reply.")),
+        )
+        self.assertEqual(preprocessing.detect_language("El envío fue muy rápido y la calidad es buena."), "es")
+        self.assertEqual(preprocessing.detect_language("配送がとても早かったです。"), "ja")
+        self.assertEqual(preprocessing.detect_language("Доставка была быстрой."), "und-Cyrl")
+        self.assertEqual(preprocessing.detect_language("12345"), "und")
+
+    def test_pool_matches_serial(self):
+        texts = [f"Review number {i} says the product is fine." for i in range(2000)]
+        self.assertEqual(preprocessing.analyze_many(texts, workers=2), preprocessing.analyze_many(texts, workers=1))
+
+    def test_import_stores_features_for_queue_filters(self):
+        texts = ["Great value and the battery lasts for days.", "Bad.", "Très bien, je suis content et le prix est bon."]
+        self.client.post(
+            f"/api/datasets/{self.dataset.id}/tasks/bulk/",
+            {"tasks": [{"text_content": t} for t in texts], "dedup": "off"},
+            format="json",
+        )
+        self.assertEqual(
+            list(self.dataset.tasks.order_by("id").values_list("token_count", "language")),
+            [(8, "en"), (1, "und"), (10, "fr")],
+        )
+        self.assertNotEqual(self.dataset.tasks.first().content_hash, "")
+        resp = self.client.get("/api/tasks/queue/", {"min_tokens": 2, "language": "en"})
+        self.assertEqual([t["token_count"] for t in resp.json()], [8])
+        resp = self.client.get("/api/tasks/queue/", {"min_tokens": "many"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_backfill_command_fills_missing_features(self):
+        task = Task.objects.create(dataset=self.dataset, text_content="The parcel was late.")
+        call_command("backfill_features", stdout=StringIO())
+        task.refresh_from_db()
+        self.assertEqual((task.token_count, task.language), (4, "en"))
+        self.assertEqual(task.content_hash, preprocessing.content_hash("The parcel was late."))
+
+
+class RedundancyAgreementTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="admin123", role=User.Role.ADMIN
+        )
+        self.annotators = [
+            User.objects.create_user(username=f"ann{i}", password="ann123")
+            for i in range(3)
+        ]
+        self.project = Project.objects.create(name="Test", created_by=self.admin)
+        self.dataset = Dataset.objects.create(
+            project=self.project, name="DS", labels=["pos", "neg"], redundancy=2
+        )
+        self.client = APIClient()
+
+    def _annotate(self, user, task, label):
+        self.client.force_authenticate(user)
+        self.client.post(f"/api/tasks/{task.id}/claim/")
+        return self.client.post(
+            f"/api/tasks/{task.id}/submit/",
+            {"annotation": {"label": label}, "time_spent_seconds": 5},
+            format="json",
+        )
+
+    def test_task_submitted_after_k_annotations(self):
+        task = Task.objects.create(dataset=self.dataset, text_content="Text")
+        first = self._annotate(self.annotators[0], task, "pos")
+        self.assertEqual(first.json()["status"], "unclaimed")
+        second = self._annotate(self.annotators[1], task, "pos")
+        self.assertEqual(second.json()["status"], "submitted")
+        self.assertEqual(second.json()["annotation"], {"label": "pos"})
+        self.client.force_authenticate(self.annotators[2])
+        resp = self.client.post(f"/api/tasks/{task.id}/claim/")
+        self.assertEqual(resp.status_code, 400)
+
+    def test_agreement_endpoint(self):
+        labels = [("pos", "pos"), ("neg", "neg"), ("pos", "neg"), ("neg", "neg")]
+        for a, b in labels:
+            task = Task.objects.create(dataset=self.dataset, text_content=f"{a} {b}")
+            self._annotate(self.annotators[0], task, a)
+            self._annotate(self.annotators[1], task, b)
+
+        self.client.force_authenticate(self.admin)
+        resp = self.client.get(f"/api/metrics/agreement/?dataset_id={self.dataset.id}")
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual(data["datasets"][0]["items"], 4)
+        self.assertEqual(data["pairs"][0]["annotator_a"], "ann0")
+        self.assertAlmostEqual(data["pairs"][0]["cohen_kappa"], 0.5)
+        self.assertIsNotNone(data["datasets"][0]["krippendorff_alpha"])
+
+
+class AgreementComputationTest(TestCase):
+    def test_pairs_only_cover_shared_tasks(self):
+        rows = [
+            (1, 1, 10, "pos"), (1, 1, 11, "pos"), (1, 1, 12, "neg"),
+            (1, 2, 10, "neg"), (1, 2, 11, "neg"),
+            (1, 3, 10, "pos"), (1, 3, 11, "neg"),
+            (1, 4, 12, "pos"), (1, 5, 11, "pos"), (1, 5, 13, "pos"),
+        ]
+        pairs = compute_agreement(rows)["pairs"]
+        self.assertEqual([(p["annotator_a"], p["annotator_b"], p["items"]) for p in pairs], [(10, 11, 3)])
+        self.assertAlmostEqual(pairs[0]["cohen_kappa"], 0.4)
+        pairs = compute_agreement(rows, min_overlap=1)["pairs"]
+        self.assertEqual(
+            [(p["annotator_a"], p["annotator_b"]) for p in pairs],
+            [(10, 11), (10, 12), (11, 12), (11, 13)],
+        )
+        # Both sides only ever used one label: kappa is undefined.
+        self.assertIsNone(pairs[3]["cohen_kappa"])
+
+
+class ActiveLearningQueueTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="admin123", role=User.Role.ADMIN
+        )
+        self.annotator = User.objects.create_user(username="ann", password="ann123")
+        self.project = Project.objects.create(name="Test", created_by=self.admin)
+        self.dataset = Dataset.objects.create(
+            project=self.project, name="DS", labels=["pos", "neg"],
+            queue_order=Dataset.QueueOrder.UNCERTAINTY,
+        )
+        for i in range(10):
+            Task.objects.create(
+                dataset=self.dataset, text_content="great lovely excellent",
+                status=Task.Status.APPROVED, annotation={"label": "pos"},
+                reviewed_at=timezone.now(),
+            )
+            Task.objects.create(
+                dataset=self.dataset, text_content="awful broken terrible",
+                status=Task.Status.APPROVED, annotation={"label": "neg"},
+                reviewed_at=timezone.now(),
+            )
+        self.easy = Task.objects.create(dataset=self.dataset, text_content="great excellent")
+        self.hard = Task.objects.create(dataset=self.dataset, text_content="a new unseen text")
+        self.client = APIClient()
+        self.client.force_authenticate(self.annotator)
+
+    def test_scoring_orders_queue_and_claim_next(self):
+        call_command("score_tasks", stdout=StringIO())
+        self.easy.refresh_from_db()
+        self.hard.refresh_from_db()
+        self.assertLess(self.easy.uncertainty, self.hard.uncertainty)
+
+        resp = self.client.get(f"/api/tasks/queue/?dataset_id={self.dataset.id}")
+        self.assertEqual([t["id"] for t in resp.json()], [self.hard.id, self.easy.id])
+
+        resp = self.client.post(f"/api/tasks/claim-next/?dataset_id={self.dataset.id}")
+        self.assertEqual(resp.json()["id"], self.hard.id)
+        self.assertEqual(resp.json()["status"], "in_progress")
+
+    def test_incremental_training_uses_watermark(self):
+        call_command("score_tasks", stdout=StringIO())
+        out = StringIO()
+        call_command("score_tasks", stdout=out)
+        self.assertIn("trained on 0 new approvals, scored 0 tasks", out.getvalue())
+
+    def test_prelabels_are_cached_in_task_payload(self):
+        resp = self.client.get(f"/api/tasks/queue/?dataset_id={self.dataset.id}")
+        self.assertEqual(resp.json()[0]["suggested_label"], "")
+
+        call_command("score_tasks", dataset=self.dataset.id, stdout=StringIO())
+        resp = self.client.get(f"/api/tasks/queue/?dataset_id={self.dataset.id}")
+        easy = next(t for t in resp.json() if t["id"] == self.easy.id)
+        self.assertEqual(easy["suggested_label"], "pos")
+        self.assertGreater(easy["suggested_confidence"], 0.5)
+
+    def _approve(self, count):
+        for _ in range(count):
+            Task.objects.create(
+                dataset=self.dataset, text_content="great lovely", status=Task.Status.APPROVED,
+                annotation={"label": "pos"}, reviewed_at=timezone.now(),
+            )
+
+    def test_scored_tasks_are_only_rescored_after_enough_training(self):
+        call_command("score_tasks", stdout=StringIO())
+        self.assertEqual(LabelModel.objects.get().rescored_examples, 20)
+
+        self._approve(1)
+        out = StringIO()
+        call_command("score_tasks", stdout=out)
+        self.assertIn("trained on 1 new approvals, scored 0 tasks", out.getvalue())
+
+        self._approve(1)
+        out = StringIO()
+        call_command("score_tasks", stdout=out)
+        self.assertIn("trained on 1 new approvals, scored 2 tasks", out.getvalue())
+        self.assertEqual(LabelModel.objects.get().rescored_examples, 22)
+
+    def test_scores_from_a_superseded_model_are_not_written(self):
+        with transaction.atomic():
+            state, classifier = active_learning.load_classifier(self.dataset)
+            state.save()
+        LabelModel.objects.filter(pk=state.pk).update(updated_at=timezone.now())
+        scored, finished = active_learning.score(
+            self.dataset, classifier, 0, rescore_all=True, state=state
+        )
+        self.assertEqual((scored, finished), (0, False))
+        self.easy.refresh_from_db()
+        self.assertIsNone(self.easy.uncertainty)
+
+    def test_background_runs_are_coalesced_per_dataset(self):
+        release = threading.Event()
+        runs = []
+
+        def run(command):
+            runs.append(command[-1])
+            release.wait(5)
+
+        with mock.patch.object(background.subprocess, "run", run):
+            for _ in range(3):
+                active_learning.schedule_scoring(self.dataset.id)
+            release.set()
+            for _ in range(100):
+                if not background._pending:
+                    break
+                time.sleep(0.05)
+        self.assertEqual(runs, [str(self.dataset.id)] * 2)
+
+    def test_blob_stored_texts_are_read_in_full(self):
+        with tempfile.TemporaryDirectory() as blob_dir, override_settings(TEXT_BLOB_DIR=blob_dir):
+            store = get_blob_store()
+            for label, text in (("pos", "great lovely excellent"), ("neg", "awful broken terrible")):
+                Task.objects.filter(annotation__label=label).update(
+                    text_content="preview", text_blob=store.put(text)
+                )
+            Task.objects.filter(pk=self.easy.pk).update(
+                text_content="preview", text_blob=store.put("great excellent")
+            )
+            call_command("score_tasks", dataset=self.dataset.id, stdout=StringIO())
+        self.easy.refresh_from_db()
+        self.assertEqual(self.easy.suggested_label, "pos")
+
+
+class PerformanceInstrumentationTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="admin123", role=User.Role.ADMIN
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_server_timing_header(self):
+        resp = self.client.get("/api/metrics/")
+        timing = resp["Server-Timing"]
+        for metric in ("db;dur=", "app;dur=", "render;dur=", "total;dur="):
+            self.assertIn(metric, timing)
+        self.assertRegex(timing, r'desc="\d+ queries"')
+
+    @override_settings(PERF_SLOW_REQUEST_MS=0)
+    def test_slow_requests_are_logged_with_statements(self):
+        with self.assertLogs("labelforge.slow_requests", level="WARNING") as logs:
+            self.client.get("/api/metrics/")
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["view"], "metrics")
+        self.assertGreater(record["queries"], 0)
+        self.assertTrue(record["slowest_queries"][0]["sql"])
+
+
+class PrometheusMetricsTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="admin123", role=User.Role.ADMIN
+        )
+        project = Project.objects.create(name="Test", created_by=self.admin)
+        self.dataset = Dataset.objects.create(project=project, name="DS", labels=["a"])
+        self.task = Task.objects.create(dataset=self.dataset, text_content="Text")
+        self.client = APIClient()
+
+    def test_exposition_includes_transitions_and_queue_depth(self):
+        self.client.force_authenticate(self.admin)
+        self.client.post(f"/api/tasks/{self.task.id}/claim/")
+        Task.objects.create(dataset=self.dataset, text_content="Other")
+
+        body = self.client.get("/metrics").content.decode()
+        self.assertIn('labelforge_task_transitions_total{transition="claim"}', body)
+        self.assertIn('labelforge_request_duration_seconds_bucket{le="0.005",method="POST",view="task-claim"}', body)
+        self.assertIn(f'labelforge_annotation_queue_depth{{dataset_id="{self.dataset.id}"}} 1.0', body)
+
+    @override_settings(TASK_LEASE_MINUTES=30)
+    def test_expired_leases(self):
+        self.client.force_authenticate(self.admin)
+        self.client.post(f"/api/tasks/{self.task.id}/claim/")
+        stale = Task.objects.create(dataset=self.dataset, text_content="Old")
+        self.client.post(f"/api/tasks/{stale.id}/claim/")
+        TaskEvent.objects.filter(task=stale).update(created_at=timezone.now() - timedelta(hours=1))
+
+        body = self.client.get("/metrics").content.decode()
+        self.assertIn(f'labelforge_expired_leases{{dataset_id="{self.dataset.id}"}} 1.0', body)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_token_required_when_configured(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        resp = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(resp.status_code, 200)
+
+
+class TaskTextStorageTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="admin123", role=User.Role.ADMIN
+        )
+        project = Project.objects.create(name="Test", created_by=self.admin)
+        self.dataset = Dataset.objects.create(project=project, name="DS", labels=["a"])
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.long_text = "é" + "word " * 400
+
+    def _import(self):
+        return self.client.post(
+            f"/api/datasets/{self.dataset.id}/tasks/bulk/",
+            {"tasks": [{"text_content": self.long_text}, {"text_content": "short"}]},
+            format="json",
+        )
+
+    @override_settings(TEXT_PREVIEW_CHARS=50)
+    def test_list_returns_preview_and_content_supports_ranges(self):
+        self._import()
+        rows = self.client.get(f"/api/datasets/{self.dataset.id}/tasks/").json()
+        self.assertEqual(len(rows[0]["text_content"]), 50)
+        self.assertTrue(rows[0]["text_truncated"])
+        self.assertEqual(rows[0]["text_length"], len(self.long_text))
+        self.assertFalse(rows[1]["text_truncated"])
+
+        resp = self.client.get(f"/api/tasks/{rows[0]['id']}/content/")
+        self.assertEqual(resp.content.decode(), self.long_text)
+        resp = self.client.get(f"/api/tasks/{rows[0]['id']}/content/", HTTP_RANGE="bytes=0-5")
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(resp.content, self.long_text.encode()[:6])
+        self.assertEqual(resp["Content-Range"], f"bytes 0-5/{len(self.long_text.encode())}")
+
+    @override_settings(TEXT_PREVIEW_CHARS=50)
+    def test_text_length_is_set_outside_imports(self):
+        task = Task.objects.create(dataset=self.dataset, text_content=self.long_text)
+        self.assertEqual(task.text_length, len(self.long_text))
+        task.text_content = "short"
+        task.save(update_fields=["text_content"])
+        task.refresh_from_db()
+        self.assertEqual(task.text_length, 5)
+        Task.objects.create(dataset=self.dataset, text_content=self.long_text)
+        rows = self.client.get(f"/api/datasets/{self.dataset.id}/tasks/").json()
+        self.assertEqual([row["text_truncated"] for row in rows], [False, True])
+
+    def test_large_texts_go_to_deduplicated_blob_store(self):
+        with tempfile.TemporaryDirectory() as blob_dir, override_settings(
+            TEXT_BLOB_THRESHOLD=1000, TEXT_BLOB_DIR=blob_dir, DEDUP_MODE="off"
+        ):
+            self._import()
+            self._import()
+            task = Task.objects.filter(text_length=len(self.long_text)).first()
+            self.assertTrue(task.text_blob)
+            self.assertLess(len(task.text_content), len(self.long_text))
+            self.assertEqual(task.full_text(), self.long_text)
+            self.assertEqual(Task.objects.filter(text_blob=task.text_blob).count(), 2)
+            resp = self.client.get(f"/api/tasks/{task.id}/content/", HTTP_RANGE="bytes=-5")
+            self.assertEqual(resp.content, self.long_text.encode()[-5:])
+
+
+class FastListSerializationTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="admin123", role=User.Role.ADMIN, email="a@x.io"
+        )
+        self.reviewer = User.objects.create_user(
+            username="rév", password="rev123", role=User.Role.REVIEWER
+        )
+        project = Project.objects.create(name="Test", created_by=self.admin)
+        self.dataset = Dataset.objects.create(
+            project=project, name="DS ü", labels=["pos", "neg"]
+        )
+        now = timezone.now()
+        Task.objects.create(
+            dataset=self.dataset, text_content="Plain ☃ text\u2028", uncertainty=1e-05
+        )
+        rejected = Task.objects.create(
+            dataset=self.dataset, text_content="x" * 900, status=Task.Status.IN_PROGRESS,
+            assigned_to=self.admin, reviewed_by=self.reviewer, annotation={"label": "pos"},
+            submitted_at=now, reviewed_at=now, uncertainty=0.1234567, suggested_label="neg",
+            suggested_confidence=0.71,
+        )
+        Comment.objects.create(task=rejected, author=self.reviewer, body="Fix \"this\"")
+        Comment.objects.create(task=rejected, author=self.reviewer, body="And this")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_fast_path_is_byte_compatible(self):
+        urls = [
+            f"/api/datasets/{self.dataset.id}/tasks/",
+            f"/api/tasks/queue/?dataset_id={self.dataset.id}",
+        ]
+        for url in urls:
+            slow = self.client.get(url)
+            with override_settings(FAST_LIST_SERIALIZATION=True):
+                fast = self.client.get(url)
+            self.assertEqual(fast.status_code, 200)
+            self.assertEqual(fast.content, slow.content)
+            self.assertEqual(fast["Content-Type"], slow["Content-Type"])
+
+
+class ReplicaRoutingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    @override_settings(REPLICA_DATABASE="replica")
+    def test_reads_use_replica_until_the_request_writes(self):
+        self.assertIsNone(self.router.db_for_read(Task))
+        with routing_context(use_replica=True):
+            self.assertEqual(self.router.db_for_read(Task), "replica")
+            self.assertEqual(self.router.db_for_write(Task), "default")
+            self.assertIsNone(self.router.db_for_read(Task))
+        self.assertFalse(self.router.allow_migrate("replica", "projects"))
+
+    @override_settings(REPLICA_DATABASE="replica")
+    def test_write_pins_user_to_primary_across_tokens(self):
+        writer = User.objects.create_user(username="writer", password="pass1234")
+        reader = User.objects.create_user(username="reader", password="pass1234")
+
+        def writing_view(request):
+            self.router.db_for_write(Task)
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(writing_view)(self.factory.post(
+            "/api/tasks/1/claim/", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(writer)}"
+        ))
+
+        def routed_read(user):
+            request = self.factory.get(
+                "/api/metrics/", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+            )
+            request.resolver_match = resolve("/api/metrics/")
+            request.db_routing = RoutingState()
+            ReplicaRoutingMiddleware(None).process_view(request, None, (), {})
+            return request.db_routing.use_replica
+
+        # A refreshed access token is a different header for the same user.
+        self.assertFalse(routed_read(writer))
+        self.assertTrue(routed_read(reader))
+
+
+class ReviewAnalyticsTest(TestCase):
+    def setUp(self):
+        self.reviewer = User.objects.create_user(
+            username="rev", password="pass1234", role=User.Role.REVIEWER
+        )
+        project = Project.objects.create(name="P", created_by=self.reviewer)
+        self.dataset = Dataset.objects.create(project=project, name="D", labels=["a", "b"])
+        now = timezone.now()
+        for seconds in (10, 20, 30, 40, 100):
+            submitted = now - timedelta(hours=1)
+            Task.objects.create(
+                dataset=self.dataset, text_content="t", status=Task.Status.APPROVED,
+                submitted_at=submitted, reviewed_at=submitted + timedelta(seconds=seconds),
+                reviewed_by=self.reviewer,
+            )
+        Task.objects.create(
+            dataset=self.dataset, text_content="t", status=Task.Status.SUBMITTED,
+            submitted_at=now - timedelta(seconds=600),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.reviewer)
+
+    def test_percentiles_match_percentile_cont(self):
+        data = self.client.get("/api/metrics/review-latency/").json()
+        latency = data["review_latency"]
+        self.assertEqual(latency["count"], 5)
+        self.assertAlmostEqual(latency["p50_seconds"], 30, places=0)
+        self.assertAlmostEqual(latency["p90_seconds"], 76, places=0)
+        self.assertAlmostEqual(latency["p99_seconds"], 97.6, places=0)
+        self.assertEqual(data["review_latency_by_reviewer"][0]["reviewer"], "rev")
+        self.assertEqual(data["backlog_age"]["count"], 1)
+        self.assertGreaterEqual(data["backlog_age"]["max_seconds"], 600)
+        self.assertEqual(data["reviewer_throughput"][0]["count"], 5)
+        self.assertEqual(data["reviewer_throughput"][0]["dataset_name"], "D")
+
+    def test_reviewer_throughput_is_split_by_dataset(self):
+        other = Dataset.objects.create(project=self.dataset.project, name="E", labels=["a"])
+        Task.objects.create(
+            dataset=other, text_content="t", status=Task.Status.APPROVED,
+            reviewed_at=timezone.now(), reviewed_by=self.reviewer,
+        )
+        rows = self.client.get("/api/metrics/review-latency/").json()["reviewer_throughput"]
+        self.assertEqual(
+            sorted((row["dataset_name"], row["count"]) for row in rows), [("D", 5), ("E", 1)]
+        )
+
+
+class TaskEventLogTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="pass1234", role=User.Role.ADMIN
+        )
+        project = Project.objects.create(name="P", created_by=self.admin)
+        self.dataset = Dataset.objects.create(project=project, name="D", labels=["a", "b"])
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_transitions_append_events_and_feed_is_incremental(self):
+        self.client.post(
+            f"/api/datasets/{self.dataset.id}/tasks/bulk/",
+            {"tasks": [{"text_content": "one"}, {"text_content": "two"}], "dedup": "off"},
+            format="json",
+        )
+        task = Task.objects.filter(dataset=self.dataset).first()
+        self.client.post(f"/api/tasks/{task.id}/claim/")
+        self.client.post(f"/api/tasks/{task.id}/submit/", {"annotation": {"label": "a"}}, format="json")
+        self.client.post(f"/api/tasks/{task.id}/reject/", {"comment": "no"}, format="json")
+        self.client.post(f"/api/tasks/{task.id}/submit/", {"annotation": {"label": "b"}}, format="json")
+        self.client.post(f"/api/tasks/{task.id}/approve/")
+
+        page = self.client.get("/api/changes/", {"limit": 3}).json()
+        self.assertEqual([e["kind"] for e in page["events"]], ["created", "created", "claimed"])
+        self.assertTrue(page["has_more"])
+        rest = self.client.get("/api/changes/", {"since": page["cursor"]}).json()
+        self.assertEqual(
+            [e["kind"] for e in rest["events"]],
+            ["submitted", "rejected", "submitted", "approved"],
+        )
+        self.assertEqual(rest["events"][-1]["data"], {"annotation": {"label": "b"}})
+        self.assertFalse(rest["has_more"])
+
+        metrics = self.client.get("/api/metrics/").json()
+        self.assertEqual(metrics["rejected"], 1)
+        self.assertEqual(metrics["rejection_rate"], 50.0)
+
+    def test_events_are_append_only(self):
+        task = Task.objects.create(dataset=self.dataset, text_content="t")
+        event = events.record(task, events.Kind.CLAIMED, self.admin)
+        with self.assertRaises(ValueError):
+            event.save()
+
+
+class DatasetSnapshotTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="pass1234", role=User.Role.ADMIN
+        )
+        project = Project.objects.create(name="P", created_by=self.admin)
+        self.dataset = Dataset.objects.create(project=project, name="D", labels=["a", "b"])
+        for text, label in [("first", "b"), ("second", "a"), ("third", "zzz")]:
+            Task.objects.create(
+                dataset=self.dataset, text_content=text, status=Task.Status.APPROVED,
+                annotation={"label": label},
+            )
+        Task.objects.create(dataset=self.dataset, text_content="pending")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        snapshot_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(snapshot_dir.cleanup)
+        settings_override = override_settings(SNAPSHOT_DIR=snapshot_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_snapshot_is_written_once_and_memmappable(self):
+        manifest, created = snapshots.create_snapshot(self.dataset)
+        self.assertTrue(created)
+        self.assertEqual(manifest["version"], 1)
+        self.assertEqual(manifest["num_tasks"], 3)
+
+        path = snapshots.dataset_dir(self.dataset.id) / "v1"
+        labels = np.load(path / "labels.npy", mmap_mode="r")
+        self.assertEqual(labels.tolist(), [1, 0, -1])
+        if manifest["format"] == "npz":
+            with np.load(path / "tasks.npz") as data:
+                offsets = data["text_offsets"]
+                texts = bytes(data["text_data"]).decode()
+                self.assertEqual(texts[offsets[1]:offsets[2]], "second")
+
+        self.assertFalse(snapshots.create_snapshot(self.dataset)[1])
+
+        Task.objects.filter(text_content="pending").update(
+            status=Task.Status.APPROVED, annotation={"label": "a"}
+        )
+        self.assertEqual(snapshots.create_snapshot(self.dataset)[0]["version"], 2)
+        url = f"/api/datasets/{self.dataset.id}/snapshots/"
+        self.assertEqual([m["version"] for m in self.client.get(url).json()], [1, 2])
+
+    def test_any_written_column_changes_the_content_hash(self):
+        snapshots.create_snapshot(self.dataset)
+        # A direct write that records no event, like backfill_features.
+        Task.objects.filter(text_content="first").update(language="en")
+        manifest, created = snapshots.create_snapshot(self.dataset)
+        self.assertTrue(created)
+        self.assertEqual(manifest["version"], 2)
+        self.assertFalse(snapshots.create_snapshot(self.dataset)[1])
+        root = snapshots.dataset_dir(self.dataset.id)
+        self.assertEqual(sorted(p.name for p in root.iterdir()), [".lock", "v1", "v2"])
+
+    def test_empty_dataset_snapshot(self):
+        Task.objects.all().delete()
+        manifest, created = snapshots.create_snapshot(self.dataset)
+        self.assertTrue(created)
+        self.assertEqual(manifest["num_tasks"], 0)
+        path = snapshots.dataset_dir(self.dataset.id) / "v1"
+        self.assertEqual(np.load(path / "labels.npy").tolist(), [])
+
+    def test_post_schedules_a_background_snapshot(self):
+        url = f"/api/datasets/{self.dataset.id}/snapshots/"
+        with mock.patch("projects.views.schedule_snapshot") as schedule:
+            res = self.client.post(url)
+        self.assertEqual(res.status_code, 202)
+        schedule.assert_called_once_with(self.dataset.id)
+
+
+class SchedulerTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="pass1234", role=User.Role.ADMIN
+        )
+        self.annotator = User.objects.create_user(username="ann", password="pass1234")
+        project = Project.objects.create(name="P", created_by=self.admin)
+        self.big = Dataset.objects.create(project=project, name="big", labels=["a"], weight=3)
+        self.small = Dataset.objects.create(project=project, name="small", labels=["a"])
+        for dataset in (self.big, self.small):
+            Task.objects.bulk_create(
+                Task(dataset=dataset, text_content=f"{dataset.name} {i}") for i in range(10)
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.annotator)
+
+    def claim_datasets(self, n):
+        return [
+            self.client.post("/api/tasks/claim-next/").json()["dataset_name"]
+            for _ in range(n)
+        ]
+
+    def test_claims_follow_weighted_fair_share(self):
+        self.assertEqual(sorted(self.claim_datasets(8)), ["big"] * 6 + ["small"] * 2)
+
+    def test_priority_and_quota(self):
+        self.small.priority = 1
+        self.small.daily_quota = 2
+        self.small.save()
+        urgent = Task.objects.filter(dataset=self.big).last()
+        urgent.priority = 5
+        urgent.save()
+        self.assertEqual(self.claim_datasets(3), ["small", "small", "big"])
+        self.assertEqual(
+            Task.objects.get(pk=urgent.pk).assigned_to, self.annotator
+        )
+        blocked = Task.objects.filter(dataset=self.small, status=Task.Status.UNCLAIMED).first()
+        self.assertEqual(self.client.post(f"/api/tasks/{blocked.id}/claim/").status_code, 400)
+        queue = self.client.get("/api/tasks/queue/").json()
+        self.assertNotIn("small", {t["dataset_name"] for t in queue if t["status"] == "unclaimed"})
+
+    def test_ranking_is_one_query(self):
+        for i in range(5):
+            dataset = Dataset.objects.create(
+                project=self.big.project, name=f"extra{i}", labels=["a"], daily_quota=1
+            )
+            Task.objects.create(dataset=dataset, text_content="t")
+        scheduler.record_claim(dataset.id)
+        with self.assertNumQueries(1):
+            ranked = [d.name for d in scheduler.ranked_datasets()]
+        self.assertEqual(ranked, ["big", "small", "extra0", "extra1", "extra2", "extra3"])
+
+    def test_task_priority_is_set_through_bulk_op(self):
+        urgent = Task.objects.filter(dataset=self.small).last()
+        self.client.force_authenticate(self.admin)
+        res = self.client.post("/api/tasks/bulk-op/", {
+            "operation": "prioritize", "filter": {"id_min": urgent.id, "id_max": urgent.id},
+            "priority": 3,
+        }, format="json")
+        self.assertEqual(res.data["prioritized"], 1)
+        self.client.force_authenticate(self.annotator)
+        self.client.post("/api/tasks/claim-next/", {}, format="json")
+        self.client.post("/api/tasks/claim-next/", {}, format="json")
+        self.assertEqual(Task.objects.get(pk=urgent.pk).assigned_to, self.annotator)
+
+    def test_admin_updates_scheduling(self):
+        self.client.force_authenticate(self.admin)
+        res = self.client.patch(
+            f"/api/datasets/{self.small.id}/", {"weight": 5, "daily_quota": 100}, format="json"
+        )
+        self.assertEqual((res.data["weight"], res.data["daily_quota"]), (5, 100))
+
+
+class TaskAdminTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="pass1234", role=User.Role.ADMIN,
+            is_staff=True, is_superuser=True,
+        )
+        self.annotators = [
+            User.objects.create_user(username=f"ann{i}", password="pass1234") for i in range(2)
+        ]
+        project = Project.objects.create(name="P", created_by=self.admin)
+        self.dataset = Dataset.objects.create(project=project, name="D", labels=["a"])
+        self.tasks = Task.objects.bulk_create(
+            Task(
+                dataset=self.dataset, text_content=f"t{i}", status=Task.Status.IN_PROGRESS,
+                assigned_to=self.annotators[i % 2],
+            )
+            for i in range(6)
+        )
+        for task in self.tasks[:2]:
+            Comment.objects.create(task=task, author=self.admin, body="redo")
+        self.client.force_login(self.admin)
+
+    def test_changelists_do_not_query_per_row(self):
+        for url in ("/admin/projects/task/", "/admin/projects/comment/"):
+            with CaptureQueriesContext(connection) as few:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            Task.objects.bulk_create(
+                Task(dataset=self.dataset, text_content="more", assigned_to=self.annotators[1])
+                for _ in range(10)
+            )
+            Comment.objects.bulk_create(
+                Comment(task=self.tasks[3], author=self.annotators[0], body="more")
+                for _ in range(10)
+            )
+            with CaptureQueriesContext(connection) as many:
+                self.client.get(url)
+            self.assertEqual(len(few), len(many), url)
+
+    def test_bulk_actions_are_set_based(self):
+        ids = [t.pk for t in self.tasks]
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post("/admin/projects/task/", {
+                "action": "reassign", "_selected_action": ids[:4],
+                "assignee": self.annotators[1].pk,
+            })
+        self.assertEqual(
+            Task.objects.filter(pk__in=ids[:4], assigned_to=self.annotators[1]).count(), 4
+        )
+        self.assertEqual(
+            TaskEvent.objects.filter(kind=TaskEvent.Kind.REASSIGNED).count(), 2
+        )
+        update_statements = [q for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(update_statements), 1)
+
+        self.client.post("/admin/projects/task/", {
+            "action": "reset_to_unclaimed", "_selected_action": ids,
+        })
+        self.assertEqual(
+            Task.objects.filter(status=Task.Status.UNCLAIMED, assigned_to__isnull=True).count(), 6
+        )
+
+
+class TaskBulkOpTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="pass1234", role=User.Role.ADMIN
+        )
+        self.absent = User.objects.create_user(username="absent", password="pass1234")
+        self.cover = User.objects.create_user(username="cover", password="pass1234")
+        project = Project.objects.create(name="P", created_by=self.admin)
+        self.dataset = Dataset.objects.create(
+            project=project, name="D", labels=["spam", "ham", "junk"]
+        )
+        Task.objects.bulk_create(
+            [Task(dataset=self.dataset, text_content=f"w{i}", status=Task.Status.IN_PROGRESS,
+                  assigned_to=self.absent) for i in range(3)]
+            + [Task(dataset=self.dataset, text_content=f"a{i}", status=Task.Status.APPROVED,
+                    annotation={"label": "junk" if i % 2 else "spam"}) for i in range(4)]
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def bulk_op(self, **body):
+        return self.client.post("/api/tasks/bulk-op/", body, format="json")
+
+    def test_dry_run_reports_counts_without_changes(self):
+        res = self.bulk_op(
+            operation="reassign", filter={"assigned_to": self.absent.id},
+            assignee=self.cover.id, dry_run=True,
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual((res.data["matched"], res.data["reassigned"]), (3, 3))
+        self.assertEqual(Task.objects.filter(assigned_to=self.absent).count(), 3)
+
+        self.bulk_op(
+            operation="reassign", filter={"assigned_to": self.absent.id}, assignee=self.cover.id
+        )
+        self.assertEqual(Task.objects.filter(assigned_to=self.cover).count(), 3)
+
+    def test_relabel_and_drop_label(self):
+        res = self.bulk_op(
+            operation="relabel", filter={"dataset_id": self.dataset.id},
+            from_label="junk", to_label="spam", remove_label=True,
+        )
+        self.assertEqual(res.data["relabeled"], 2)
+        self.assertEqual(res.data["labels"], ["spam", "ham"])
+        self.assertEqual(Task.objects.filter(annotation__label="spam").count(), 4)
+
+    def test_relabel_keeps_other_keys_and_checks_labels(self):
+        Task.objects.filter(annotation__label="junk").update(
+            annotation={"label": "junk", "confidence": 0.4}
+        )
+        res = self.bulk_op(
+            operation="relabel", filter={"dataset_id": self.dataset.id},
+            from_label="junk", to_label="zzz", remove_label=True,
+        )
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(
+            self.bulk_op(operation="relabel", filter={"status": ["approved"]},
+                         from_label="junk", to_label="ham").status_code,
+            400,
+        )
+        self.bulk_op(
+            operation="relabel", filter={"dataset_id": self.dataset.id},
+            from_label="junk", to_label="ham",
+        )
+        self.assertEqual(
+            list(Task.objects.filter(annotation__label="ham").values_list("annotation", flat=True)),
+            [{"label": "ham", "confidence": 0.4}] * 2,
+        )
+
+    def test_assignee_must_be_an_active_annotator(self):
+        reviewer = User.objects.create_user(
+            username="rev", password="pass1234", role=User.Role.REVIEWER
+        )
+        self.cover.is_active = False
+        self.cover.save()
+        for assignee in (reviewer, self.cover):
+            res = self.bulk_op(
+                operation="reassign", filter={"assigned_to": self.absent.id}, assignee=assignee.id
+            )
+            self.assertEqual(res.status_code, 400)
+
+    def test_delete_removes_dependents(self):
+        task = Task.objects.filter(status=Task.Status.APPROVED).first()
+        Comment.objects.create(task=task, author=self.admin, body="x")
+        events.record(task, events.Kind.APPROVED, self.admin)
+        res = self.bulk_op(
+            operation="delete", filter={"dataset_id": self.dataset.id, "status": ["approved"]}
+        )
+        self.assertEqual(res.data["deleted"], 4)
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(Task.objects.count(), 3)
+        self.assertTrue(TaskEvent.objects.filter(task_id=task.id, kind="approved").exists())
+        feed = self.client.get("/api/changes/", {"kind": "deleted"}).json()["events"]
+        self.assertEqual(len(feed), 4)
+        self.assertIn(task.id, [event["task"] for event in feed])
+
+    def test_reset_includes_partly_claimed_redundant_tasks(self):
+        task = Task.objects.create(dataset=self.dataset, text_content="r")
+        TaskAssignment.objects.create(
+            task=task, annotator=self.cover, status=TaskAssignment.Status.SUBMITTED,
+            annotation={"label": "ham"},
+        )
+        res = self.bulk_op(
+            operation="reset", filter={"dataset_id": self.dataset.id, "status": ["unclaimed"]}
+        )
+        self.assertEqual(res.data["reset"], 1)
+        self.assertFalse(TaskAssignment.objects.exists())
+        self.assertEqual(TaskEvent.objects.filter(task=task, kind="reset").count(), 1)
+
+    def test_requires_a_filter(self):
+        self.assertEqual(self.bulk_op(operation="reset", filter={}).status_code, 400)
+        for empty in ({"status": []}, {"language": ""}):
+            res = self.bulk_op(operation="delete", filter=empty, dry_run=True)
+            self.assertEqual(res.status_code, 400, empty)
+        self.assertEqual(Task.objects.count(), 7)
+
+
+class DatasetCloneTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="pass1234", role=User.Role.ADMIN
+        )
+        project = Project.objects.create(name="P", created_by=self.admin)
+        self.dataset = Dataset.objects.create(project=project, name="D", labels=["pos", "neg"])
+        Task.objects.bulk_create([
+            Task(dataset=self.dataset, text_content="good", status=Task.Status.APPROVED,
+                 annotation={"label": "pos"}, assigned_to=self.admin, time_spent_seconds=9),
+            Task(dataset=self.dataset, text_content="bad", status=Task.Status.APPROVED,
+                 annotation={"label": "neg"}),
+            Task(dataset=self.dataset, text_content="new"),
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_clone_with_labels_as_suggestions(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(
+                f"/api/datasets/{self.dataset.id}/clone/",
+                {"labels": ["pos", "neg", "mixed"], "status": ["approved"], "include_labels": True},
+                format="json",
+            )
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.data["cloned_tasks"], 2)
+        self.assertEqual(res.data["labels"], ["pos", "neg", "mixed"])
+        self.assertEqual(
+            len([q for q in queries if q["sql"].startswith('INSERT INTO "projects_task"')]), 1
+        )
+        clones = Task.objects.filter(dataset_id=res.data["id"]).order_by("id")
+        self.assertEqual(
+            [(t.text_content, t.status, t.suggested_label, t.assigned_to_id) for t in clones],
+            [("good", "unclaimed", "pos", None), ("bad", "unclaimed", "neg", None)],
+        )
+        self.assertEqual(
+            TaskEvent.objects.filter(dataset_id=res.data["id"], kind="created").count(), 2
+        )
+
+    def test_clone_keeps_near_duplicate_detection(self):
+        original = "The product quality exceeded my expectations. Fast shipping too!"
+        self.client.post(
+            f"/api/datasets/{self.dataset.id}/tasks/bulk/",
+            {"tasks": [{"text_content": original}], "dedup": "skip"},
+            format="json",
+        )
+        source = Task.objects.get(text_content=original)
+        res = self.client.post(f"/api/datasets/{self.dataset.id}/clone/", {}, format="json")
+        copy = Task.objects.get(dataset_id=res.data["id"], text_content=original)
+        self.assertEqual(bytes(copy.fingerprint.signature), bytes(source.fingerprint.signature))
+        self.assertEqual(
+            sorted(copy.lsh_buckets.values_list("dataset_id", "key")),
+            sorted((res.data["id"], key) for key in source.lsh_buckets.values_list("key", flat=True)),
+        )
+        resp = self.client.post(
+            f"/api/datasets/{res.data['id']}/tasks/bulk/",
+            {"tasks": [{"text_content": original.replace("Fast", "Really fast")}], "dedup": "skip"},
+            format="json",
+        )
+        self.assertEqual(resp.json()["skipped_duplicates"], 1)
+
+    def test_clone_text_only(self):
+        res = self.client.post(f"/api/datasets/{self.dataset.id}/clone/", {}, format="json")
+        self.assertEqual(res.data["name"], "D (copy)")
+        clones = Task.objects.filter(dataset_id=res.data["id"])
+        self.assertEqual(clones.count(), 3)
+        self.assertFalse(clones.exclude(suggested_label="").exists())
+        self.assertEqual(TaskEvent.objects.filter(dataset_id=res.data["id"]).count(), 3)
+
+
+class ThrottlingTest(TestCase):
+    def setUp(self):
+        throttling._connection().execute("DELETE FROM bucket")
+        self.users = [
+            User.objects.create_user(username=f"ann{i}", password="pass1234") for i in range(2)
+        ]
+        self.client = APIClient()
+
+    def test_bucket_refills_over_time(self):
+        self.assertEqual(throttling.take("k", 2, 60, now=0), 0)
+        self.assertEqual(throttling.take("k", 2, 60, now=0), 0)
+        self.assertEqual(throttling.take("k", 2, 60, now=0), 30)
+        self.assertEqual(throttling.take("k", 2, 60, now=30), 0)
+
+    @override_settings(THROTTLE_RATES={"expensive_read": "2/min", "user": "100/min"})
+    def test_expensive_reads_get_429_per_user(self):
+        self.client.force_authenticate(self.users[0])
+        statuses = [self.client.get("/api/tasks/queue/").status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+        resp = self.client.get("/api/tasks/queue/")
+        self.assertEqual(resp["Retry-After"], "30")
+        # Other endpoint classes and other users keep their own budgets.
+        self.assertEqual(self.client.get("/api/projects/").status_code, 200)
+        self.client.force_authenticate(self.users[1])
+        self.assertEqual(self.client.get("/api/tasks/queue/").status_code, 200)
+
+
+class BatchRequestTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="pass1234", role=User.Role.ADMIN
+        )
+        project = Project.objects.create(name="P", created_by=self.admin)
+        self.dataset = Dataset.objects.create(project=project, name="D", labels=["pos", "neg"])
+        self.task = Task.objects.create(dataset=self.dataset, text_content="hello")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_runs_subrequests_in_order(self):
+        paths = [
+            "/api/projects/",
+            f"/api/metrics/?dataset_id={self.dataset.id}",
+            f"/api/datasets/{self.dataset.id}/",
+            f"/api/datasets/{self.dataset.id}/tasks/",
+            "/api/missing/",
+            f"/api/tasks/{self.task.id}/content/",
+        ]
+        resp = self.client.post("/api/batch/", {"requests": [{"path": p} for p in paths]}, format="json")
+        self.assertEqual(resp.status_code, 200)
+        responses = resp.json()["responses"]
+        self.assertEqual([r["status"] for r in responses], [200, 200, 200, 200, 404, 406])
+        for path, sub in zip(paths[:4], responses):
+            self.assertEqual(sub["body"], self.client.get(path).json())
+
+    def test_dataset_row_is_shared(self):
+        paths = [f"/api/datasets/{self.dataset.id}/", f"/api/datasets/{self.dataset.id}/tasks/"]
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post("/api/batch/", {"requests": [{"path": p} for p in paths]}, format="json")
+        dataset_table = Dataset._meta.db_table
+        self.assertEqual(
+            len([q for q in queries if q["sql"].startswith("SELECT") and f'FROM "{dataset_table}"' in q["sql"]]),
+            1,
+        )
+
+    def test_rejects_non_api_paths_and_nesting(self):
+        resp = self.client.post("/api/batch/", {"requests": [{"path": "/admin/"}]}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        resp = self.client.post("/api/batch/", {"requests": [{"path": "/api/batch/"}]}, format="json")
+        self.assertEqual(resp.json()["responses"][0]["status"], 400)
+
+
+class ProjectCatalogueTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="pass1234", role=User.Role.ADMIN
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _project(self, name, statuses):
+        project = Project.objects.create(name=name, created_by=self.admin)
+        for i in range(2):
+            dataset = Dataset.objects.create(project=project, name=f"{name}{i}", labels=["a"])
+            Task.objects.bulk_create(Task(dataset=dataset, text_content="t", status=s) for s in statuses)
+        return project
+
+    def test_progress_counts_and_ordering(self):
+        self._project("half", ["approved", "submitted"])
+        self._project("done", ["approved"])
+        self._project("empty", [])
+        resp = self.client.get("/api/projects/", {"ordering": "-progress"})
+        self.assertEqual(resp.status_code, 200)
+        rows = resp.json()["results"]
+        self.assertEqual([r["name"] for r in rows], ["done", "half", "empty"])
+        self.assertEqual(rows[1]["dataset_count"], 2)
+        self.assertEqual(rows[1]["progress"], 0.5)
+        self.assertEqual(
+            rows[1]["task_counts"],
+            {"total": 4, "unclaimed": 0, "in_progress": 0, "submitted": 2, "approved": 2, "rejected": 0},
+        )
+        self.assertEqual(self.client.get("/api/projects/", {"ordering": "x"}).status_code, 400)
+
+    def test_query_count_is_fixed(self):
+        for i in range(5):
+            self._project(f"p{i}", ["approved", "unclaimed"])
+        # Authentication is forced, so only the page count and the page query run.
+        with self.assertNumQueries(2):
+            resp = self.client.get("/api/projects/", {"page_size": 3})
+        self.assertEqual(resp.json()["count"], 5)
+        self.assertEqual(len(resp.json()["results"]), 3)
+
+
+class QueryBudgetTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin", password="pass1234", role=User.Role.ADMIN
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _budgets(self, **expensive_read):
+        limits = {"queries": 50, "db_ms": None, "statement_ms": None, **expensive_read}
+        return override_settings(QUERY_BUDGETS={**settings.QUERY_BUDGETS, "expensive_read": limits})
+
+    def test_query_count_over_budget_returns_503(self):
+        with self._budgets(queries=1):
+            resp = self.client.get("/api/metrics/")
+            self.assertEqual(resp.status_code, 503)
+            # Other endpoint classes keep their own budgets.
+            self.assertEqual(self.client.get("/api/projects/").status_code, 200)
+
+    def test_sqlite_statement_timeout(self):
+        budget = budgets.QueryBudget()
+        with self._budgets(statement_ms=1):
+            budget.start("metrics")
+        with connection.execute_wrapper(budget), self.assertRaises(OperationalError) as ctx:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n "
+                    "WHERE i < 100000000) SELECT count(*) FROM n"
+                )
+        budget.release()
+        self.assertTrue(budgets.is_overload(ctx.exception))
+
+
+class SampledReviewTest(TestCase):
+    def setUp(self):
+        self.annotator = User.objects.create_user(username="ann", password="pass1234")
+        self.reviewer = User.objects.create_user(
+            username="rev", password="pass1234", role=User.Role.REVIEWER
+        )
+        project = Project.objects.create(name="P", created_by=self.reviewer)
+        self.dataset = Dataset.objects.create(
+            project=project, name="D", labels=["pos", "neg"],
+            review_policy=Dataset.ReviewPolicy.SAMPLED, review_sample_rate=0.0,
+        )
+        self.client = APIClient()
+
+    def _submit(self):
+        task = Task.objects.create(
+            dataset=self.dataset, text_content="t", status=Task.Status.IN_PROGRESS,
+            assigned_to=self.annotator,
+        )
+        self.client.force_authenticate(self.annotator)
+        self.client.post(f"/api/tasks/{task.id}/submit/", {"annotation": {"label": "pos"}}, format="json")
+        task.refresh_from_db()
+        return task
+
+    def test_unsampled_submissions_skip_the_queue_and_are_auto_approved(self):
+        task = self._submit()
+        self.assertFalse(task.needs_review)
+        self.client.force_authenticate(self.reviewer)
+        self.assertEqual(self.client.get("/api/tasks/review-queue/").json(), [])
+
+        call_command("auto_approve", delay_minutes=0, stdout=StringIO())
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.Status.APPROVED)
+        self.assertIsNone(task.reviewed_by)
+        self.assertTrue(TaskEvent.objects.filter(task=task, kind="approved", data__auto=True).exists())
+        self.assertFalse(AnnotatorTrust.objects.exists())
+
+    def test_adaptive_rate_follows_trust(self):
+        self.dataset.review_policy = Dataset.ReviewPolicy.ADAPTIVE
+        self.dataset.review_sample_rate = 0.1
+        self.dataset.save()
+        self.assertEqual(review_policy.review_probability(self.dataset, self.annotator.pk), 1.0)
+        self.assertTrue(self._submit().needs_review)
+
+        for _ in range(30):
+            review_policy.record_review(self.annotator.pk, approved=True)
+        trust = AnnotatorTrust.objects.get(annotator=self.annotator)
+        self.assertEqual(trust.reviews, 30)
+        self.assertAlmostEqual(trust.score, 1 - 0.9 ** 30)
+        self.assertEqual(review_policy.review_probability(self.dataset, self.annotator.pk), 0.1)
+
+        review_policy.record_review(self.annotator.pk, approved=False)
+        self.assertAlmostEqual(
+            review_policy.review_probability(self.dataset, self.annotator.pk), 1 - 0.9 * (1 - 0.9 ** 30)
+        )
+
+    def test_reviews_update_trust(self):
+        task = self._submit()
+        Task.objects.filter(pk=task.pk).update(needs_review=True)
+        self.client.force_authenticate(self.reviewer)
+        self.client.post(f"/api/tasks/{task.id}/approve/")
+        self.assertAlmostEqual(AnnotatorTrust.objects.get(annotator=self.annotator).score, 0.1)
+
+    def test_resubmission_after_rejection_is_always_reviewed(self):
+        task = self._submit()
+        Task.objects.filter(pk=task.pk).update(needs_review=True)
+        self.client.force_authenticate(self.reviewer)
+        self.client.post(f"/api/tasks/{task.id}/reject/", {"comment": "wrong"}, format="json")
+
+        self.client.force_authenticate(self.annotator)
+        self.client.post(f"/api/tasks/{task.id}/submit/", {"annotation": {"label": "neg"}}, format="json")
+        task.refresh_from_db()
+        self.assertTrue(task.needs_review)
+        self.client.force_authenticate(self.reviewer)
+        queue = self.client.get("/api/tasks/review-queue/").json()
+        self.assertEqual([t["id"] for t in queue], [task.id])
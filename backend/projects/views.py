@@ -1,17 +1,36 @@
+import io
+import re
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.http import HttpResponse
 from django.utils import timezone
-from django.db.models import Q, Count, Avg, F
-from django.db.models.functions import TruncDate
+from django.db import transaction
+from django.db.models import Q, Case, Count, Avg, F, FloatField, Value, When
+from django.db.models.functions import Cast
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Substr, TruncDate
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from accounts.models import User
-from .models import Project, Dataset, Task, Comment
+from labelforge.telemetry import record_transition
+from . import bulk_ops, events, fast_serializers, review_policy, scheduler
+from .agreement import compute_agreement
+from .analytics import backlog_age, length_throughput, review_latency, reviewer_throughput
+from .blobstore import get_blob_store
+from .importing import import_tasks
+from .snapshots import list_snapshots, schedule_snapshot
+from .models import AnnotatorTrust, Project, Dataset, Task, TaskAssignment, TaskEvent, Comment
 from .serializers import (
-    ProjectSerializer, ProjectCreateSerializer,
-    DatasetSerializer, DatasetCreateSerializer,
-    TaskSerializer, CommentSerializer, TaskBulkCreateSerializer,
+    ProjectSerializer, ProjectListSerializer, ProjectCreateSerializer,
+    DatasetSerializer, DatasetCreateSerializer, DatasetSchedulingSerializer, DatasetCloneSerializer,
+    TaskSerializer, TaskListSerializer, CommentSerializer, TaskBulkCreateSerializer,
+    TaskBulkOpSerializer,
 )
 
 
@@ -27,14 +46,78 @@ def is_annotator(user):
     return user.role in (User.Role.ANNOTATOR, User.Role.ADMIN)
 
 
+def _get_dataset(request, pk):
+    """``Dataset.objects.get``, shared by the sub-requests of one ``/api/batch/``."""
+    cache = getattr(request, "batch_cache", None)
+    if cache is None:
+        return Dataset.objects.get(pk=pk)
+    key = ("dataset", int(pk))
+    if key not in cache:
+        cache[key] = Dataset.objects.get(pk=pk)
+    return cache[key]
+
+
 # --- Projects ---
 
+PROJECT_ORDERINGS = {
+    "created": "created_at",
+    "-created": "-created_at",
+    "name": "name",
+    "-name": "-name",
+    "progress": "progress",
+    "-progress": "-progress",
+}
+
+
+class ProjectPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+def with_progress(projects):
+    """Annotate dataset and per-status task counts in one grouped query.
+
+    ``progress`` is the approved share of all tasks (0 for empty projects).
+    """
+    task_status = "datasets__tasks__status"
+    projects = projects.select_related("created_by").annotate(
+        dataset_count=Count("datasets", distinct=True),
+        task_total=Count("datasets__tasks"),
+        **{
+            f"tasks_{s}": Count("datasets__tasks", filter=Q(**{task_status: s}))
+            for s in Task.Status.values
+        },
+    )
+    return projects.annotate(
+        progress=Case(
+            When(task_total=0, then=Value(0.0)),
+            default=Cast(F(f"tasks_{Task.Status.APPROVED}"), FloatField()) / F("task_total"),
+            output_field=FloatField(),
+        )
+    )
+
+
 @api_view(["GET", "POST"])
 @permission_classes([IsAuthenticated])
 def project_list(request):
+    """Paginated project catalogue with progress, or create a project.
+
+    ``ordering`` is one of ``PROJECT_ORDERINGS`` (default ``-created``).
+    """
     if request.method == "GET":
-        projects = Project.objects.all().order_by("-created_at")
-        return Response(ProjectSerializer(projects, many=True).data)
+        ordering = request.query_params.get("ordering", "-created")
+        if ordering not in PROJECT_ORDERINGS:
+            return Response(
+                {"detail": f"ordering must be one of: {', '.join(PROJECT_ORDERINGS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        projects = with_progress(Project.objects.all()).order_by(
+            PROJECT_ORDERINGS[ordering], "-id"
+        )
+        paginator = ProjectPagination()
+        page = paginator.paginate_queryset(projects, request)
+        return paginator.get_paginated_response(ProjectListSerializer(page, many=True).data)
 
     if not is_admin(request.user):
         return Response(
@@ -83,28 +166,168 @@ def dataset_create(request, project_id):
     return Response(DatasetSerializer(dataset).data, status=status.HTTP_201_CREATED)
 
 
-@api_view(["GET"])
+@api_view(["GET", "PATCH"])
 @permission_classes([IsAuthenticated])
 def dataset_detail(request, pk):
     try:
-        dataset = Dataset.objects.get(pk=pk)
+        dataset = _get_dataset(request, pk)
     except Dataset.DoesNotExist:
         return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+    if request.method == "PATCH":
+        if not is_admin(request.user):
+            return Response(
+                {"detail": "Only admins can change dataset scheduling."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        serializer = DatasetSchedulingSerializer(dataset, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
     return Response(DatasetSerializer(dataset).data)
 
 
 # --- Tasks ---
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def dataset_clone(request, pk):
+    """Copy a dataset's texts into a new dataset for another labelling pass."""
+    if not is_admin(request.user):
+        return Response(
+            {"detail": "Only admins can clone datasets."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    try:
+        source = Dataset.objects.get(pk=pk)
+    except Dataset.DoesNotExist:
+        return Response({"detail": "Dataset not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    serializer = DatasetCloneSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    options = serializer.validated_data
+
+    with transaction.atomic():
+        clone = Dataset.objects.create(
+            project_id=source.project_id,
+            name=options.get("name") or f"{source.name} (copy)",
+            labels=options.get("labels", source.labels),
+            redundancy=source.redundancy,
+            queue_order=source.queue_order,
+            priority=source.priority,
+            weight=source.weight,
+            daily_quota=source.daily_quota,
+            review_policy=source.review_policy,
+            review_sample_rate=source.review_sample_rate,
+        )
+        cloned = bulk_ops.clone_tasks(
+            source, clone, options.get("status"), options["include_labels"]
+        )
+    return Response(
+        {"cloned_tasks": cloned, **DatasetSerializer(clone).data},
+        status=status.HTTP_201_CREATED,
+    )
+
+
+@api_view(["GET", "POST"])
+@permission_classes([IsAuthenticated])
+def dataset_snapshots(request, pk):
+    """List snapshot manifests, or schedule a new snapshot.
+
+    Snapshots are built by a background ``snapshot_dataset`` run, which only
+    writes a version if the dataset changed; poll GET for the result.
+    """
+    try:
+        dataset = _get_dataset(request, pk)
+    except Dataset.DoesNotExist:
+        return Response({"detail": "Dataset not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == "GET":
+        return Response(list_snapshots(dataset.pk))
+
+    if not is_admin(request.user):
+        return Response(
+            {"detail": "Only admins can create snapshots."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    schedule_snapshot(dataset.pk)
+    return Response({"detail": "Snapshot scheduled."}, status=status.HTTP_202_ACCEPTED)
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def task_list(request, dataset_id):
     try:
-        dataset = Dataset.objects.get(pk=dataset_id)
+        dataset = _get_dataset(request, dataset_id)
     except Dataset.DoesNotExist:
         return Response({"detail": "Dataset not found."}, status=status.HTTP_404_NOT_FOUND)
 
-    tasks = dataset.tasks.all().order_by("id")
-    return Response(TaskSerializer(tasks, many=True).data)
+    try:
+        tasks = _filter_features(dataset.tasks.all(), request.query_params)
+    except ValueError:
+        return _invalid_feature_filter()
+    return task_list_response(with_text_preview(tasks).order_by("id"))
+
+
+def task_list_response(tasks):
+    """Render a task list via the flat fast path or ``TaskListSerializer``."""
+    if settings.FAST_LIST_SERIALIZATION:
+        return fast_serializers.task_list_response(tasks)
+    tasks = tasks.select_related(
+        "dataset", "assigned_to", "reviewed_by"
+    ).prefetch_related("comments__author")
+    return Response(TaskListSerializer(tasks, many=True).data)
+
+
+def with_text_preview(tasks, prefix=""):
+    """Defer full task text and annotate a DB-side truncated ``text_preview``."""
+    return tasks.defer(f"{prefix}text_content").annotate(
+        text_preview=Substr(f"{prefix}text_content", 1, settings.TEXT_PREVIEW_CHARS)
+    )
+
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def task_content(request, pk):
+    """Full task text as UTF-8, honouring a single ``Range: bytes=`` header."""
+    try:
+        task = Task.objects.only("text_content", "text_blob").get(pk=pk)
+    except Task.DoesNotExist:
+        return Response({"detail": "Task not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    if task.text_blob:
+        store = get_blob_store()
+        size = store.size(task.text_blob)
+        source = store.open(task.text_blob)
+    else:
+        data = task.text_content.encode("utf-8")
+        size = len(data)
+        source = io.BytesIO(data)
+
+    with source:
+        match = _RANGE.match(request.headers.get("Range", ""))
+        if not match or not any(match.groups()):
+            response = HttpResponse(source.read(), content_type="text/plain; charset=utf-8")
+        else:
+            first, last = match.groups()
+            if first:
+                start, end = int(first), min(int(last) if last else size - 1, size - 1)
+            else:
+                start, end = max(size - int(last), 0), size - 1
+            if start >= size or start > end:
+                response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+                response["Content-Range"] = f"bytes */{size}"
+                return response
+            source.seek(start)
+            response = HttpResponse(
+                source.read(end - start + 1),
+                content_type="text/plain; charset=utf-8",
+                status=status.HTTP_206_PARTIAL_CONTENT,
+            )
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
 
 
 @api_view(["POST"])
@@ -123,7 +346,7 @@ def task_bulk_create(request, dataset_id):
     serializer = TaskBulkCreateSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
 
-    tasks = []
+    texts = []
     for item in serializer.validated_data["tasks"]:
         text_content = item.get("text_content", "")
         if not text_content:
@@ -131,15 +354,113 @@ def task_bulk_create(request, dataset_id):
                 {"detail": "Each task must have text_content."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        tasks.append(Task(dataset=dataset, text_content=text_content))
+        texts.append(text_content)
 
-    Task.objects.bulk_create(tasks)
+    result = import_tasks(dataset, texts, dedup=serializer.validated_data.get("dedup"))
     return Response(
-        {"detail": f"Created {len(tasks)} tasks."},
+        {
+            "detail": f"Created {result.created} tasks.",
+            "created": result.created,
+            "skipped_duplicates": result.skipped,
+            "flagged_duplicates": result.flagged,
+        },
         status=status.HTTP_201_CREATED,
     )
 
 
+def _filter_tasks(criteria):
+    tasks = Task.objects.all()
+    if "dataset_id" in criteria:
+        tasks = tasks.filter(dataset_id=criteria["dataset_id"])
+    if "status" in criteria:
+        tasks = tasks.filter(status__in=criteria["status"])
+    if "assigned_to" in criteria:
+        tasks = tasks.filter(assigned_to_id=criteria["assigned_to"])
+    if "id_min" in criteria:
+        tasks = tasks.filter(id__gte=criteria["id_min"])
+    if "id_max" in criteria:
+        tasks = tasks.filter(id__lte=criteria["id_max"])
+    return _filter_features(tasks, criteria)
+
+
+def _filter_features(tasks, params):
+    """Narrow by ``min_tokens``, ``max_tokens`` and ``language``.
+
+    Raises ``ValueError`` for non-integer token bounds from query strings.
+    """
+    if params.get("min_tokens") not in (None, ""):
+        tasks = tasks.filter(token_count__gte=int(params["min_tokens"]))
+    if params.get("max_tokens") not in (None, ""):
+        tasks = tasks.filter(token_count__lte=int(params["max_tokens"]))
+    if params.get("language"):
+        tasks = tasks.filter(language=params["language"])
+    return tasks
+
+
+def _invalid_feature_filter():
+    return Response(
+        {"detail": "min_tokens and max_tokens must be integers."},
+        status=status.HTTP_400_BAD_REQUEST,
+    )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def task_bulk_op(request):
+    """Run one set-based operation over the tasks matching ``filter``.
+
+    With ``dry_run`` the operation runs in a transaction that is rolled back,
+    so the reported counts are exact but nothing changes.
+    """
+    if not is_admin(request.user):
+        return Response(
+            {"detail": "Only admins can run bulk operations."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    serializer = TaskBulkOpSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+    operation = data["operation"]
+    dataset_id = data["filter"].get("dataset_id")
+    if dataset_id is not None:
+        labels = Dataset.objects.filter(pk=dataset_id).values_list("labels", flat=True).first()
+        if labels is None:
+            return Response({"detail": "Dataset not found."}, status=status.HTTP_404_NOT_FOUND)
+        to_label = data.get("to_label")
+        if operation == "relabel" and to_label is not None and to_label not in labels:
+            return Response(
+                {"detail": f"'{to_label}' is not one of the dataset's labels."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+    tasks = _filter_tasks(data["filter"])
+
+    with transaction.atomic():
+        result = {"matched": tasks.count()}
+        if operation == "reassign":
+            result["reassigned"] = bulk_ops.reassign(tasks, data["assignee"], request.user)
+        elif operation == "reset":
+            result["reset"] = bulk_ops.reset_to_unclaimed(tasks, request.user)
+        elif operation == "relabel":
+            counts = bulk_ops.relabel(
+                tasks, data["from_label"], data.get("to_label"), request.user
+            )
+            result["relabeled" if data.get("to_label") else "reset"] = counts["tasks"]
+            result["assignments_relabeled"] = counts["assignments"]
+            if data["remove_label"]:
+                dataset = Dataset.objects.select_for_update().get(pk=dataset_id)
+                dataset.labels = [label for label in dataset.labels if label != data["from_label"]]
+                dataset.save(update_fields=["labels"])
+                result["labels"] = dataset.labels
+        elif operation == "prioritize":
+            result["prioritized"] = bulk_ops.set_priority(tasks, data["priority"])
+        else:
+            result["deleted"] = bulk_ops.delete(tasks, request.user)
+        if data["dry_run"]:
+            transaction.set_rollback(True)
+
+    return Response({"operation": operation, "dry_run": data["dry_run"], **result})
+
+
 # --- Task Workflow ---
 
 @api_view(["POST"])
@@ -151,7 +472,7 @@ def task_claim(request, pk):
             status=status.HTTP_403_FORBIDDEN,
         )
     try:
-        task = Task.objects.get(pk=pk)
+        task = Task.objects.select_related("dataset").get(pk=pk)
     except Task.DoesNotExist:
         return Response({"detail": "Task not found."}, status=status.HTTP_404_NOT_FOUND)
 
@@ -161,9 +482,82 @@ def task_claim(request, pk):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
+    if scheduler.quota_reached(task.dataset):
+        return Response(
+            {"detail": "This dataset has reached its daily quota."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if task.dataset.redundancy > 1:
+        return _claim_assignment(request, task)
+
     task.status = Task.Status.IN_PROGRESS
     task.assigned_to = request.user
-    task.save()
+    with transaction.atomic():
+        task.save(update_fields=["status", "assigned_to"])
+        events.record(task, events.Kind.CLAIMED, request.user)
+        scheduler.record_claim(task.dataset_id)
+    record_transition("claim")
+    return Response(TaskSerializer(task).data)
+
+
+def _claim_assignment(request, task):
+    """Redundancy mode: each claim adds one of the dataset's k assignments."""
+    with transaction.atomic():
+        task = Task.objects.select_for_update().select_related("dataset").get(pk=task.pk)
+        assignment, created = TaskAssignment.objects.get_or_create(
+            task=task, annotator=request.user
+        )
+        if not created and assignment.status != TaskAssignment.Status.IN_PROGRESS:
+            return Response(
+                {"detail": "You have already annotated this task."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if created:
+            events.record(task, events.Kind.CLAIMED, request.user)
+            scheduler.record_claim(task.dataset_id)
+        if created and task.assignments.count() >= task.dataset.redundancy:
+            task.status = Task.Status.IN_PROGRESS
+            task.save(update_fields=["status"])
+    if created:
+        record_transition("claim")
+    return Response(TaskSerializer(task).data)
+
+
+def _submit_assignment(request, task, annotation, time_spent):
+    """Redundancy mode: record one annotation; the task is submitted once all k are in."""
+    with transaction.atomic():
+        task = Task.objects.select_for_update().select_related("dataset").get(pk=task.pk)
+        try:
+            assignment = task.assignments.get(
+                annotator=request.user, status=TaskAssignment.Status.IN_PROGRESS
+            )
+        except TaskAssignment.DoesNotExist:
+            return Response(
+                {"detail": "Only an assigned user can submit this task."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        assignment.status = TaskAssignment.Status.SUBMITTED
+        assignment.annotation = annotation
+        assignment.submitted_at = timezone.now()
+        assignment.time_spent_seconds = time_spent
+        assignment.save()
+        events.record(
+            task, events.Kind.SUBMITTED, request.user,
+            annotation=annotation, time_spent_seconds=time_spent,
+        )
+
+        submitted = list(task.assignments.filter(status=TaskAssignment.Status.SUBMITTED))
+        if len(submitted) >= task.dataset.redundancy:
+            votes = Counter(
+                a.annotation.get("label") for a in submitted if isinstance(a.annotation, dict)
+            )
+            task.status = Task.Status.SUBMITTED
+            task.annotation = {"label": votes.most_common(1)[0][0]} if votes else annotation
+            task.submitted_at = assignment.submitted_at
+            task.time_spent_seconds = sum(a.time_spent_seconds for a in submitted)
+            task.save(update_fields=["status", "annotation", "submitted_at", "time_spent_seconds"])
+    record_transition("submit")
     return Response(TaskSerializer(task).data)
 
 
@@ -171,10 +565,25 @@ def task_claim(request, pk):
 @permission_classes([IsAuthenticated])
 def task_submit(request, pk):
     try:
-        task = Task.objects.get(pk=pk)
+        task = Task.objects.select_related("dataset").get(pk=pk)
     except Task.DoesNotExist:
         return Response({"detail": "Task not found."}, status=status.HTTP_404_NOT_FOUND)
 
+    if task.dataset.redundancy > 1:
+        if task.status not in (Task.Status.UNCLAIMED, Task.Status.IN_PROGRESS):
+            return Response(
+                {"detail": f"Cannot submit task with status '{task.status}'."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        annotation = request.data.get("annotation")
+        if not annotation:
+            return Response(
+                {"detail": "Annotation data is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        time_spent = request.data.get("time_spent_seconds", 0)
+        return _submit_assignment(request, task, annotation, time_spent)
+
     if task.status != Task.Status.IN_PROGRESS:
         return Response(
             {"detail": f"Cannot submit task with status '{task.status}'. Task must be in_progress."},
@@ -200,7 +609,19 @@ def task_submit(request, pk):
     task.annotation = annotation
     task.submitted_at = timezone.now()
     task.time_spent_seconds = time_spent
-    task.save()
+    # Rework after a rejection always goes back to a reviewer.
+    task.needs_review = task.reviewed_by_id is not None or review_policy.needs_review(
+        task.dataset, request.user.pk
+    )
+    with transaction.atomic():
+        task.save(update_fields=[
+            "status", "annotation", "submitted_at", "time_spent_seconds", "needs_review",
+        ])
+        events.record(
+            task, events.Kind.SUBMITTED, request.user,
+            annotation=annotation, time_spent_seconds=time_spent,
+        )
+    record_transition("submit")
     return Response(TaskSerializer(task).data)
 
 
@@ -226,7 +647,12 @@ def task_approve(request, pk):
     task.status = Task.Status.APPROVED
     task.reviewed_by = request.user
     task.reviewed_at = timezone.now()
-    task.save()
+    with transaction.atomic():
+        task.save(update_fields=["status", "reviewed_by", "reviewed_at"])
+        events.record(task, events.Kind.APPROVED, request.user, annotation=task.annotation)
+        if task.assigned_to_id:
+            review_policy.record_review(task.assigned_to_id, approved=True)
+    record_transition("approve")
     return Response(TaskSerializer(task).data)
 
 
@@ -259,9 +685,15 @@ def task_reject(request, pk):
     task.status = Task.Status.IN_PROGRESS
     task.reviewed_by = request.user
     task.reviewed_at = timezone.now()
-    task.save()
-
-    Comment.objects.create(task=task, author=request.user, body=comment_body)
+    with transaction.atomic():
+        task.save(update_fields=["status", "reviewed_by", "reviewed_at"])
+        # Redundancy mode: every annotator reworks their own assignment.
+        task.assignments.update(status=TaskAssignment.Status.IN_PROGRESS)
+        Comment.objects.create(task=task, author=request.user, body=comment_body)
+        events.record(task, events.Kind.REJECTED, request.user, comment=comment_body)
+        if task.assigned_to_id:
+            review_policy.record_review(task.assigned_to_id, approved=False)
+    record_transition("reject")
 
     return Response(TaskSerializer(task).data)
 
@@ -272,15 +704,59 @@ def task_reject(request, pk):
 @permission_classes([IsAuthenticated])
 def task_queue(request):
     dataset_id = request.query_params.get("dataset_id")
+    annotated = TaskAssignment.objects.filter(
+        annotator=request.user, status=TaskAssignment.Status.SUBMITTED
+    ).values("task_id")
+    in_progress = TaskAssignment.objects.filter(
+        annotator=request.user, status=TaskAssignment.Status.IN_PROGRESS
+    ).values("task_id")
     tasks = Task.objects.filter(
-        Q(status=Task.Status.UNCLAIMED) |
-        Q(assigned_to=request.user, status__in=[Task.Status.IN_PROGRESS])
-    ).order_by("id")
+        Q(status=Task.Status.UNCLAIMED) & ~Q(dataset_id__in=scheduler.over_quota_ids()) |
+        Q(assigned_to=request.user, status__in=[Task.Status.IN_PROGRESS]) |
+        Q(id__in=in_progress)
+    ).exclude(id__in=annotated)
 
+    dataset = None
     if dataset_id:
         tasks = tasks.filter(dataset_id=dataset_id)
+        dataset = Dataset.objects.filter(pk=dataset_id).first()
+    try:
+        tasks = _filter_features(tasks, request.query_params)
+    except ValueError:
+        return _invalid_feature_filter()
+
+    return task_list_response(with_text_preview(scheduler.queue_order(tasks, dataset)))
 
-    return Response(TaskSerializer(tasks, many=True).data)
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def task_claim_next(request):
+    """Claim the next task chosen by the scheduler for the current annotator."""
+    if not is_annotator(request.user):
+        return Response(
+            {"detail": "Only annotators or admins can claim tasks."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    dataset_id = request.query_params.get("dataset_id") or request.data.get("dataset_id")
+    datasets = None
+    if dataset_id:
+        datasets = Dataset.objects.filter(pk=dataset_id)
+        if not datasets.exists():
+            return Response({"detail": "Dataset not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    with transaction.atomic():
+        task = scheduler.next_task(request.user, datasets)
+        if task is None:
+            return Response({"detail": "No tasks available."}, status=status.HTTP_404_NOT_FOUND)
+        if task.dataset.redundancy > 1:
+            return _claim_assignment(request, task)
+        task.status = Task.Status.IN_PROGRESS
+        task.assigned_to = request.user
+        task.save(update_fields=["status", "assigned_to"])
+        events.record(task, events.Kind.CLAIMED, request.user)
+        scheduler.record_claim(task.dataset_id)
+    record_transition("claim")
+    return Response(TaskSerializer(task).data)
 
 
 @api_view(["GET"])
@@ -293,12 +769,18 @@ def review_queue(request):
         )
 
     dataset_id = request.query_params.get("dataset_id")
-    tasks = Task.objects.filter(status=Task.Status.SUBMITTED).order_by("submitted_at")
+    tasks = Task.objects.filter(
+        status=Task.Status.SUBMITTED, needs_review=True
+    ).order_by("submitted_at")
 
     if dataset_id:
         tasks = tasks.filter(dataset_id=dataset_id)
+    try:
+        tasks = _filter_features(tasks, request.query_params)
+    except ValueError:
+        return _invalid_feature_filter()
 
-    return Response(TaskSerializer(tasks, many=True).data)
+    return task_list_response(with_text_preview(tasks))
 
 
 # --- Metrics ---
@@ -309,18 +791,21 @@ def metrics(request):
     project_id = request.query_params.get("project_id")
 
     tasks = Task.objects.all()
+    task_events = TaskEvent.objects.all()
     if project_id:
         tasks = tasks.filter(dataset__project_id=project_id)
+        task_events = task_events.filter(dataset__project_id=project_id)
 
     total = tasks.count()
     approved = tasks.filter(status=Task.Status.APPROVED).count()
-    rejected_comments = Comment.objects.filter(task__in=tasks).values("task").distinct().count()
+    rejections = task_events.filter(kind=TaskEvent.Kind.REJECTED)
+    rejected = rejections.count()
 
-    done = tasks.filter(status__in=[Task.Status.APPROVED, Task.Status.SUBMITTED]).count()
     completion_rate = round(approved / total * 100, 1) if total else 0
 
-    total_reviewed = approved + rejected_comments
-    rejection_rate = round(rejected_comments / total_reviewed * 100, 1) if total_reviewed else 0
+    # Every review is either an approval or a rejection event.
+    total_reviewed = approved + rejected
+    rejection_rate = round(rejected / total_reviewed * 100, 1) if total_reviewed else 0
 
     avg_time = tasks.filter(
         status=Task.Status.APPROVED, time_spent_seconds__gt=0
@@ -342,19 +827,28 @@ def metrics(request):
         .values("assigned_to__username")
         .annotate(
             done=Count("id", filter=Q(status=Task.Status.APPROVED)),
-            rejected=Count("id", filter=Q(comments__isnull=False)),
             avg_time=Avg("time_spent_seconds", filter=Q(status=Task.Status.APPROVED, time_spent_seconds__gt=0)),
         )
     )
+    rejected_by_annotator = dict(
+        rejections.filter(task__assigned_to__isnull=False)
+        .values_list("task__assigned_to__username")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    trust = dict(AnnotatorTrust.objects.values_list("annotator__username", "score"))
     per_annotator = []
     for a in annotator_tasks:
-        total_a = a["done"] + a["rejected"]
+        rejected_a = rejected_by_annotator.get(a["assigned_to__username"], 0)
+        total_a = a["done"] + rejected_a
         per_annotator.append({
             "username": a["assigned_to__username"],
             "done": a["done"],
-            "rejected": a["rejected"],
-            "rejection_rate": round(a["rejected"] / total_a * 100, 1) if total_a else 0,
+            "rejected": rejected_a,
+            "rejection_rate": round(rejected_a / total_a * 100, 1) if total_a else 0,
             "avg_time": round(a["avg_time"] or 0, 1),
+            "trust_score": round(trust[a["assigned_to__username"]], 3)
+            if a["assigned_to__username"] in trust else None,
         })
 
     # Label distribution
@@ -371,7 +865,7 @@ def metrics(request):
     return Response({
         "total_tasks": total,
         "completed": approved,
-        "rejected": rejected_comments,
+        "rejected": rejected,
         "completion_rate": completion_rate,
         "rejection_rate": rejection_rate,
         "avg_time_per_task": round(avg_time, 1),
@@ -381,14 +875,170 @@ def metrics(request):
     })
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def agreement(request):
+    """Cohen's/Fleiss' kappa and Krippendorff's alpha over redundant annotations."""
+    assignments = TaskAssignment.objects.filter(
+        status=TaskAssignment.Status.SUBMITTED,
+        annotation__label__isnull=False,
+    )
+    dataset_id = request.query_params.get("dataset_id")
+    if dataset_id:
+        assignments = assignments.filter(task__dataset_id=dataset_id)
+    project_id = request.query_params.get("project_id")
+    if project_id:
+        assignments = assignments.filter(task__dataset__project_id=project_id)
+
+    rows = list(
+        assignments.annotate(label=KeyTextTransform("label", "annotation"))
+        .values_list("task__dataset_id", "task_id", "annotator_id", "label")
+    )
+    result = compute_agreement(rows)
+
+    names = dict(Dataset.objects.filter(
+        id__in=[d["dataset_id"] for d in result["datasets"]]
+    ).values_list("id", "name"))
+    for d in result["datasets"]:
+        d["dataset_name"] = names.get(d["dataset_id"])
+    usernames = dict(User.objects.filter(
+        id__in={p[k] for p in result["pairs"] for k in ("annotator_a", "annotator_b")}
+    ).values_list("id", "username"))
+    for p in result["pairs"]:
+        p["annotator_a"] = usernames.get(p["annotator_a"])
+        p["annotator_b"] = usernames.get(p["annotator_b"])
+    return Response(result)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def review_analytics(request):
+    """Review latency percentiles, backlog age and reviewer/length throughput."""
+    tasks = Task.objects.all()
+    dataset_id = request.query_params.get("dataset_id")
+    if dataset_id:
+        tasks = tasks.filter(dataset_id=dataset_id)
+    project_id = request.query_params.get("project_id")
+    if project_id:
+        tasks = tasks.filter(dataset__project_id=project_id)
+    try:
+        days = max(int(request.query_params.get("days", 30)), 1)
+    except ValueError:
+        return Response({"detail": "days must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+    now = timezone.now()
+
+    by_dataset = review_latency(tasks, group_by="dataset_id")
+    by_reviewer = review_latency(tasks.filter(reviewed_by__isnull=False), group_by="reviewed_by_id")
+    backlog = backlog_age(tasks, now, group_by="dataset_id")
+    throughput = list(reviewer_throughput(tasks, now - timedelta(days=days)))
+    dataset_names = dict(
+        Dataset.objects.filter(
+            id__in={*by_dataset, *backlog, *(row["dataset_id"] for row in throughput)}
+        ).values_list("id", "name")
+    )
+    usernames = dict(User.objects.filter(id__in=list(by_reviewer)).values_list("id", "username"))
+
+    return Response({
+        "review_latency": review_latency(tasks).get(0),
+        "review_latency_by_dataset": [
+            {"dataset_id": k, "dataset_name": dataset_names.get(k), **v}
+            for k, v in sorted(by_dataset.items())
+        ],
+        "review_latency_by_reviewer": [
+            {"reviewer": usernames.get(k), **v}
+            for k, v in sorted(by_reviewer.items())
+        ],
+        "backlog_age": backlog_age(tasks, now).get(0),
+        "backlog_age_by_dataset": [
+            {"dataset_id": k, "dataset_name": dataset_names.get(k), **v}
+            for k, v in sorted(backlog.items())
+        ],
+        "reviewer_throughput": [
+            {
+                "date": str(row["date"]),
+                "reviewer": row["reviewed_by__username"],
+                "dataset_id": row["dataset_id"],
+                "dataset_name": dataset_names.get(row["dataset_id"]),
+                "count": row["count"],
+            }
+            for row in throughput
+        ],
+        "throughput_by_length": length_throughput(tasks, now - timedelta(days=days)),
+    })
+
+
+# --- Change Feed ---
+
+CHANGES_PAGE_SIZE = 1000
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def changes(request):
+    """Task events after the ``since`` cursor, oldest first.
+
+    Pass the returned ``cursor`` as ``since`` on the next call; keep polling
+    while ``has_more`` is true. Ids are assigned at insert but become visible
+    at commit, so an event from a long-running import can appear behind the
+    cursor; consumers that need every ``created`` event should also re-sync
+    after imports finish.
+    """
+    if not is_reviewer(request.user):
+        return Response(
+            {"detail": "Only reviewers or admins can read the change feed."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    try:
+        since = int(request.query_params.get("since", 0))
+        limit = int(request.query_params.get("limit", CHANGES_PAGE_SIZE))
+    except ValueError:
+        return Response(
+            {"detail": "since and limit must be integers."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    limit = max(1, min(limit, CHANGES_PAGE_SIZE))
+    task_events = TaskEvent.objects.filter(id__gt=since)
+    dataset_id = request.query_params.get("dataset_id")
+    if dataset_id:
+        task_events = task_events.filter(dataset_id=dataset_id)
+    kinds = request.query_params.get("kind")
+    if kinds:
+        task_events = task_events.filter(kind__in=kinds.split(","))
+
+    rows = list(
+        task_events.order_by("id").values(
+            "id", "task_id", "dataset_id", "kind", "actor__username", "data", "created_at"
+        )[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return Response({
+        "events": [
+            {
+                "id": row["id"],
+                "task": row["task_id"],
+                "dataset": row["dataset_id"],
+                "kind": row["kind"],
+                "actor": row["actor__username"],
+                "data": row["data"],
+                "created_at": row["created_at"],
+            }
+            for row in rows
+        ],
+        "cursor": rows[-1]["id"] if rows else since,
+        "has_more": has_more,
+    })
+
+
 # --- Rejection History ---
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def rejection_history(request):
     """Return detailed rejection history. Annotators see their own, admins see all."""
-    comments_qs = Comment.objects.select_related(
-        "task", "task__dataset", "author"
+    comments_qs = with_text_preview(
+        Comment.objects.select_related("task", "task__dataset", "author"),
+        prefix="task__",
     ).order_by("-created_at")
 
     # Annotators only see rejections on their own tasks
@@ -405,7 +1055,7 @@ def rejection_history(request):
         results.append({
             "id": comment.id,
             "task_id": task.id,
-            "text_content": task.text_content,
+            "text_content": comment.text_preview,
             "dataset_name": task.dataset.name,
             "annotator": task.assigned_to.username if task.assigned_to else "unknown",
             "label_submitted": task.annotation.get("label", "N/A") if isinstance(task.annotation, dict) else "N/A",
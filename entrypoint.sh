@@ -1,17 +1,16 @@
 #!/bin/bash
 set -e
 
+export BOOT_STARTED_AT="$(date +%s.%N)"
+
 echo "Waiting for PostgreSQL..."
 while ! pg_isready -h "$POSTGRES_HOST" -p "$POSTGRES_PORT" -U "$POSTGRES_USER" -q 2>/dev/null; do
   sleep 1
 done
 echo "PostgreSQL is ready!"
 
-echo "Running migrations..."
-python manage.py migrate --noinput
-
-echo "Seeding demo data..."
-python manage.py seed_data
+echo "Applying migrations and seeding if needed..."
+python manage.py boot
 
 echo "Starting server..."
 exec gunicorn labelforge.wsgi:application \
@@ -1,4 +1,4 @@
-import axios from "axios";
+import axios, { AxiosError, InternalAxiosRequestConfig } from "axios";
 
 const API_BASE = import.meta.env.VITE_API_URL || "http://localhost:8000";
 
@@ -15,16 +15,79 @@ client.interceptors.request.use((config) => {
   return config;
 });
 
+// One refresh at a time: concurrent 401s wait for the same rotation, since
+// refresh tokens are single-use.
+let refreshing: Promise<string> | null = null;
+
+function refreshAccessToken(): Promise<string> {
+  if (!refreshing) {
+    const refresh = localStorage.getItem("refresh_token");
+    refreshing = (
+      refresh
+        ? axios.post(`${API_BASE}/api/auth/refresh/`, { refresh }).then((res) => {
+            localStorage.setItem("access_token", res.data.access);
+            localStorage.setItem("refresh_token", res.data.refresh);
+            return res.data.access as string;
+          })
+        : Promise.reject(new Error("No refresh token"))
+    ).finally(() => {
+      refreshing = null;
+    });
+  }
+  return refreshing;
+}
+
+const MAX_RETRY_AFTER_SECONDS = 10;
+
+function logout() {
+  localStorage.removeItem("access_token");
+  localStorage.removeItem("refresh_token");
+  localStorage.removeItem("user");
+  window.location.href = "/login";
+}
+
 client.interceptors.response.use(
   (response) => response,
-  (error) => {
-    if (error.response?.status === 401) {
-      localStorage.removeItem("access_token");
-      localStorage.removeItem("user");
-      window.location.href = "/login";
+  async (error: AxiosError) => {
+    const original = error.config as (InternalAxiosRequestConfig & { _retried?: boolean }) | undefined;
+    if (error.response?.status === 401 && original && !original._retried) {
+      original._retried = true;
+      try {
+        const access = await refreshAccessToken();
+        original.headers.Authorization = `Bearer ${access}`;
+        return client(original);
+      } catch {
+        logout();
+      }
+    } else if (error.response?.status === 401) {
+      logout();
+    } else if (
+      error.response?.status === 429 &&
+      original &&
+      !original._retried &&
+      original.method === "get"
+    ) {
+      // Throttled: retry a read once after the server's Retry-After, if short.
+      const seconds = Number(error.response.headers["retry-after"]);
+      if (seconds > 0 && seconds <= MAX_RETRY_AFTER_SECONDS) {
+        original._retried = true;
+        await new Promise((resolve) => setTimeout(resolve, seconds * 1000));
+        return client(original);
+      }
     }
     return Promise.reject(error);
   }
 );
 
+export interface BatchResponse {
+  status: number;
+  body: any;
+}
+
+// Several GETs in one round trip via /api/batch/; results keep the order of `paths`.
+export async function batchGet(paths: string[]): Promise<BatchResponse[]> {
+  const res = await client.post("/api/batch/", { requests: paths.map((path) => ({ path })) });
+  return res.data.responses;
+}
+
 export default client;
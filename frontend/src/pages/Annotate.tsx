@@ -5,9 +5,12 @@ import client from "../api/client";
 interface Task {
   id: number;
   text_content: string;
+  text_truncated: boolean;
   status: string;
   dataset_labels: string[];
   dataset_name: string;
+  suggested_label: string;
+  suggested_confidence: number | null;
   comments: { body: string; author: { username: string }; created_at: string }[];
 }
 
@@ -20,6 +23,7 @@ export default function Annotate() {
   const [timer, setTimer] = useState(0);
   const [loading, setLoading] = useState(true);
   const [submitting, setSubmitting] = useState(false);
+  const [fullText, setFullText] = useState<string | null>(null);
   const timerRef = useRef<ReturnType<typeof setInterval> | null>(null);
 
   const fetchQueue = useCallback(async () => {
@@ -40,7 +44,9 @@ export default function Annotate() {
   const task = queue[currentIdx];
 
   useEffect(() => {
-    setSelectedLabel(null);
+    // Start from the cached model suggestion when it is one of the dataset's labels
+    const suggested = task?.suggested_label;
+    setSelectedLabel(suggested && task?.dataset_labels?.includes(suggested) ? suggested : null);
     setTimer(0);
     if (timerRef.current) clearInterval(timerRef.current);
     if (task) {
@@ -49,6 +55,16 @@ export default function Annotate() {
     return () => { if (timerRef.current) clearInterval(timerRef.current); };
   }, [currentIdx, task?.id]);
 
+  useEffect(() => {
+    // Queue rows only carry a preview of long texts; fetch the rest on demand
+    setFullText(null);
+    if (task?.text_truncated) {
+      client
+        .get(`/api/tasks/${task.id}/content/`, { responseType: "text" })
+        .then((res) => setFullText(res.data));
+    }
+  }, [task?.id]);
+
   const claimAndSubmit = async () => {
     if (!task || !selectedLabel || submitting) return;
     setSubmitting(true);
@@ -164,7 +180,7 @@ export default function Annotate() {
           {task.dataset_name} &middot; Task #{task.id}
         </div>
         <p style={{ color: "#e0e0e0", fontSize: 18, lineHeight: 1.6, margin: 0 }}>
-          {task.text_content}
+          {fullText ?? task.text_content}
         </p>
       </div>
 
@@ -188,6 +204,12 @@ export default function Annotate() {
         ))}
       </div>
 
+      {task.suggested_label && task.suggested_confidence !== null && (
+        <p style={{ color: "#888", fontSize: 12, marginTop: -12, marginBottom: 20 }}>
+          Suggested: {task.suggested_label} ({Math.round(task.suggested_confidence * 100)}% confidence)
+        </p>
+      )}
+
       <button
         onClick={claimAndSubmit}
         disabled={!selectedLabel || submitting}
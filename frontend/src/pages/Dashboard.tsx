@@ -3,7 +3,7 @@ import {
   BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer,
   PieChart, Pie, Cell, Legend,
 } from "recharts";
-import client from "../api/client";
+import client, { batchGet } from "../api/client";
 import { useAuth } from "../context/AuthContext";
 
 interface Metrics {
@@ -44,36 +44,69 @@ const STATUS_LABELS: Record<string, { text: string; color: string }> = {
   unclaimed: { text: "Unclaimed", color: "#888" },
 };
 
+interface ProjectOption {
+  id: number;
+  name: string;
+}
+
+// The project list is paginated; follow `next` so every project is selectable.
+async function remainingPages(next: string | null): Promise<ProjectOption[]> {
+  const results: ProjectOption[] = [];
+  while (next) {
+    const res = await client.get(next);
+    results.push(...res.data.results);
+    next = res.data.next;
+  }
+  return results;
+}
+
 export default function Dashboard() {
   const { user } = useAuth();
   const [metrics, setMetrics] = useState<Metrics | null>(null);
   const [rejections, setRejections] = useState<Rejection[]>([]);
   const [loading, setLoading] = useState(true);
+  const [error, setError] = useState<string | null>(null);
   const [projectId, setProjectId] = useState<string>("");
-  const [projects, setProjects] = useState<{ id: number; name: string }[]>([]);
+  const [projects, setProjects] = useState<ProjectOption[]>([]);
   const [expandedId, setExpandedId] = useState<number | null>(null);
 
-  useEffect(() => {
-    client.get("/api/projects/").then((res) => setProjects(res.data));
-  }, []);
-
   useEffect(() => {
     setLoading(true);
     const metricsUrl = projectId ? `/api/metrics/?project_id=${projectId}` : "/api/metrics/";
     const rejectUrl = projectId
       ? `/api/tasks/rejection-history/?project_id=${projectId}`
       : "/api/tasks/rejection-history/";
-
-    Promise.all([
-      client.get(metricsUrl),
-      client.get(rejectUrl),
-    ]).then(([metricsRes, rejectRes]) => {
-      setMetrics(metricsRes.data);
-      setRejections(rejectRes.data);
-      setLoading(false);
-    });
+    // The project list only changes the first time; fetch it with the first batch.
+    const paths = projects.length ? [metricsUrl, rejectUrl] : [metricsUrl, rejectUrl, "/api/projects/?ordering=name&page_size=200"];
+
+    setError(null);
+    batchGet(paths)
+      .then(([metricsRes, rejectRes, projectsRes]) => {
+        // Each sub-request has its own status; a throttled or failed one
+        // carries {"detail": ...} instead of data.
+        const failed = [metricsRes, rejectRes].find((r) => r.status !== 200);
+        if (failed) {
+          setError(failed.body?.detail || `Error loading dashboard (${failed.status})`);
+          return;
+        }
+        setMetrics(metricsRes.body);
+        setRejections(rejectRes.body);
+        // Left empty on failure, so the next load asks again.
+        if (projectsRes?.status === 200) {
+          setProjects(projectsRes.body.results);
+          if (projectsRes.body.next) {
+            remainingPages(projectsRes.body.next)
+              .then((rest) => setProjects([...projectsRes.body.results, ...rest]))
+              // Keep the first page if a later one fails.
+              .catch(() => {});
+          }
+        }
+      })
+      .catch((err) => setError(err.response?.data?.detail || "Error loading dashboard"))
+      .finally(() => setLoading(false));
   }, [projectId]);
 
+  if (error) return <div style={{ ...containerStyle, color: "#e74c3c" }}>{error}</div>;
   if (loading || !metrics) return <div style={containerStyle}>Loading dashboard...</div>;
 
   const labelData = Object.entries(metrics.label_distribution).map(([name, value]) => ({
@@ -9,10 +9,18 @@ interface Project {
   description: string;
   created_by: { username: string };
   created_at: string;
+  dataset_count: number;
+  task_counts: { total: number; approved: number; submitted: number };
+  progress: number;
 }
 
+const PAGE_SIZE = 20;
+
 export default function Projects() {
   const [projects, setProjects] = useState<Project[]>([]);
+  const [count, setCount] = useState(0);
+  const [page, setPage] = useState(1);
+  const [ordering, setOrdering] = useState("-created");
   const [loading, setLoading] = useState(true);
   const [showCreate, setShowCreate] = useState(false);
   const [name, setName] = useState("");
@@ -21,18 +29,23 @@ export default function Projects() {
   const navigate = useNavigate();
 
   const fetchProjects = async () => {
-    const res = await client.get("/api/projects/");
-    setProjects(res.data);
+    const res = await client.get("/api/projects/", {
+      params: { page, page_size: PAGE_SIZE, ordering },
+    });
+    setProjects(res.data.results);
+    setCount(res.data.count);
     setLoading(false);
   };
 
-  useEffect(() => { fetchProjects(); }, []);
+  useEffect(() => { fetchProjects(); }, [page, ordering]);
+
+  const pages = Math.max(1, Math.ceil(count / PAGE_SIZE));
 
   const handleCreate = async (e: React.FormEvent) => {
     e.preventDefault();
     await client.post("/api/projects/", { name, description: desc });
     setName(""); setDesc(""); setShowCreate(false);
-    fetchProjects();
+    if (page === 1) fetchProjects(); else setPage(1);
   };
 
   if (loading) return <div style={containerStyle}>Loading projects...</div>;
@@ -41,11 +54,23 @@ export default function Projects() {
     <div style={containerStyle}>
       <div style={{ display: "flex", justifyContent: "space-between", alignItems: "center", marginBottom: 24 }}>
         <h1 style={{ color: "#e0e0e0", fontSize: 24 }}>Projects</h1>
-        {user?.role === "admin" && (
-          <button onClick={() => setShowCreate(!showCreate)} style={btnPrimary}>
-            + New Project
-          </button>
-        )}
+        <div style={{ display: "flex", gap: 12 }}>
+          <select
+            value={ordering}
+            onChange={(e) => { setOrdering(e.target.value); setPage(1); }}
+            style={{ ...inputStyle, width: "auto" }}
+          >
+            <option value="-created">Newest</option>
+            <option value="name">Name</option>
+            <option value="-progress">Most complete</option>
+            <option value="progress">Least complete</option>
+          </select>
+          {user?.role === "admin" && (
+            <button onClick={() => setShowCreate(!showCreate)} style={btnPrimary}>
+              + New Project
+            </button>
+          )}
+        </div>
       </div>
 
       {showCreate && (
@@ -82,8 +107,16 @@ export default function Projects() {
           >
             <h3 style={{ color: "#e0e0e0", marginBottom: 4 }}>{p.name}</h3>
             <p style={{ color: "#888", fontSize: 13, margin: 0 }}>{p.description}</p>
+            <div style={{ height: 6, background: "#16213e", borderRadius: 3, marginTop: 12 }}>
+              <div style={{
+                width: `${Math.round(p.progress * 100)}%`, height: "100%",
+                background: "#2ecc71", borderRadius: 3,
+              }} />
+            </div>
             <p style={{ color: "#555", fontSize: 12, marginTop: 8 }}>
-              Created by {p.created_by.username} &middot; {new Date(p.created_at).toLocaleDateString()}
+              {Math.round(p.progress * 100)}% approved &middot; {p.task_counts.total} tasks in{" "}
+              {p.dataset_count} datasets &middot; Created by {p.created_by.username} &middot;{" "}
+              {new Date(p.created_at).toLocaleDateString()}
             </p>
           </div>
         ))}
@@ -91,6 +124,14 @@ export default function Projects() {
           <p style={{ color: "#666" }}>No projects yet.</p>
         )}
       </div>
+
+      {pages > 1 && (
+        <div style={{ display: "flex", justifyContent: "center", alignItems: "center", gap: 12, marginTop: 20 }}>
+          <button disabled={page <= 1} onClick={() => setPage(page - 1)} style={btnPrimary}>Previous</button>
+          <span style={{ color: "#888", fontSize: 13 }}>Page {page} of {pages}</span>
+          <button disabled={page >= pages} onClick={() => setPage(page + 1)} style={btnPrimary}>Next</button>
+        </div>
+      )}
     </div>
   );
 }